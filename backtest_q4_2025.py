@@ -8,6 +8,7 @@ from src.backtest.hybrid_runner import (
 from src.data_loader.data_manager import DataManager
 from src.data_loader.tushare_loader import TushareLoader
 from src.features.technical import FeatureEngineer
+from src.models.prediction_store import PredictionStore
 from src.models.xgb_model import XGBoostModel
 from src.strategy.logic import StrategyFilter
 from config import tickers
@@ -41,6 +42,7 @@ def main():
         model,
         start_date,
         end_date,
+        prediction_store=PredictionStore(),
     )
     results = run_backtest_for_cache(data_cache, backtester, market_status_map)
     results = [r for r in results if r["num_trades"] > 0]
@@ -7,6 +7,7 @@ import pandas as pd
 from config import tickers
 from config.settings import settings
 from src.backtest.backtester import Backtester
+from src.backtest.batch_engine import sweep_thresholds
 from src.backtest.hybrid_runner import (
     build_adjusted_probs,
     build_data_cache,
@@ -15,10 +16,12 @@ from src.backtest.hybrid_runner import (
     summarize_results,
     use_dynamic_for_code,
 )
+from src.backtest.metrics import runs_from_results, summarize_runs
 from src.backtest.strategy_config import StrategyConfig
 from src.data_loader.data_manager import DataManager
 from src.data_loader.tushare_loader import TushareLoader
 from src.features.technical import FeatureEngineer
+from src.models.prediction_store import PredictionStore
 from src.models.xgb_model import XGBoostModel
 from src.strategy.logic import StrategyFilter
 
@@ -81,17 +84,12 @@ def _print_results(results: list[dict], start_date_str: str, select_mode: bool):
         group = [r for r in results if r["code"] in codes]
         if not group:
             return
-        group_trades = sum(r["num_trades"] for r in group)
-        group_wins = sum(int(round(r["win_rate"] * r["num_trades"])) for r in group)
-        avg_return = np.mean([r["total_return"] for r in group])
-        avg_max_dd = np.mean([r["max_drawdown"] for r in group])
-        avg_vol = np.mean([r["volatility"] for r in group])
-        avg_sharpe = np.mean([r["sharpe"] for r in group])
-        win_rate = group_wins / group_trades if group_trades > 0 else 0.0
+        summary = summarize_runs(**runs_from_results(group))
         print(
-            f"{title}: count={len(group)} avg_return={avg_return * 100:.2f}% "
-            f"win_rate={win_rate * 100:.2f}% avg_dd={avg_max_dd * 100:.2f}% "
-            f"avg_vol={avg_vol * 100:.2f}% avg_sharpe={avg_sharpe:.2f} trades={group_trades}"
+            f"{title}: count={len(group)} avg_return={summary['avg_return'] * 100:.2f}% "
+            f"win_rate={summary['overall_win_rate'] * 100:.2f}% avg_dd={summary['avg_max_drawdown'] * 100:.2f}% "
+            f"avg_vol={summary['avg_volatility'] * 100:.2f}% avg_sharpe={summary['avg_sharpe']:.2f} "
+            f"trades={summary['total_trades']}"
         )
 
     summarize_group("Core", tickers.CORE_TRADE_TICKERS)
@@ -117,7 +115,7 @@ def _render_ascii_trade_chart(
     code: str,
     name: str,
     test_df: pd.DataFrame,
-    trades: list[dict],
+    trades: np.ndarray,
     width: int = 100,
     height: int = 16,
 ):
@@ -153,12 +151,10 @@ def _render_ascii_trade_chart(
     for col, src_i in enumerate(sample_idx):
         date_to_col[str(dates[src_i])] = col
 
-    for t in trades:
-        action = str(t.get("action", ""))
+    for action, d in zip(trades["action"].tolist(), trades["date"].tolist()):
         marker = "B" if action == "BUY" else "S" if action.startswith("SELL") else None
         if marker is None:
             continue
-        d = str(t.get("date", ""))
         if d not in date_to_col:
             continue
         col = date_to_col[d]
@@ -191,7 +187,7 @@ def _print_trade_charts(
             code=code,
             name=res.get("name", code),
             test_df=payload["test_df"],
-            trades=res.get("trades", []),
+            trades=res["trades"],
         )
 
 
@@ -264,6 +260,7 @@ def main():
         index_df,
         model,
         start_date_str,
+        prediction_store=PredictionStore(),
     )
 
     def run_with_overrides(threshold_overrides: dict[str, float] | None):
@@ -273,6 +270,7 @@ def main():
             market_status_map,
             threshold_overrides=threshold_overrides,
             config=config,
+            workers=settings.BACKTEST_WORKERS,
         )
 
     if grid_thresholds:
@@ -281,12 +279,17 @@ def main():
         print("=" * 80)
         print(f"{'Threshold':<10} {'Name':<12} {'Return':<10} {'WinRate':<10} {'Trades':<8}")
         print("-" * 80)
-        for threshold in grid_thresholds:
-            overrides = {code: threshold for code in ticker_list}
-            results = run_with_overrides(overrides)
-            for res in results:
-                win_rate_str = f"{res['win_rate'] * 100:.1f}%"
-                print(f"{threshold:<10.2f} {res['name']:<12} {res['total_return'] * 100:6.2f}%    {win_rate_str:<10} {res['num_trades']:<8}")
+        grid = sweep_thresholds(
+            data_cache,
+            market_status_map,
+            grid_thresholds,
+            config=config,
+            initial_capital=backtester.initial_capital,
+            workers=settings.BACKTEST_WORKERS,
+        ).to_frame()
+        for row in grid.itertuples(index=False):
+            win_rate_str = f"{row.win_rate * 100:.1f}%"
+            print(f"{row.label:<10.2f} {row.name:<12} {row.total_return * 100:6.2f}%    {win_rate_str:<10} {row.num_trades:<8}")
         print("=" * 80)
         return
 
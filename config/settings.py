@@ -51,6 +51,31 @@ class Settings:
 
     MARKET_STATE_CONFIRM_DAYS = 3
 
+    # Process-pool size for research backtests: 0 uses every core, 1 keeps them in-process.
+    BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", "0") or "0")
+    # Per-ticker backtest results memoized on disk; oldest-used rows beyond the limit are evicted.
+    BACKTEST_CACHE_PATH = DATA_DIR / "backtest_cache.db"
+    BACKTEST_CACHE_MAX_ENTRIES = int(os.getenv("BACKTEST_CACHE_MAX_ENTRIES", "2000") or "2000")
+    # Historical model scores keyed by (model fingerprint, ts_code, trade_date); only new rows get scored.
+    PREDICTION_STORE_PATH = DATA_DIR / "predictions.db"
+    # Model fingerprints whose scores are kept; rows of less recently used fingerprints are deleted.
+    PREDICTION_STORE_MAX_FINGERPRINTS = int(os.getenv("PREDICTION_STORE_MAX_FINGERPRINTS", "2") or "2")
+
+    # Seconds a cached /api/dashboard-data snapshot is served before a background rebuild is started.
+    DASHBOARD_SNAPSHOT_TTL = float(os.getenv("DASHBOARD_SNAPSHOT_TTL", "300") or "300")
+    # Dashboard builds run on a small pool; identical concurrent requests share one build and requests
+    # beyond DASHBOARD_MAX_PENDING queued/running builds get 503.
+    DASHBOARD_BUILD_WORKERS = int(os.getenv("DASHBOARD_BUILD_WORKERS", "2") or "2")
+    DASHBOARD_MAX_PENDING = int(os.getenv("DASHBOARD_MAX_PENDING", "4") or "4")
+    # Replaced snapshots kept per window so `/api/dashboard-data?since=<revision>` can answer with a diff.
+    DASHBOARD_DELTA_VERSIONS = int(os.getenv("DASHBOARD_DELTA_VERSIONS", "4") or "4")
+
+    # XGBoost candidate search: serial (default), parallel, or halving (successive halving).
+    XGB_SEARCH = os.getenv("XGB_SEARCH", "serial").strip().lower() or "serial"
+
+    # Live scoring through the compiled NumPy tree evaluator instead of xgboost (skips importing xgboost/sklearn).
+    NUMPY_INFERENCE = os.getenv("NUMPY_INFERENCE", "").strip().lower() in ("1", "true", "yes")
+
     TRAIN_LABEL_HORIZON = 7
     TRAIN_LABEL_THRESHOLD = 0.025
     TRAIN_LABEL_END_WEIGHT = 0.30
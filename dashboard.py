@@ -3,19 +3,37 @@ from __future__ import annotations
 import argparse
 import http.server
 import json
-import mimetypes
 from pathlib import Path
 import sys
 import threading
-from urllib.parse import parse_qs, urlparse
+import time
+from typing import Callable
+from urllib.parse import parse_qs, unquote, urlparse
 
 from config.settings import settings
 from src.core.daily_report_service import generate_daily_report
-from src.dashboard.data_builder import build_dashboard_payload
+from src.dashboard.data_builder import build_dashboard_payload, dashboard_data_version, with_recent_reports
+from src.dashboard.compression import MIN_COMPRESS_BYTES, compress, is_compressible, negotiate
+from src.dashboard.http_cache import FileCache, etag_matches
+from src.dashboard.jobs import Job, JobManager
+from src.dashboard.payload_delta import payload_delta
+from src.dashboard.payload_views import (
+    backtest_chart_view,
+    history_view,
+    normalize_window,
+    series_view,
+    summary_view,
+)
+from src.dashboard.serialization import dumps
+from src.dashboard.series_encoding import snap_points
+from src.dashboard.single_flight import Overloaded
+from src.dashboard.snapshot_cache import Snapshot, SnapshotCache
+from src.dashboard.snapshot_store import SNAPSHOT_PATH, load_snapshot, save_snapshot
 
 
 BASE_DIR = Path(__file__).resolve().parent
 FRONTEND_DIST_DIR = BASE_DIR / "src" / "dashboard" / "frontend" / "dist"
+FILE_CACHE = FileCache()
 
 
 def _configure_stdio() -> None:
@@ -60,18 +78,44 @@ def _read_json_request(handler: http.server.BaseHTTPRequestHandler) -> dict:
         raise ValueError("Request body must be valid JSON.") from exc
 
 
+def _write_not_modified(handler: http.server.BaseHTTPRequestHandler, headers: dict[str, str]) -> None:
+    handler.send_response(304)
+    for name, value in headers.items():
+        handler.send_header(name, value)
+    handler.end_headers()
+
+
+def _log_compression(handler: http.server.BaseHTTPRequestHandler, encoding: str, raw: int, sent: int) -> None:
+    handler.log_message('"%s" %s %d -> %d bytes (%.0f%%)', handler.path, encoding, raw, sent, 100.0 * sent / max(raw, 1))
+
+
 def _serve_file(handler: http.server.BaseHTTPRequestHandler, file_path: Path) -> None:
-    body = file_path.read_bytes()
-    content_type, _ = mimetypes.guess_type(str(file_path))
-    handler.send_response(200)
-    handler.send_header("Content-Type", content_type or "application/octet-stream")
-    handler.send_header("Content-Length", str(len(body)))
+    cached = FILE_CACHE.get(file_path)
+    encoding = negotiate(handler.headers.get("Accept-Encoding"))
+    body, etag = cached.variant(encoding)
+    headers = {"ETag": etag}
+    if body is not cached.body:
+        headers["Content-Encoding"] = encoding
+    if is_compressible(cached.content_type):
+        headers["Vary"] = "Accept-Encoding"
     if file_path.suffix in {".js", ".css"}:
-        handler.send_header("Cache-Control", "public, max-age=31536000, immutable")
+        headers["Cache-Control"] = "public, max-age=31536000, immutable"
     else:
-        handler.send_header("Cache-Control", "no-store")
+        # Revalidate every time; an unchanged file costs a 304 with no body.
+        headers["Cache-Control"] = "no-cache"
+    if etag_matches(handler.headers.get("If-None-Match"), etag):
+        _write_not_modified(handler, headers)
+        return
+
+    handler.send_response(200)
+    handler.send_header("Content-Type", cached.content_type)
+    handler.send_header("Content-Length", str(len(body)))
+    for name, value in headers.items():
+        handler.send_header(name, value)
     handler.end_headers()
     handler.wfile.write(body)
+    if "Content-Encoding" in headers:
+        _log_compression(handler, encoding, cached.size, len(body))
 
 
 def _resolve_static_path(base_dir: Path, request_path: str) -> Path | None:
@@ -98,44 +142,345 @@ def _resolve_report_path(request_path: str) -> Path | None:
     return _resolve_static_path(settings.REPORTS_DIR, request_path)
 
 
-def _write_json(handler: http.server.BaseHTTPRequestHandler, status_code: int, payload: dict) -> None:
-    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+def _write_json_body(
+    handler: http.server.BaseHTTPRequestHandler,
+    status_code: int,
+    body: bytes,
+    headers: dict[str, str] | None = None,
+) -> None:
+    headers = {"Cache-Control": "no-store", "Vary": "Accept-Encoding", **(headers or {})}
+    raw_size = len(body)
+    encoding = negotiate(handler.headers.get("Accept-Encoding")) if raw_size >= MIN_COMPRESS_BYTES else None
+    if encoding is not None:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
     handler.send_response(status_code)
     handler.send_header("Content-Type", "application/json; charset=utf-8")
     handler.send_header("Content-Length", str(len(body)))
-    handler.send_header("Cache-Control", "no-store")
+    for name, value in headers.items():
+        handler.send_header(name, value)
     handler.end_headers()
     handler.wfile.write(body)
+    if encoding is not None:
+        _log_compression(handler, encoding, raw_size, len(body))
+
+
+def _write_json(
+    handler: http.server.BaseHTTPRequestHandler,
+    status_code: int,
+    payload: dict,
+    headers: dict[str, str] | None = None,
+) -> None:
+    _write_json_body(handler, status_code, dumps(payload), headers)
+
+
+def _write_overloaded(handler: http.server.BaseHTTPRequestHandler, exc: Overloaded) -> None:
+    _write_json(
+        handler,
+        503,
+        {"ok": False, "error": f"Dashboard is busy ({exc}). Please retry shortly."},
+        {"Retry-After": "5"},
+    )
 
 
-def _dashboard_payload_response(history_days: int) -> dict:
+def _snapshot_meta(snapshot: Snapshot, cache: SnapshotCache, history_days: int) -> dict:
     return {
-        "ok": True,
-        "payload": build_dashboard_payload(history_days=history_days),
+        "version": snapshot.version,
+        "revision": snapshot.revision,
+        "built_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot.built_at)),
+        "age_seconds": round(snapshot.age(), 1),
+        "revalidating": cache.is_revalidating(history_days),
     }
 
 
+def _series_options(query: dict[str, list[str]]) -> tuple[bool, int | None]:
+    """Opt-in series encoding: `format=columnar` and/or `points=<n>` (LTTB target, snapped to 120/240/480/960)."""
+    columnar = query.get("format", [""])[0].strip().lower() == "columnar"
+    try:
+        points = int(query.get("points", [""])[0])
+    except ValueError:
+        points = None
+    else:
+        points = snap_points(points)
+    return columnar, points
+
+
+def _snapshot_view(
+    request_path: str,
+    query: dict[str, list[str]] | None = None,
+) -> tuple[str, Callable[[dict], object] | None] | None:
+    """Map an API path onto a named view of the cached snapshot, or None if it is not a snapshot endpoint."""
+    columnar, points = _series_options(query or {})
+    # The view name keys the per-snapshot encoding memo, so it has to carry the series options.
+    suffix = f"{':columnar' if columnar else ''}{f':lttb{points}' if points else ''}"
+    if request_path == "/api/dashboard-data":
+        if suffix:
+            return f"payload{suffix}", series_view(columnar, points)
+        return "payload", None
+    if request_path == "/api/dashboard-summary":
+        return "summary", summary_view
+    parts = [unquote(part) for part in request_path.strip("/").split("/")]
+    if len(parts) == 4 and parts[:2] == ["api", "ticker"] and parts[3] == "history":
+        return f"history:{parts[2]}{suffix}", history_view(parts[2], columnar, points)
+    if len(parts) == 5 and parts[:2] == ["api", "backtest"] and parts[4] == "chart":
+        window = normalize_window(parts[2])
+        return f"chart:{window}:{parts[3]}{suffix}", backtest_chart_view(window, parts[3], columnar, points)
+    return None
+
+
+def _write_snapshot_view(
+    handler: http.server.BaseHTTPRequestHandler,
+    cache: SnapshotCache,
+    history_days: int,
+    name: str,
+    view: Callable[[dict], object] | None,
+) -> None:
+    snapshot = cache.get(history_days)
+    encoded = snapshot.encoded(name, view)
+    if encoded is None:
+        _write_json(handler, 404, {"ok": False, "error": f"No data for {handler.path}."})
+        return
+    _write_snapshot_body(handler, cache, history_days, snapshot, *encoded)
+
+
+def _write_snapshot_delta(
+    handler: http.server.BaseHTTPRequestHandler,
+    cache: SnapshotCache,
+    history_days: int,
+    since: str,
+) -> None:
+    """Diff from snapshot revision `since` to the current one; the full payload if `since` is no longer kept."""
+    snapshot = cache.get(history_days)
+    base = snapshot if since == snapshot.revision else cache.previous(history_days, since)
+    if base is None:
+        _write_snapshot_body(handler, cache, history_days, snapshot, *snapshot.encoded())
+        return
+    delta_json, etag = snapshot.encoded(f"delta:{since}", lambda payload: payload_delta(base.payload, payload))
+    _write_snapshot_body(handler, cache, history_days, snapshot, delta_json, etag, key="delta")
+
+
+def _write_snapshot_body(
+    handler: http.server.BaseHTTPRequestHandler,
+    cache: SnapshotCache,
+    history_days: int,
+    snapshot: Snapshot,
+    view_json: bytes,
+    etag: str,
+    key: str = "payload",
+) -> None:
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+        "Age": str(int(snapshot.age())),
+    }
+    if etag_matches(handler.headers.get("If-None-Match"), etag):
+        _write_not_modified(handler, headers)
+        return
+
+    # The view JSON is encoded once per snapshot and spliced into the per-request envelope.
+    meta = dumps(_snapshot_meta(snapshot, cache, history_days))
+    body = b'{"ok": true, "snapshot": ' + meta + b', "' + key.encode("ascii") + b'": ' + view_json + b"}"
+    _write_json_body(handler, 200, body, headers)
+
+
+SSE_KEEPALIVE_SECONDS = 15.0
+
+
+def _refresh_job(cache: SnapshotCache, history_days: int) -> Callable[[Job], dict]:
+    def run(job: Job) -> dict:
+        payload = summary_view(cache.refresh(history_days, progress=job.report_stage).payload)
+        return {
+            "ok": True,
+            "action": "refresh-dashboard",
+            "message": "Dashboard refreshed. Live signals and 90/180-day backtests were recalculated.",
+            "generated_at": payload["generated_at"],
+            "payload": payload,
+        }
+
+    return run
+
+
+def _report_job(cache: SnapshotCache, history_days: int, send_notification: bool) -> Callable[[Job], dict]:
+    def run(job: Job) -> dict:
+        snapshot = cache.refresh(history_days, progress=job.report_stage)
+        job.report_stage("report")
+        report_result = generate_daily_report(
+            send_notification=send_notification,
+            history_days=history_days,
+            dashboard_payload=snapshot.payload,
+        )
+        # The report is written from the fresh snapshot; only its report list needs to pick up the new file.
+        snapshot = cache.store(
+            history_days,
+            Snapshot(with_recent_reports(snapshot.payload), snapshot.version, snapshot.built_at),
+        )
+
+        if report_result["notification_status"] == "sent":
+            message = "Today's report is ready and the Feishu notification was sent."
+        elif report_result["notification_status"] == "skipped":
+            message = "Today's report is ready. Feishu was skipped because the webhook is not configured."
+        elif report_result["notification_status"] == "failed":
+            message = "Today's report is ready, but the Feishu notification failed."
+        else:
+            message = "Today's report is ready."
+
+        return {
+            "ok": True,
+            "action": "generate-report",
+            "message": message,
+            "generated_at": report_result["generated_at"],
+            "notification_status": report_result["notification_status"],
+            "notification_error": report_result["notification_error"],
+            "payload": summary_view(snapshot.payload),
+        }
+
+    return run
+
+
+def _job_route(request_path: str) -> tuple[str, bool] | None:
+    """`/api/jobs/<id>` -> (id, False); `/api/jobs/<id>/events` -> (id, True)."""
+    parts = request_path.strip("/").split("/")
+    if len(parts) == 3 and parts[:2] == ["api", "jobs"]:
+        return parts[2], False
+    if len(parts) == 4 and parts[:2] == ["api", "jobs"] and parts[3] == "events":
+        return parts[2], True
+    return None
+
+
+def _write_job(handler: http.server.BaseHTTPRequestHandler, job: Job) -> None:
+    body = {"ok": job.status != "failed", "job": job.describe()}
+    if job.status == "done":
+        body["result"] = job.result
+    _write_json(handler, 200, body)
+
+
+def _stream_job_events(handler: http.server.BaseHTTPRequestHandler, job: Job) -> None:
+    """Server-sent events for `job` until its `done`/`failed` event; resumes after `Last-Event-ID`."""
+    try:
+        after = int(handler.headers.get("Last-Event-ID", "0") or "0")
+    except ValueError:
+        after = 0
+    handler.send_response(200)
+    handler.send_header("Content-Type", "text/event-stream; charset=utf-8")
+    handler.send_header("Cache-Control", "no-store")
+    handler.send_header("X-Accel-Buffering", "no")
+    handler.end_headers()
+    try:
+        while True:
+            events = job.wait_events(after, SSE_KEEPALIVE_SECONDS)
+            if not events:
+                handler.wfile.write(b": keep-alive\n\n")
+                handler.wfile.flush()
+                continue
+            for event in events:
+                frame = f"id: {event.id}\nevent: {event.event}\ndata: ".encode("utf-8") + dumps(event.data) + b"\n\n"
+                handler.wfile.write(frame)
+                after = event.id
+            handler.wfile.flush()
+            if events[-1].event in {"done", "failed"}:
+                return
+    except (BrokenPipeError, ConnectionResetError):
+        # The client went away; the job itself keeps running.
+        return
+
+
+def _precompress_frontend() -> None:
+    sizes = FILE_CACHE.precompress(FRONTEND_DIST_DIR)
+    raw_total = sum(size for _, size, _ in sizes)
+    for path, size, encoded in sizes:
+        if encoded:
+            variants = ", ".join(f"{name} {length}" for name, length in encoded.items())
+            print(f"  {path.relative_to(FRONTEND_DIST_DIR)}: {size} bytes -> {variants}")
+    print(f"Frontend assets cached in memory: {len(sizes)} files, {raw_total} bytes uncompressed")
+
+
+def _persist_rebuilds(history_days: int) -> Callable[[int, Snapshot], None]:
+    """Rebuild hook keeping `reports/dashboard-data.json` current for the server's default window."""
+
+    def persist(days: int, snapshot: Snapshot) -> None:
+        if days != history_days:
+            return
+        try:
+            save_snapshot(snapshot, days)
+        except OSError as exc:
+            print(f"Dashboard snapshot could not be persisted: {exc}")
+
+    return persist
+
+
+def _warm_start(cache: SnapshotCache, history_days: int) -> None:
+    """Serve the persisted snapshot right away; recompute in the background only if its fingerprints moved."""
+    snapshot = load_snapshot(history_days)
+    if snapshot is None:
+        print("No persisted dashboard snapshot for this window; building one in the background.")
+        cache.revalidate(history_days)
+        return
+    persisted_age = snapshot.age()
+    # Count it as fresh from now on, so the TTL doesn't rebuild it before the fingerprint check below
+    # (the only thing that should decide) has run.
+    snapshot.built_at = time.time()
+    cache.store(history_days, snapshot)
+    print(f"Warm start from {SNAPSHOT_PATH} (revision {snapshot.revision}, {int(persisted_age)}s old)")
+
+    def check_fingerprints() -> None:
+        # Off the startup path: the data version loads the model to fingerprint it.
+        if dashboard_data_version() == snapshot.version:
+            print("Persisted dashboard snapshot is current.")
+        else:
+            print("Persisted dashboard snapshot is stale; recomputing in the background.")
+            cache.revalidate(history_days)
+
+    threading.Thread(target=check_fingerprints, name="dashboard-warm-start", daemon=True).start()
+
+
 def serve_dashboard(port: int, history_days: int = 120) -> None:
     _ensure_frontend_build()
-    action_lock = threading.Lock()
+    _precompress_frontend()
+    jobs = JobManager()
+    snapshot_cache = SnapshotCache(
+        lambda days, progress: build_dashboard_payload(history_days=days, progress=progress),
+        dashboard_data_version,
+        on_rebuild=_persist_rebuilds(history_days),
+    )
+    _warm_start(snapshot_cache, history_days)
 
     class DashboardHandler(http.server.BaseHTTPRequestHandler):
         def do_GET(self) -> None:
             parsed = urlparse(self.path)
             request_path = parsed.path
 
-            if request_path == "/api/dashboard-data":
-                query = parse_qs(parsed.query)
+            query = parse_qs(parsed.query)
+            snapshot_view = _snapshot_view(request_path, query)
+            if snapshot_view is not None:
                 request_history_days = _coerce_history_days(
                     query.get("history_days", [history_days])[0],
                     default=history_days,
                 )
+                since = query.get("since", [""])[0].strip()
                 try:
-                    _write_json(self, 200, _dashboard_payload_response(request_history_days))
+                    if since and request_path == "/api/dashboard-data":
+                        _write_snapshot_delta(self, snapshot_cache, request_history_days, since)
+                    else:
+                        _write_snapshot_view(self, snapshot_cache, request_history_days, *snapshot_view)
+                except Overloaded as exc:
+                    _write_overloaded(self, exc)
                 except Exception as exc:
                     _write_json(self, 500, {"ok": False, "error": str(exc)})
                 return
 
+            job_route = _job_route(request_path)
+            if job_route is not None:
+                job_id, events = job_route
+                job = jobs.get(job_id)
+                if job is None:
+                    _write_json(self, 404, {"ok": False, "error": f"Unknown job {job_id}."})
+                elif events:
+                    _stream_job_events(self, job)
+                else:
+                    _write_job(self, job)
+                return
+
             frontend_path = _resolve_frontend_path(request_path)
             if frontend_path:
                 _serve_file(self, frontend_path)
@@ -166,67 +511,33 @@ def serve_dashboard(port: int, history_days: int = 120) -> None:
                 default=history_days,
             )
 
-            if not action_lock.acquire(blocking=False):
-                _write_json(
-                    self,
-                    409,
-                    {
-                        "ok": False,
-                        "error": "Another dashboard action is already running. Please wait a moment.",
-                    },
-                )
-                return
+            if request_path == "/api/generate-report":
+                send_notification = bool(request_payload.get("send_notification"))
+                action = "generate-report"
+                key = (action, request_history_days, send_notification)
+                run = _report_job(snapshot_cache, request_history_days, send_notification)
+            else:
+                action = "refresh-dashboard"
+                key = (action, request_history_days)
+                run = _refresh_job(snapshot_cache, request_history_days)
 
             try:
-                payload = None
-                if request_path == "/api/generate-report":
-                    send_notification = bool(request_payload.get("send_notification"))
-                    report_result = generate_daily_report(
-                        send_notification=send_notification,
-                        history_days=request_history_days,
-                    )
-                    payload = build_dashboard_payload(history_days=request_history_days)
-
-                    if report_result["notification_status"] == "sent":
-                        message = "Today's report is ready and the Feishu notification was sent."
-                    elif report_result["notification_status"] == "skipped":
-                        message = "Today's report is ready. Feishu was skipped because the webhook is not configured."
-                    elif report_result["notification_status"] == "failed":
-                        message = "Today's report is ready, but the Feishu notification failed."
-                    else:
-                        message = "Today's report is ready."
-
-                    _write_json(
-                        self,
-                        200,
-                        {
-                            "ok": True,
-                            "action": "generate-report",
-                            "message": message,
-                            "generated_at": report_result["generated_at"],
-                            "notification_status": report_result["notification_status"],
-                            "notification_error": report_result["notification_error"],
-                            "payload": payload,
-                        },
-                    )
-                    return
-
-                payload = build_dashboard_payload(history_days=request_history_days)
-                _write_json(
-                    self,
-                    200,
-                    {
-                        "ok": True,
-                        "action": "refresh-dashboard",
-                        "message": "Dashboard refreshed. Live signals and 90/180-day backtests were recalculated.",
-                        "generated_at": payload["generated_at"],
-                        "payload": payload,
-                    },
-                )
-            except Exception as exc:
-                _write_json(self, 500, {"ok": False, "error": str(exc)})
-            finally:
-                action_lock.release()
+                # Identical actions already running are joined rather than rejected.
+                job = jobs.submit(action, key, run)
+            except Overloaded as exc:
+                _write_overloaded(self, exc)
+                return
+            _write_json(
+                self,
+                202,
+                {
+                    "ok": True,
+                    "job": job.describe(),
+                    "job_url": f"/api/jobs/{job.id}",
+                    "events_url": f"/api/jobs/{job.id}/events",
+                },
+                {"Location": f"/api/jobs/{job.id}"},
+            )
 
     server = http.server.ThreadingHTTPServer(("127.0.0.1", port), DashboardHandler)
     url = f"http://127.0.0.1:{port}/dashboard.html"
@@ -250,12 +561,14 @@ def parse_args() -> argparse.Namespace:
 def main() -> None:
     _configure_stdio()
     args = parse_args()
-    snapshot = build_dashboard_payload(history_days=args.history_days)
-    snapshot_path = settings.REPORTS_DIR / "dashboard-data.json"
-    snapshot_path.write_text(json.dumps(snapshot, ensure_ascii=False), encoding="utf-8")
-    print(f"Dashboard snapshot written: {snapshot_path}")
     if args.serve:
+        # No recompute here: the server warm-starts from the persisted snapshot and rebuilds in the background.
         serve_dashboard(port=args.port, history_days=args.history_days)
+        return
+    started = time.time()
+    payload = build_dashboard_payload(history_days=args.history_days)
+    snapshot_path = save_snapshot(Snapshot(payload, dashboard_data_version(), started), args.history_days)
+    print(f"Dashboard snapshot written: {snapshot_path}")
 
 
 if __name__ == "__main__":
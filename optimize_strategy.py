@@ -3,18 +3,19 @@ from dataclasses import asdict
 from datetime import datetime, timedelta
 
 from config import tickers
+from config.settings import settings
 from src.backtest.backtester import Backtester
+from src.backtest.batch_engine import run_batched_backtests, summarize_batch
 from src.backtest.hybrid_runner import (
     build_data_cache,
     objective_score,
     prepare_index_data,
-    run_backtest_for_cache,
-    summarize_results,
 )
 from src.backtest.strategy_config import StrategyConfig
 from src.data_loader.data_manager import DataManager
 from src.data_loader.tushare_loader import TushareLoader
 from src.features.technical import FeatureEngineer
+from src.models.prediction_store import PredictionStore
 from src.models.xgb_model import XGBoostModel
 from src.strategy.logic import StrategyFilter
 
@@ -67,6 +68,46 @@ def sample_configs(seed: int = 42, trials: int = 120) -> list[StrategyConfig]:
     return configs
 
 
+def evaluate_configs(
+    configs: list[StrategyConfig],
+    data_cache_90: dict,
+    data_cache_180: dict,
+    market_status_map: dict[str, str],
+    backtester: Backtester,
+    workers: int | None = None,
+) -> list[dict]:
+    batch_90 = run_batched_backtests(
+        data_cache_90,
+        market_status_map,
+        configs,
+        initial_capital=backtester.initial_capital,
+        workers=workers,
+    )
+    batch_180 = run_batched_backtests(
+        data_cache_180,
+        market_status_map,
+        configs,
+        initial_capital=backtester.initial_capital,
+        workers=workers,
+    )
+
+    evaluations = []
+    for config, summary_90, summary_180 in zip(configs, summarize_batch(batch_90), summarize_batch(batch_180)):
+        score_90 = objective_score(summary_90)
+        score_180 = objective_score(summary_180)
+        evaluations.append(
+            {
+                "config": config,
+                "score_90": score_90,
+                "score_180": score_180,
+                "combined_score": 0.65 * score_90 + 0.35 * score_180,
+                "summary_90": summary_90,
+                "summary_180": summary_180,
+            }
+        )
+    return evaluations
+
+
 def evaluate_config(
     config: StrategyConfig,
     data_cache_90: dict,
@@ -74,23 +115,7 @@ def evaluate_config(
     market_status_map: dict[str, str],
     backtester: Backtester,
 ) -> dict:
-    results_90 = run_backtest_for_cache(data_cache_90, backtester, market_status_map, config=config)
-    results_180 = run_backtest_for_cache(data_cache_180, backtester, market_status_map, config=config)
-
-    summary_90 = summarize_results(results_90)
-    summary_180 = summarize_results(results_180)
-    score_90 = objective_score(summary_90)
-    score_180 = objective_score(summary_180)
-    combined_score = 0.65 * score_90 + 0.35 * score_180
-
-    return {
-        "config": config,
-        "score_90": score_90,
-        "score_180": score_180,
-        "combined_score": combined_score,
-        "summary_90": summary_90,
-        "summary_180": summary_180,
-    }
+    return evaluate_configs([config], data_cache_90, data_cache_180, market_status_map, backtester)[0]
 
 
 def main():
@@ -114,16 +139,24 @@ def main():
     start_90 = (end_date - timedelta(days=90)).strftime("%Y%m%d")
     start_180 = (end_date - timedelta(days=180)).strftime("%Y%m%d")
 
-    data_cache_90 = build_data_cache(ticker_list, data_manager, feature_eng, index_df, model, start_90)
-    data_cache_180 = build_data_cache(ticker_list, data_manager, feature_eng, index_df, model, start_180)
+    prediction_store = PredictionStore()
+    data_cache_90 = build_data_cache(
+        ticker_list, data_manager, feature_eng, index_df, model, start_90, prediction_store=prediction_store
+    )
+    data_cache_180 = build_data_cache(
+        ticker_list, data_manager, feature_eng, index_df, model, start_180, prediction_store=prediction_store
+    )
 
     trials = sample_configs()
-    evaluations = []
-    for idx, config in enumerate(trials, start=1):
-        evaluation = evaluate_config(config, data_cache_90, data_cache_180, market_status_map, backtester)
-        evaluations.append(evaluation)
-        if idx % 20 == 0:
-            print(f"Evaluated {idx}/{len(trials)} candidates...")
+    evaluations = evaluate_configs(
+        trials,
+        data_cache_90,
+        data_cache_180,
+        market_status_map,
+        backtester,
+        workers=settings.BACKTEST_WORKERS,
+    )
+    print(f"Evaluated {len(evaluations)} candidates.")
 
     evaluations.sort(key=lambda x: x["combined_score"], reverse=True)
     baseline = evaluations[0]
@@ -1,11 +1,96 @@
+import copy
+import math
+from dataclasses import dataclass, field
+
 import numpy as np
 import pandas as pd
 
 from config.settings import settings
+from src.backtest.metrics import equity_metrics, trade_win_rate
 from src.backtest.strategy_config import StrategyConfig
 from src.strategy.logic import RiskManager
 
 
+BAR_COLUMNS = ("open", "high", "low", "close", "atr")
+
+
+def extract_bars(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    bars = {column: df[column].to_numpy(dtype=float) for column in BAR_COLUMNS}
+    bars["trade_date"] = df["trade_date"].to_numpy()
+    return bars
+
+
+def rolling_high(high: np.ndarray, lookback: int) -> np.ndarray:
+    return pd.Series(high, dtype=float).rolling(window=lookback, min_periods=1).max().to_numpy()
+
+
+def equity_dtype(date_dtype: np.dtype) -> np.dtype:
+    return np.dtype([("date", date_dtype), ("equity", "f8")])
+
+
+def trade_dtype(date_dtype: np.dtype) -> np.dtype:
+    return np.dtype(
+        [
+            ("date", date_dtype),
+            ("action", "U13"),
+            ("price", "f8"),
+            ("pnl", "f8"),
+            ("score", "f8"),
+        ]
+    )
+
+
+def equity_curve_records(equity_curve: np.ndarray) -> list[dict]:
+    """Legacy list-of-dicts view of a structured equity curve."""
+    return [
+        {"date": date, "equity": equity}
+        for date, equity in zip(equity_curve["date"].tolist(), equity_curve["equity"].tolist())
+    ]
+
+
+def trade_records(trades: np.ndarray) -> list[dict]:
+    """Legacy list-of-dicts view of a structured trade log (BUY rows carry score, SELL rows carry pnl)."""
+    records = []
+    for date, action, price, pnl, score in trades.tolist():
+        record = {"date": date, "action": action, "price": price}
+        if action == "BUY":
+            record["score"] = score
+        else:
+            record["pnl"] = pnl
+        records.append(record)
+    return records
+
+
+@dataclass
+class BacktestState:
+    """Everything a run needs to continue bar by bar.
+
+    `pending` is the latest bar seen; its signal is acted on at the next bar's open, so it stays
+    pending until that bar arrives. Checkpoint with `checkpoint()` (or pickle) and keep advancing.
+    """
+
+    code: str
+    config: StrategyConfig
+    threshold: float
+    multiplier: float
+    cash: float
+    position: int = 0
+    entry_price: float = 0.0
+    trailing_stop: float = 0.0
+    peak_equity: float = 0.0
+    halted: bool = False
+    high_buffer: list[float] = field(default_factory=list)
+    # (trade_date, open, low, close, atr, rolling high, entry score, exit score) of the latest bar.
+    pending: tuple | None = None
+    equity_dates: list = field(default_factory=list)
+    equity: list[float] = field(default_factory=list)
+    positions: list[float] = field(default_factory=list)
+    trades: list[tuple] = field(default_factory=list)
+
+    def checkpoint(self) -> "BacktestState":
+        return copy.deepcopy(self)
+
+
 class Backtester:
     def __init__(self, initial_capital=100000.0):
         self.initial_capital = initial_capital
@@ -20,141 +105,196 @@ class Backtester:
         exit_probs: np.ndarray | None = None,
         config: StrategyConfig | None = None,
     ) -> dict:
-        cash = self.initial_capital
-        position = 0
-        equity_curve = []
-        trades = []
-        trailing_stop = 0.0
-        entry_price = 0.0
+        return self.run_bars(
+            extract_bars(df),
+            probs,
+            threshold=threshold,
+            code=code,
+            exit_probs=exit_probs,
+            config=config,
+        )
 
+    def run_bars(
+        self,
+        bars: dict[str, np.ndarray],
+        probs: np.ndarray,
+        threshold=0.6,
+        code: str = "",
+        exit_probs: np.ndarray | None = None,
+        config: StrategyConfig | None = None,
+    ) -> dict:
+        state = self.start(threshold=threshold, code=code, config=config)
+        self.advance(state, bars, probs, exit_probs)
+        return self.summarize(state)
+
+    def start(self, threshold=0.6, code: str = "", config: StrategyConfig | None = None) -> BacktestState:
         config = config or StrategyConfig.from_settings()
+        multiplier = config.atr_multiplier_aggressive if code in settings.AGGRESSIVE_TICKERS else config.atr_multiplier
+        return BacktestState(
+            code=code,
+            config=config,
+            threshold=threshold,
+            multiplier=multiplier,
+            cash=self.initial_capital,
+            peak_equity=self.initial_capital,
+        )
+
+    def advance(
+        self,
+        state: BacktestState,
+        bars: dict[str, np.ndarray],
+        probs: np.ndarray,
+        exit_probs: np.ndarray | None = None,
+    ) -> BacktestState:
+        """Feed the bars that follow `state` (in place); cost is proportional to the new bars only."""
+        config = state.config
         exit_probs = probs if exit_probs is None else exit_probs
+        lookback = config.exit_lookback_period
 
-        peak_equity = self.initial_capital
-        multiplier = config.atr_multiplier_aggressive if code in settings.AGGRESSIVE_TICKERS else config.atr_multiplier
+        highs = np.concatenate([np.asarray(state.high_buffer, dtype=float), np.asarray(bars["high"], dtype=float)])
+        new_highs = rolling_high(highs, lookback)[len(state.high_buffer) :]
+        state.high_buffer = highs[-lookback:].tolist()
 
-        for i in range(len(df) - 1):
-            date = df.iloc[i]["trade_date"]
-            close_price = df.iloc[i]["close"]
-            atr = df.iloc[i]["atr"]
-            entry_score = probs[i]
-            exit_score = exit_probs[i]
+        dates = np.asarray(bars["trade_date"]).astype(str).tolist()
+        opens = bars["open"].tolist()
+        lows = bars["low"].tolist()
+        closes = bars["close"].tolist()
+        atrs = bars["atr"].tolist()
+        recent_highs = new_highs.tolist()
+        entry_scores = np.asarray(probs, dtype=float).tolist()
+        exit_scores = np.asarray(exit_probs, dtype=float).tolist()
+        if state.pending is not None:
+            pending = state.pending
+            dates.insert(0, pending[0])
+            opens.insert(0, pending[1])
+            lows.insert(0, pending[2])
+            closes.insert(0, pending[3])
+            atrs.insert(0, pending[4])
+            recent_highs.insert(0, pending[5])
+            entry_scores.insert(0, pending[6])
+            exit_scores.insert(0, pending[7])
 
-            next_open = df.iloc[i + 1]["open"]
-            next_low = df.iloc[i + 1]["low"]
-            next_date = df.iloc[i + 1]["trade_date"]
+        n = len(closes)
+        if n == 0:
+            return state
+        state.pending = (
+            dates[-1],
+            opens[-1],
+            lows[-1],
+            closes[-1],
+            atrs[-1],
+            recent_highs[-1],
+            entry_scores[-1],
+            exit_scores[-1],
+        )
+        if state.halted:
+            return state
+
+        equity = state.equity
+        positions = state.positions
+        trades = state.trades
+
+        cash = state.cash
+        position = state.position
+        entry_price = state.entry_price
+        trailing_stop = state.trailing_stop
+        peak_equity = state.peak_equity
+        threshold = state.threshold
+        multiplier = state.multiplier
+        max_drawdown_stop = config.max_drawdown_stop
+        signal_exit_threshold = config.signal_exit_threshold
+        recorded = 0
 
+        for i in range(n - 1):
+            close_price = closes[i]
             current_equity = cash + position * close_price
-            equity_curve.append({"date": date, "equity": current_equity})
+            equity.append(current_equity)
+            positions.append(position)
+            recorded = i + 1
             if current_equity > peak_equity:
                 peak_equity = current_equity
 
             drawdown = (peak_equity - current_equity) / peak_equity if peak_equity > 0 else 0.0
-            if drawdown >= config.max_drawdown_stop:
+            if drawdown >= max_drawdown_stop:
                 if position > 0:
-                    sell_price = next_open
+                    sell_price = opens[i + 1]
                     cash += position * sell_price
-                    trades.append(
-                        {
-                            "date": next_date,
-                            "action": "SELL (MaxDD)",
-                            "price": sell_price,
-                            "pnl": (sell_price - entry_price) * position,
-                        }
-                    )
+                    trades.append((dates[i + 1], "SELL (MaxDD)", sell_price, (sell_price - entry_price) * position, np.nan))
                     position = 0
                     trailing_stop = 0.0
+                state.halted = True
                 break
 
             if position > 0:
-                if next_low < trailing_stop:
-                    sell_price = min(next_open, trailing_stop)
+                if lows[i + 1] < trailing_stop:
+                    sell_price = min(opens[i + 1], trailing_stop)
                     cash += position * sell_price
-                    trades.append(
-                        {
-                            "date": next_date,
-                            "action": "SELL (Stop)",
-                            "price": sell_price,
-                            "pnl": (sell_price - entry_price) * position,
-                        }
-                    )
+                    trades.append((dates[i + 1], "SELL (Stop)", sell_price, (sell_price - entry_price) * position, np.nan))
                     position = 0
                     trailing_stop = 0.0
                     continue
 
-                if exit_score is not None and np.isfinite(exit_score) and exit_score < config.signal_exit_threshold:
-                    sell_price = next_open
+                exit_score = exit_scores[i]
+                if math.isfinite(exit_score) and exit_score < signal_exit_threshold:
+                    sell_price = opens[i + 1]
                     cash += position * sell_price
-                    trades.append(
-                        {
-                            "date": next_date,
-                            "action": "SELL (Signal)",
-                            "price": sell_price,
-                            "pnl": (sell_price - entry_price) * position,
-                        }
-                    )
+                    trades.append((dates[i + 1], "SELL (Signal)", sell_price, (sell_price - entry_price) * position, np.nan))
                     position = 0
                     trailing_stop = 0.0
                     continue
 
-                window_start = max(0, i - config.exit_lookback_period + 1)
-                recent_high = df["high"].iloc[window_start : i + 1].max()
-                new_stop = recent_high - (multiplier * atr)
+                new_stop = recent_highs[i] - (multiplier * atrs[i])
                 if new_stop > trailing_stop:
                     trailing_stop = new_stop
 
             if position == 0:
-                if entry_score is not None and np.isfinite(entry_score) and entry_score > 0 and entry_score >= threshold:
-                    buy_price = next_open
+                entry_score = entry_scores[i]
+                if math.isfinite(entry_score) and entry_score > 0 and entry_score >= threshold:
+                    buy_price = opens[i + 1]
                     shares = int((cash * 0.99) / buy_price / 100) * 100
                     if shares > 0:
                         position = shares
                         cash -= shares * buy_price
                         entry_price = buy_price
-                        trailing_stop = buy_price - (multiplier * atr)
-                        trades.append(
-                            {
-                                "date": next_date,
-                                "action": "BUY",
-                                "price": buy_price,
-                                "score": entry_score,
-                            }
-                        )
-
-        final_equity = cash + position * df.iloc[-1]["close"]
-        equity_curve.append({"date": df.iloc[-1]["trade_date"], "equity": final_equity})
-
-        equity_values = np.array([p["equity"] for p in equity_curve], dtype=float)
-        daily_returns = np.diff(equity_values) / equity_values[:-1] if len(equity_values) > 1 else np.array([])
-        vol = float(np.std(daily_returns, ddof=1) * np.sqrt(252)) if len(daily_returns) > 1 else 0.0
-        sharpe = (
-            float((np.mean(daily_returns) / np.std(daily_returns, ddof=1)) * np.sqrt(252))
-            if len(daily_returns) > 1 and np.std(daily_returns, ddof=1) > 0
-            else 0.0
-        )
+                        trailing_stop = buy_price - (multiplier * atrs[i])
+                        trades.append((dates[i + 1], "BUY", buy_price, np.nan, entry_score))
+
+        state.equity_dates.extend(dates[:recorded])
+        state.cash = cash
+        state.position = position
+        state.entry_price = entry_price
+        state.trailing_stop = trailing_stop
+        state.peak_equity = peak_equity
+        return state
 
-        peak = -np.inf
-        max_drawdown = 0.0
-        for eq in equity_values:
-            if eq > peak:
-                peak = eq
-            if peak > 0:
-                max_drawdown = max(max_drawdown, (peak - eq) / peak)
+    def summarize(self, state: BacktestState) -> dict:
+        """Result dict for everything fed so far, marking any open position at the latest close."""
+        last_date, last_close = (state.pending[0], state.pending[3]) if state.pending is not None else ("", 0.0)
+        final_equity = state.cash + state.position * last_close
+        dates = np.array(state.equity_dates + [last_date], dtype=str)
+        equity_values = np.array(state.equity + [final_equity], dtype=float)
+        equity_curve = np.empty(len(dates), dtype=equity_dtype(dates.dtype))
+        equity_curve["date"] = dates
+        equity_curve["equity"] = equity_values
+        trade_log = np.array(state.trades, dtype=trade_dtype(dates.dtype))
 
+        metrics = equity_metrics(equity_values, np.array(state.positions + [state.position], dtype=float))
         total_return = (final_equity - self.initial_capital) / self.initial_capital
-        win_trades = [t for t in trades if t["action"].startswith("SELL") and t["pnl"] > 0]
-        loss_trades = [t for t in trades if t["action"].startswith("SELL") and t["pnl"] <= 0]
-        closed_trades = len(win_trades) + len(loss_trades)
-        win_rate = len(win_trades) / closed_trades if closed_trades > 0 else 0.0
+        sells = np.char.startswith(trade_log["action"], "SELL")
+        closed_trades = int(sells.sum())
+        win_rate = float(trade_win_rate((sells & (trade_log["pnl"] > 0)).sum(), closed_trades))
 
         return {
             "total_return": total_return,
             "win_rate": win_rate,
             "num_trades": closed_trades,
             "final_equity": final_equity,
-            "max_drawdown": max_drawdown,
-            "volatility": vol,
-            "sharpe": sharpe,
+            "max_drawdown": float(metrics["max_drawdown"]),
+            "volatility": float(metrics["volatility"]),
+            "sharpe": float(metrics["sharpe"]),
+            "sortino": float(metrics["sortino"]),
+            "calmar": float(metrics["calmar"]),
+            "exposure": float(metrics["exposure"]),
             "equity_curve": equity_curve,
-            "trades": trades,
+            "trades": trade_log,
         }
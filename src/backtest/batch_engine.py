@@ -0,0 +1,401 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from config import tickers
+from config.settings import settings
+from src.backtest.backtester import extract_bars, rolling_high
+from src.backtest.hybrid_runner import adjust_probs, market_status_series, rolling_quantile, use_dynamic_for_code
+from src.backtest.metrics import equity_metrics, summarize_runs, trade_win_rate
+from src.backtest.parallel import map_with_shared_arrays, resolve_workers, worker_arrays
+from src.backtest.strategy_config import StrategyConfig
+
+
+@dataclass
+class BatchBacktestResult:
+    """Metrics for K strategy variants x T tickers; every array is shaped (K, T)."""
+
+    codes: list[str]
+    labels: list
+    total_return: np.ndarray
+    win_rate: np.ndarray
+    num_trades: np.ndarray
+    final_equity: np.ndarray
+    max_drawdown: np.ndarray
+    volatility: np.ndarray
+    sharpe: np.ndarray
+    sortino: np.ndarray
+    calmar: np.ndarray
+    exposure: np.ndarray
+    bear_days: np.ndarray
+    use_dynamic: np.ndarray
+
+    def results_for(self, k: int) -> list[dict]:
+        results = []
+        for t, code in enumerate(self.codes):
+            results.append(
+                {
+                    "code": code,
+                    "name": tickers.TICKERS[code],
+                    "total_return": float(self.total_return[k, t]),
+                    "win_rate": float(self.win_rate[k, t]),
+                    "num_trades": int(self.num_trades[k, t]),
+                    "final_equity": float(self.final_equity[k, t]),
+                    "max_drawdown": float(self.max_drawdown[k, t]),
+                    "volatility": float(self.volatility[k, t]),
+                    "sharpe": float(self.sharpe[k, t]),
+                    "sortino": float(self.sortino[k, t]),
+                    "calmar": float(self.calmar[k, t]),
+                    "exposure": float(self.exposure[k, t]),
+                    "bear_days": int(self.bear_days[k, t]),
+                    "mode": "dynamic" if self.use_dynamic[k, t] else "fixed",
+                }
+            )
+        return results
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per (label, ticker); `frame.pivot(index="label", columns="code", values=...)` gives the grid."""
+        frame = pd.DataFrame(
+            {
+                "label": [label for label in self.labels for _ in self.codes],
+                "code": self.codes * len(self.labels),
+                "name": [tickers.TICKERS[code] for code in self.codes] * len(self.labels),
+            }
+        )
+        for field in _METRIC_FIELDS:
+            frame[field] = getattr(self, field).reshape(-1)
+        return frame
+
+
+@dataclass
+class BarBlock:
+    """Tickers aligned on bar index: arrays are (L, T) and padded with NaN past each ticker's last bar."""
+
+    codes: list[str]
+    lengths: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    atr: np.ndarray
+    probs: list[np.ndarray]
+    statuses: list[np.ndarray]
+
+
+def stack_bars(data_cache: dict[str, dict], market_status_map: dict[str, str]) -> BarBlock:
+    codes = list(data_cache)
+    lengths = np.array([len(data_cache[code]["test_df"]) for code in codes], dtype=np.int64)
+    max_len = int(lengths.max()) if len(codes) else 0
+
+    columns = {name: np.full((max_len, len(codes)), np.nan) for name in ("open", "high", "low", "close", "atr")}
+    probs = []
+    statuses = []
+    for t, code in enumerate(codes):
+        test_df = data_cache[code]["test_df"]
+        bars = extract_bars(test_df)
+        for name, block in columns.items():
+            block[: lengths[t], t] = bars[name]
+        probs.append(np.asarray(data_cache[code]["probs"]))
+        statuses.append(market_status_series(test_df, market_status_map))
+
+    return BarBlock(codes=codes, lengths=lengths, probs=probs, statuses=statuses, **columns)
+
+
+def _signal_key(code: str, use_dynamic: bool, config: StrategyConfig) -> tuple:
+    dynamic_params = (
+        (
+            config.dynamic_threshold_lookback,
+            config.dynamic_threshold_quantile,
+            config.dynamic_threshold_min,
+            config.dynamic_threshold_max,
+        )
+        if use_dynamic
+        else None
+    )
+    return (
+        code,
+        use_dynamic,
+        config.bull_base_threshold,
+        config.bull_aggressive_threshold,
+        config.volatile_threshold,
+        config.bear_threshold,
+        dynamic_params,
+    )
+
+
+def build_signal_block(
+    block: BarBlock,
+    configs: list[StrategyConfig],
+    threshold_overrides: list[dict[str, float] | None],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Adjusted entry/exit scores shaped (L, K, T); identical signal settings are computed once."""
+    max_len = block.close.shape[0]
+    shape = (max_len, len(configs), len(block.codes))
+    entry = np.full(shape, np.nan)
+    exit_ = np.full(shape, np.nan)
+    bear_days = np.zeros(shape[1:], dtype=np.int64)
+    use_dynamic = np.zeros(shape[1:], dtype=bool)
+
+    memo: dict[tuple, tuple[np.ndarray, np.ndarray, int]] = {}
+    quantile_memo: dict[tuple, np.ndarray] = {}
+    for k, (config, overrides) in enumerate(zip(configs, threshold_overrides)):
+        for t, code in enumerate(block.codes):
+            dynamic = use_dynamic_for_code(code, overrides, config)
+            override = None if overrides is None else overrides.get(code)
+            key = _signal_key(code, dynamic, config) + (overrides is not None, override)
+            if key not in memo:
+                quantiles = None
+                if dynamic:
+                    quantile_key = (t, config.dynamic_threshold_lookback, config.dynamic_threshold_quantile)
+                    if quantile_key not in quantile_memo:
+                        quantile_memo[quantile_key] = rolling_quantile(
+                            block.probs[t],
+                            config.dynamic_threshold_lookback,
+                            config.dynamic_threshold_quantile,
+                        )
+                    quantiles = quantile_memo[quantile_key]
+                memo[key] = adjust_probs(block.probs[t], block.statuses[t], code, dynamic, overrides, config, quantiles)
+            entry_probs, exit_probs, bear = memo[key]
+            length = block.lengths[t]
+            entry[:length, k, t] = entry_probs
+            exit_[:length, k, t] = exit_probs
+            bear_days[k, t] = bear
+            use_dynamic[k, t] = dynamic
+    return entry, exit_, bear_days, use_dynamic
+
+
+def simulate_block(
+    block: BarBlock,
+    entry: np.ndarray,
+    exit_: np.ndarray,
+    configs: list[StrategyConfig],
+    initial_capital: float = 100000.0,
+    threshold: float = 0.0,
+) -> dict[str, np.ndarray]:
+    """Step every (variant, ticker) pair together; mirrors Backtester.run_bars bar for bar."""
+    max_len, n_codes = block.close.shape
+    n_variants = len(configs)
+    shape = (n_variants, n_codes)
+
+    aggressive = np.array([code in settings.AGGRESSIVE_TICKERS for code in block.codes])
+    multiplier = np.where(
+        aggressive[None, :],
+        np.array([c.atr_multiplier_aggressive for c in configs])[:, None],
+        np.array([c.atr_multiplier for c in configs])[:, None],
+    )
+    max_drawdown_stop = np.array([c.max_drawdown_stop for c in configs])[:, None]
+    signal_exit_threshold = np.array([c.signal_exit_threshold for c in configs])[:, None]
+
+    lookbacks = sorted({c.exit_lookback_period for c in configs})
+    lookback_index = np.array([lookbacks.index(c.exit_lookback_period) for c in configs])
+    recent_high = np.full((len(lookbacks), max_len, n_codes), np.nan)
+    for li, lookback in enumerate(lookbacks):
+        for t in range(n_codes):
+            length = block.lengths[t]
+            recent_high[li, :length, t] = rolling_high(block.high[:length, t], lookback)
+
+    cash = np.full(shape, float(initial_capital))
+    position = np.zeros(shape)
+    entry_price = np.zeros(shape)
+    trailing_stop = np.zeros(shape)
+    peak_equity = np.full(shape, float(initial_capital))
+    halted = np.zeros(shape, dtype=bool)
+    end_index = np.broadcast_to(block.lengths - 1, shape).copy()
+    wins = np.zeros(shape, dtype=np.int64)
+    closed = np.zeros(shape, dtype=np.int64)
+    equity = np.full((max_len,) + shape, np.nan)
+    held = np.full((max_len,) + shape, np.nan)
+    last_bar = block.lengths[None, :] - 1
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for j in range(max_len - 1):
+            live = (j < last_bar) & ~halted
+            if not live.any():
+                break
+
+            current_equity = cash + position * block.close[j]
+            equity[j] = np.where(live, current_equity, equity[j])
+            held[j] = np.where(live, position, held[j])
+            peak_equity = np.where(live & (current_equity > peak_equity), current_equity, peak_equity)
+            drawdown = np.where(peak_equity > 0, (peak_equity - current_equity) / peak_equity, 0.0)
+
+            next_open = block.open[j + 1]
+            halt = live & (drawdown >= max_drawdown_stop)
+            stepping = live & ~halt
+            was_flat = position == 0
+            holding = stepping & ~was_flat
+
+            stop_hit = holding & (block.low[j + 1] < trailing_stop)
+            exit_score = exit_[j]
+            signal_exit = holding & ~stop_hit & np.isfinite(exit_score) & (exit_score < signal_exit_threshold)
+            sells = (halt & ~was_flat) | stop_hit | signal_exit
+            sell_price = np.where(stop_hit, np.minimum(next_open, trailing_stop), next_open)
+            pnl = (sell_price - entry_price) * position
+            cash = np.where(sells, cash + position * sell_price, cash)
+            wins += sells & (pnl > 0)
+            closed += sells
+            position = np.where(sells, 0.0, position)
+            trailing_stop = np.where(sells, 0.0, trailing_stop)
+            end_index = np.where(halt, j + 1, end_index)
+            halted |= halt
+
+            still_holding = holding & ~stop_hit & ~signal_exit
+            new_stop = recent_high[lookback_index, j] - (multiplier * block.atr[j])
+            trailing_stop = np.where(still_holding & (new_stop > trailing_stop), new_stop, trailing_stop)
+
+            score = entry[j]
+            wants = stepping & was_flat & np.isfinite(score) & (score > 0) & (score >= threshold)
+            shares = np.floor((cash * 0.99) / next_open / 100) * 100
+            buys = wants & (shares > 0)
+            position = np.where(buys, shares, position)
+            cash = np.where(buys, cash - shares * next_open, cash)
+            entry_price = np.where(buys, next_open, entry_price)
+            trailing_stop = np.where(buys, next_open - (multiplier * block.atr[j]), trailing_stop)
+
+    last_close = block.close[block.lengths - 1, np.arange(n_codes)] if n_codes else np.zeros(0)
+    final_equity = cash + position * last_close
+    np.put_along_axis(equity, end_index[None], final_equity[None], axis=0)
+    np.put_along_axis(held, end_index[None], position[None], axis=0)
+
+    return {
+        "equity": equity,
+        "position": held,
+        "end_index": end_index,
+        "final_equity": final_equity,
+        "wins": wins,
+        "closed": closed,
+    }
+
+
+_BLOCK_KEY = "__block__"
+_BLOCK_FIELDS = ("lengths", "open", "high", "low", "close", "atr")
+_METRIC_FIELDS = (
+    "total_return",
+    "win_rate",
+    "num_trades",
+    "final_equity",
+    "max_drawdown",
+    "volatility",
+    "sharpe",
+    "sortino",
+    "calmar",
+    "exposure",
+    "bear_days",
+    "use_dynamic",
+)
+
+
+def _score_variants(
+    block: BarBlock,
+    configs: list[StrategyConfig],
+    threshold_overrides: list[dict[str, float] | None],
+    initial_capital: float,
+) -> dict[str, np.ndarray]:
+    entry, exit_, bear_days, use_dynamic = build_signal_block(block, configs, threshold_overrides)
+    simulated = simulate_block(block, entry, exit_, configs, initial_capital=initial_capital)
+    metrics = equity_metrics(simulated["equity"], simulated["position"])
+
+    return {
+        "total_return": (simulated["final_equity"] - initial_capital) / initial_capital,
+        "win_rate": trade_win_rate(simulated["wins"], simulated["closed"]),
+        "num_trades": simulated["closed"],
+        "final_equity": simulated["final_equity"],
+        **metrics,
+        "bear_days": bear_days,
+        "use_dynamic": use_dynamic,
+    }
+
+
+def _score_variants_task(task: tuple) -> dict[str, np.ndarray]:
+    codes, configs, threshold_overrides, initial_capital = task
+    shared = worker_arrays(_BLOCK_KEY)
+    block = BarBlock(
+        codes=codes,
+        probs=[worker_arrays(code)["probs"] for code in codes],
+        statuses=[worker_arrays(code)["statuses"] for code in codes],
+        **{field: shared[field] for field in _BLOCK_FIELDS},
+    )
+    return _score_variants(block, configs, threshold_overrides, initial_capital)
+
+
+def run_batched_backtests(
+    data_cache: dict[str, dict],
+    market_status_map: dict[str, str],
+    configs: list[StrategyConfig],
+    threshold_overrides: list[dict[str, float] | None] | None = None,
+    initial_capital: float = 100000.0,
+    labels: list | None = None,
+    workers: int | None = None,
+) -> BatchBacktestResult:
+    """Backtest K (config, overrides) variants over every ticker in one vectorized pass.
+
+    With `workers` > 1 (0 = all cores) the variants are split into contiguous chunks that run
+    in a process pool against one shared copy of the stacked bars.
+    """
+    threshold_overrides = threshold_overrides or [None] * len(configs)
+    block = stack_bars(data_cache, market_status_map)
+
+    workers = min(resolve_workers(workers), len(configs))
+    if workers > 1:
+        groups = {_BLOCK_KEY: {field: getattr(block, field) for field in _BLOCK_FIELDS}}
+        for code, probs, statuses in zip(block.codes, block.probs, block.statuses):
+            groups[code] = {"probs": probs, "statuses": statuses}
+        bounds = np.linspace(0, len(configs), workers + 1).astype(int)
+        tasks = [
+            (block.codes, configs[lo:hi], threshold_overrides[lo:hi], initial_capital)
+            for lo, hi in zip(bounds[:-1], bounds[1:])
+        ]
+        chunks = map_with_shared_arrays(_score_variants_task, tasks, groups, workers)
+        scored = {field: np.concatenate([chunk[field] for chunk in chunks]) for field in _METRIC_FIELDS}
+    else:
+        scored = _score_variants(block, configs, threshold_overrides, initial_capital)
+
+    return BatchBacktestResult(
+        codes=block.codes,
+        labels=list(configs) if labels is None else list(labels),
+        **scored,
+    )
+
+
+def sweep_thresholds(
+    data_cache: dict[str, dict],
+    market_status_map: dict[str, str],
+    thresholds: list[float],
+    config: StrategyConfig | None = None,
+    initial_capital: float = 100000.0,
+    workers: int | None = None,
+) -> BatchBacktestResult:
+    """Backtest every ticker once per bull-threshold override in a single batched simulation.
+
+    Equivalent to calling `run_backtest_for_cache` with `{code: threshold}` overrides for each threshold;
+    the result is a (threshold x ticker) table labelled by threshold.
+    """
+    config = config or StrategyConfig.from_settings()
+    thresholds = [float(threshold) for threshold in thresholds]
+    return run_batched_backtests(
+        data_cache,
+        market_status_map,
+        [config] * len(thresholds),
+        threshold_overrides=[{code: threshold for code in data_cache} for threshold in thresholds],
+        initial_capital=initial_capital,
+        labels=thresholds,
+        workers=workers,
+    )
+
+
+def summarize_batch(result: BatchBacktestResult) -> list[dict[str, float]]:
+    """Vectorized `summarize_results` for every variant of a batch."""
+    summary = summarize_runs(
+        result.total_return,
+        result.win_rate,
+        result.num_trades,
+        result.max_drawdown,
+        result.volatility,
+    )
+    return [
+        {key: int(values[k]) if key == "total_trades" else float(values[k]) for key, values in summary.items()}
+        for k in range(len(result.labels))
+    ]
@@ -1,17 +1,25 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 import numpy as np
 import pandas as pd
 
 from config import tickers
 from config.settings import settings
-from src.backtest.backtester import Backtester
+from src.backtest.backtester import BAR_COLUMNS, Backtester, extract_bars
+from src.backtest.metrics import runs_from_results, summarize_runs
+from src.backtest.parallel import map_with_shared_arrays, resolve_workers, worker_arrays
+from src.backtest.result_cache import BacktestResultCache, data_version, result_key
 from src.backtest.strategy_config import StrategyConfig
 from src.data_loader.data_manager import DataManager
 from src.features.technical import FeatureEngineer
-from src.models.xgb_model import XGBoostModel
+from src.models.prediction_store import PredictionStore
 from src.strategy.logic import StrategyFilter
 
+if TYPE_CHECKING:
+    from src.models.xgb_model import XGBoostModel
+
 
 def prepare_index_data(
     data_manager: DataManager,
@@ -30,15 +38,14 @@ def prepare_index_data(
     return index_df, market_status_map
 
 
-def prepare_ticker_dataset(
+def _ticker_test_frame(
     code: str,
     data_manager: DataManager,
     feature_eng: FeatureEngineer,
     index_df: pd.DataFrame,
-    model: XGBoostModel,
     start_date: str,
     end_date: str | None = None,
-) -> dict | None:
+) -> pd.DataFrame | None:
     df = data_manager.update_and_get_data(code)
     if df.empty:
         return None
@@ -54,6 +61,21 @@ def prepare_ticker_dataset(
 
     if len(test_df) < 10:
         return None
+    return test_df
+
+
+def prepare_ticker_dataset(
+    code: str,
+    data_manager: DataManager,
+    feature_eng: FeatureEngineer,
+    index_df: pd.DataFrame,
+    model: XGBoostModel,
+    start_date: str,
+    end_date: str | None = None,
+) -> dict | None:
+    test_df = _ticker_test_frame(code, data_manager, feature_eng, index_df, start_date, end_date)
+    if test_df is None:
+        return None
 
     probs = model.predict_batch(test_df)
     return {"test_df": test_df, "probs": probs}
@@ -76,26 +98,82 @@ def use_dynamic_for_code(
     return config.use_dynamic_threshold
 
 
-def _resolve_bull_threshold(
+def market_status_series(test_df: pd.DataFrame, market_status_map: dict[str, str]) -> np.ndarray:
+    statuses = test_df["trade_date"].astype(str).map(market_status_map).fillna("Volatile Market")
+    return statuses.to_numpy(dtype=object)
+
+
+def rolling_quantile(probs: np.ndarray, lookback: int, quantile: float) -> np.ndarray:
+    quantiles = np.empty(len(probs), dtype=float)
+    for i in range(min(lookback - 1, len(probs))):
+        quantiles[i] = np.quantile(probs[: i + 1], quantile)
+    if len(probs) >= lookback:
+        windows = np.lib.stride_tricks.sliding_window_view(probs, lookback)
+        quantiles[lookback - 1 :] = np.quantile(windows, quantile, axis=1)
+    return quantiles
+
+
+def dynamic_threshold_series(
+    probs: np.ndarray,
+    config: StrategyConfig,
+    quantiles: np.ndarray | None = None,
+) -> np.ndarray:
+    if quantiles is None:
+        quantiles = rolling_quantile(probs, config.dynamic_threshold_lookback, config.dynamic_threshold_quantile)
+    return np.array(
+        [
+            round(max(config.dynamic_threshold_min, min(config.dynamic_threshold_max, float(value))), 4)
+            for value in quantiles
+        ],
+        dtype=float,
+    )
+
+
+def bull_threshold_series(
     probs: np.ndarray,
-    i: int,
     code: str,
     use_dynamic: bool,
     threshold_overrides: dict[str, float] | None,
     config: StrategyConfig,
-) -> float:
-    threshold = None
+    dynamic_quantiles: np.ndarray | None = None,
+) -> np.ndarray:
+    if threshold_overrides is not None and code in threshold_overrides:
+        return np.full(len(probs), round(float(threshold_overrides[code]), 4))
     if use_dynamic:
-        window_start = max(0, i - config.dynamic_threshold_lookback + 1)
-        threshold = float(np.quantile(probs[window_start : i + 1], config.dynamic_threshold_quantile))
-        threshold = max(config.dynamic_threshold_min, min(config.dynamic_threshold_max, threshold))
-    if threshold_overrides is not None:
-        threshold = threshold_overrides.get(code, threshold)
-    if threshold is None:
-        threshold = settings.TICKER_BULL_THRESHOLDS.get(code)
+        return dynamic_threshold_series(probs, config, dynamic_quantiles)
+    threshold = settings.TICKER_BULL_THRESHOLDS.get(code)
     if threshold is None:
         threshold = config.bull_aggressive_threshold if code in settings.AGGRESSIVE_TICKERS else config.bull_base_threshold
-    return round(float(threshold), 4)
+    return np.full(len(probs), round(float(threshold), 4))
+
+
+def adjust_probs(
+    probs: np.ndarray,
+    statuses: np.ndarray,
+    code: str,
+    use_dynamic: bool,
+    threshold_overrides: dict[str, float] | None,
+    config: StrategyConfig,
+    dynamic_quantiles: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray, int]:
+    raw = np.asarray(probs)
+    if not np.issubdtype(raw.dtype, np.floating):
+        raw = raw.astype(float)
+
+    is_bear = statuses == "Bear Market"
+    is_volatile = statuses == "Volatile Market"
+    is_bull = ~(is_bear | is_volatile)
+
+    thresholds = np.where(is_bear, config.bear_threshold, config.volatile_threshold)
+    if is_bull.any():
+        bull_thresholds = bull_threshold_series(raw, code, use_dynamic, threshold_overrides, config, dynamic_quantiles)
+        thresholds = np.where(is_bull, bull_thresholds, thresholds)
+
+    # Compare in the score dtype so float32 model output is gated exactly as a scalar comparison would.
+    entry_probs = np.where(raw >= thresholds.astype(raw.dtype), raw, 0.0).astype(float)
+    bear_blocked = is_bear & (raw < config.bear_threshold)
+    exit_probs = np.where(bear_blocked, 0.0, raw).astype(float)
+    return entry_probs, exit_probs, int(bear_blocked.sum())
 
 
 def build_adjusted_probs(
@@ -108,38 +186,62 @@ def build_adjusted_probs(
     config: StrategyConfig | None = None,
 ) -> tuple[np.ndarray, np.ndarray, int]:
     config = config or StrategyConfig.from_settings()
-    entry_probs = []
-    exit_probs = []
-    bear_days = 0
-
-    for i, raw_prob in enumerate(probs):
-        trade_date = str(test_df.iloc[i]["trade_date"])
-        current_status = market_status_map.get(trade_date, "Volatile Market")
-
-        if current_status == "Bear Market":
-            threshold = config.bear_threshold
-            if raw_prob < threshold:
-                bear_days += 1
-        elif current_status == "Volatile Market":
-            threshold = config.volatile_threshold
-        else:
-            threshold = _resolve_bull_threshold(
-                probs,
-                i,
-                code,
-                use_dynamic,
-                threshold_overrides,
-                config,
-            )
-
-        entry_probs.append(raw_prob if raw_prob >= threshold else 0.0)
+    return adjust_probs(
+        probs,
+        market_status_series(test_df, market_status_map),
+        code,
+        use_dynamic,
+        threshold_overrides,
+        config,
+    )
 
-        exit_prob = raw_prob
-        if current_status == "Bear Market" and raw_prob < config.bear_threshold:
-            exit_prob = 0.0
-        exit_probs.append(exit_prob)
 
-    return np.array(entry_probs), np.array(exit_probs), bear_days
+def _run_ticker_backtest(
+    code: str,
+    bars: dict[str, np.ndarray],
+    probs: np.ndarray,
+    statuses: np.ndarray,
+    backtester: Backtester,
+    threshold_overrides: dict[str, float] | None,
+    config: StrategyConfig,
+) -> dict:
+    use_dynamic = use_dynamic_for_code(code, threshold_overrides, config)
+    entry_probs, exit_probs, bear_days = adjust_probs(
+        probs,
+        statuses,
+        code,
+        use_dynamic,
+        threshold_overrides,
+        config,
+    )
+    result = backtester.run_bars(
+        bars,
+        entry_probs,
+        threshold=0.0,
+        code=code,
+        exit_probs=exit_probs,
+        config=config,
+    )
+    result["code"] = code
+    result["name"] = tickers.TICKERS[code]
+    result["bear_days"] = bear_days
+    result["mode"] = "dynamic" if use_dynamic else "fixed"
+    return result
+
+
+def _run_ticker_task(task: tuple) -> dict:
+    code, initial_capital, threshold_overrides, config = task
+    arrays = worker_arrays(code)
+    bars = {name: arrays[name] for name in (*BAR_COLUMNS, "trade_date")}
+    return _run_ticker_backtest(
+        code,
+        bars,
+        arrays["probs"],
+        arrays["statuses"],
+        Backtester(initial_capital),
+        threshold_overrides,
+        config,
+    )
 
 
 def run_backtest_for_cache(
@@ -148,56 +250,70 @@ def run_backtest_for_cache(
     market_status_map: dict[str, str],
     threshold_overrides: dict[str, float] | None = None,
     config: StrategyConfig | None = None,
+    workers: int | None = None,
+    result_cache: BacktestResultCache | None = None,
+    window: int | str | None = None,
+    model_fingerprint: str = "",
 ) -> list[dict]:
-    config = config or StrategyConfig.from_settings()
-    results = []
+    """Backtest every cached ticker; `workers` > 1 (or 0 for all cores) fans tickers out to a process pool.
 
+    With a `result_cache`, tickers whose inputs, model and config are unchanged reuse their stored result.
+    """
+    config = config or StrategyConfig.from_settings()
+    inputs = {}
     for code, payload in data_cache.items():
-        test_df = payload["test_df"]
-        probs = payload["probs"]
-        use_dynamic = use_dynamic_for_code(code, threshold_overrides, config)
-        entry_probs, exit_probs, bear_days = build_adjusted_probs(
-            test_df,
-            probs,
-            market_status_map,
-            code,
-            use_dynamic,
-            threshold_overrides,
-            config,
-        )
-        result = backtester.run(
-            test_df,
-            entry_probs,
-            threshold=0.0,
-            code=code,
-            exit_probs=exit_probs,
-            config=config,
-        )
-        result["code"] = code
-        result["name"] = tickers.TICKERS[code]
-        result["bear_days"] = bear_days
-        result["mode"] = "dynamic" if use_dynamic else "fixed"
-        results.append(result)
-
-    return results
+        arrays = extract_bars(payload["test_df"])
+        arrays["probs"] = np.asarray(payload["probs"])
+        arrays["statuses"] = market_status_series(payload["test_df"], market_status_map)
+        inputs[code] = arrays
+
+    keys: dict[str, str] = {}
+    cached: dict[str, dict] = {}
+    if result_cache is not None:
+        keys = {
+            code: result_key(
+                code,
+                window,
+                data_version(arrays),
+                model_fingerprint,
+                config,
+                threshold_overrides,
+                backtester.initial_capital,
+            )
+            for code, arrays in inputs.items()
+        }
+        hits = result_cache.get_many(list(keys.values()))
+        cached = {code: hits[key] for code, key in keys.items() if key in hits}
+
+    pending = {code: arrays for code, arrays in inputs.items() if code not in cached}
+    workers = resolve_workers(workers)
+    if workers > 1 and len(pending) > 1:
+        tasks = [(code, backtester.initial_capital, threshold_overrides, config) for code in pending]
+        computed = map_with_shared_arrays(_run_ticker_task, tasks, pending, workers)
+    else:
+        computed = [
+            _run_ticker_backtest(
+                code,
+                {name: arrays[name] for name in (*BAR_COLUMNS, "trade_date")},
+                arrays["probs"],
+                arrays["statuses"],
+                backtester,
+                threshold_overrides,
+                config,
+            )
+            for code, arrays in pending.items()
+        ]
+    fresh = dict(zip(pending, computed))
+
+    if result_cache is not None:
+        result_cache.put_many({keys[code]: result for code, result in fresh.items()})
+    return [cached[code] if code in cached else fresh[code] for code in inputs]
 
 
 def summarize_results(results: list[dict]) -> dict[str, float]:
-    total_trades = sum(r["num_trades"] for r in results)
-    winning_trades = sum(int(round(r["win_rate"] * r["num_trades"])) for r in results)
-    avg_return = float(np.mean([r["total_return"] for r in results])) if results else 0.0
-    avg_max_drawdown = float(np.mean([r["max_drawdown"] for r in results])) if results else 0.0
-    avg_volatility = float(np.mean([r["volatility"] for r in results])) if results else 0.0
-    positive_ratio = float(np.mean([r["total_return"] > 0 for r in results])) if results else 0.0
-    overall_win_rate = winning_trades / total_trades if total_trades > 0 else 0.0
-    return {
-        "avg_return": avg_return,
-        "avg_max_drawdown": avg_max_drawdown,
-        "avg_volatility": avg_volatility,
-        "positive_ratio": positive_ratio,
-        "overall_win_rate": overall_win_rate,
-        "total_trades": total_trades,
-    }
+    runs = runs_from_results(results, ("total_return", "win_rate", "num_trades", "max_drawdown", "volatility"))
+    summary = summarize_runs(**runs)
+    return {key: int(value) if key == "total_trades" else float(value) for key, value in summary.items()}
 
 
 def objective_score(summary: dict[str, float]) -> float:
@@ -218,18 +334,29 @@ def build_data_cache(
     model: XGBoostModel,
     start_date: str,
     end_date: str | None = None,
+    prediction_store: PredictionStore | None = None,
 ) -> dict[str, dict]:
-    data_cache: dict[str, dict] = {}
+    """Feature frames and model scores per ticker; with a `prediction_store` only unseen rows are scored."""
+    if prediction_store is None:
+        data_cache: dict[str, dict] = {}
+        for code in codes:
+            dataset = prepare_ticker_dataset(
+                code,
+                data_manager,
+                feature_eng,
+                index_df,
+                model,
+                start_date,
+                end_date,
+            )
+            if dataset is not None:
+                data_cache[code] = dataset
+        return data_cache
+
+    frames = {}
     for code in codes:
-        dataset = prepare_ticker_dataset(
-            code,
-            data_manager,
-            feature_eng,
-            index_df,
-            model,
-            start_date,
-            end_date,
-        )
-        if dataset is not None:
-            data_cache[code] = dataset
-    return data_cache
+        test_df = _ticker_test_frame(code, data_manager, feature_eng, index_df, start_date, end_date)
+        if test_df is not None:
+            frames[code] = test_df
+    scores = prediction_store.score_many(model, frames)
+    return {code: {"test_df": test_df, "probs": scores[code]} for code, test_df in frames.items()}
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import warnings
+from typing import Iterable
+
+import numpy as np
+
+
+TRADING_DAYS = 252
+RUN_FIELDS = ("total_return", "win_rate", "num_trades", "max_drawdown", "volatility", "sharpe")
+
+
+def period_returns(equity: np.ndarray) -> np.ndarray:
+    """Bar-to-bar returns along axis 0; NaN wherever either bar is padding."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.diff(equity, axis=0) / equity[:-1]
+
+
+def drawdown_series(equity: np.ndarray) -> np.ndarray:
+    """Fractional drawdown from the running peak along axis 0 (0.0 on padding)."""
+    valid = ~np.isnan(equity)
+    peaks = np.maximum.accumulate(np.where(valid, equity, -np.inf), axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(valid & (peaks > 0), (peaks - equity) / peaks, 0.0)
+
+
+def max_drawdown(equity: np.ndarray) -> np.ndarray:
+    return drawdown_series(equity).max(axis=0, initial=0.0)
+
+
+def exposure(position: np.ndarray) -> np.ndarray:
+    """Share of recorded bars spent holding a position; `position` is NaN-padded like equity."""
+    valid = ~np.isnan(position)
+    bars = valid.sum(axis=0)
+    held = (valid & (position > 0)).sum(axis=0)
+    return np.divide(held, bars, out=np.zeros(bars.shape), where=bars > 0)
+
+
+def trade_win_rate(wins, closed) -> np.ndarray:
+    wins = np.asarray(wins, dtype=float)
+    closed = np.asarray(closed, dtype=float)
+    return np.divide(wins, closed, out=np.zeros(np.broadcast(wins, closed).shape), where=closed > 0)
+
+
+def equity_metrics(equity: np.ndarray, position: np.ndarray | None = None) -> dict[str, np.ndarray]:
+    """Risk metrics for equity curves laid out as (bars, ...) with NaN past each run's end.
+
+    Every trailing axis is a separate run, so a (bars, configs, tickers) block is scored in one call.
+    """
+    equity = np.asarray(equity, dtype=float)
+    batch_shape = equity.shape[1:]
+    returns = period_returns(equity)
+    counts = (~np.isnan(returns)).sum(axis=0)
+    drawdown = max_drawdown(equity)
+
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        if len(returns):
+            std = np.nanstd(returns, axis=0, ddof=1)
+            mean = np.nanmean(returns, axis=0)
+            downside = np.sqrt(np.nanmean(np.minimum(returns, 0.0) ** 2, axis=0))
+        else:
+            std = mean = downside = np.zeros(batch_shape)
+        enough = counts > 1
+        volatility = np.where(enough, std * np.sqrt(TRADING_DAYS), 0.0)
+        sharpe = np.where(enough & (std > 0), mean / std * np.sqrt(TRADING_DAYS), 0.0)
+        sortino = np.where(enough & (downside > 0), mean / downside * np.sqrt(TRADING_DAYS), 0.0)
+
+        if len(equity):
+            growth = np.take_along_axis(equity, counts[None], axis=0)[0] / equity[0]
+        else:
+            growth = np.zeros(batch_shape)
+        annual_return = np.where(
+            (counts > 0) & (growth > 0),
+            growth ** (TRADING_DAYS / np.maximum(counts, 1)) - 1.0,
+            0.0,
+        )
+        calmar = np.where(drawdown > 0, annual_return / drawdown, 0.0)
+
+    metrics = {
+        "max_drawdown": drawdown,
+        "volatility": volatility,
+        "sharpe": sharpe,
+        "sortino": sortino,
+        "calmar": calmar,
+    }
+    if position is not None:
+        metrics["exposure"] = exposure(np.asarray(position, dtype=float))
+    return metrics
+
+
+def runs_from_results(results: Iterable[dict], fields: Iterable[str] = RUN_FIELDS) -> dict[str, np.ndarray]:
+    """Column arrays from a list of per-ticker result dicts."""
+    results = list(results)
+    return {field: np.array([r[field] for r in results], dtype=float) for field in fields}
+
+
+def summarize_runs(
+    total_return: np.ndarray,
+    win_rate: np.ndarray,
+    num_trades: np.ndarray,
+    max_drawdown: np.ndarray,
+    volatility: np.ndarray,
+    sharpe: np.ndarray | None = None,
+) -> dict[str, np.ndarray]:
+    """Cross-ticker aggregates along the last axis; a (configs, tickers) block gives one row per config."""
+    total_return = np.asarray(total_return, dtype=float)
+    num_trades = np.asarray(num_trades, dtype=float)
+    batch_shape = total_return.shape[:-1]
+    n_runs = total_return.shape[-1]
+
+    def mean(values) -> np.ndarray:
+        values = np.asarray(values, dtype=float)
+        return values.mean(axis=-1) if n_runs else np.zeros(batch_shape)
+
+    total_trades = num_trades.sum(axis=-1).astype(np.int64)
+    winning_trades = np.rint(np.asarray(win_rate, dtype=float) * num_trades).astype(np.int64).sum(axis=-1)
+    summary = {
+        "avg_return": mean(total_return),
+        "avg_max_drawdown": mean(max_drawdown),
+        "avg_volatility": mean(volatility),
+        "positive_ratio": mean(total_return > 0),
+        "overall_win_rate": trade_win_rate(winning_trades, total_trades),
+        "total_trades": total_trades,
+    }
+    if sharpe is not None:
+        summary["avg_sharpe"] = mean(sharpe)
+    return summary
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Iterable
+
+import numpy as np
+
+
+_ALIGNMENT = 64
+_worker_arrays: dict[str, dict[str, np.ndarray]] = {}
+_worker_memory: shared_memory.SharedMemory | None = None
+
+
+def resolve_workers(workers: int | None) -> int:
+    """None runs serially, 0 (or any non-positive value) uses every core."""
+    if workers is None:
+        return 1
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+class SharedArrayPack:
+    """Copies groups of arrays into one shared-memory block that pool workers map by name."""
+
+    def __init__(self, groups: dict[str, dict[str, np.ndarray]]):
+        self.layout: dict[str, dict[str, tuple[int, tuple[int, ...], str]]] = {}
+        prepared: list[tuple[int, np.ndarray]] = []
+        offset = 0
+        for key, arrays in groups.items():
+            entries = {}
+            for name, array in arrays.items():
+                array = np.asarray(array)
+                if array.dtype == object:
+                    array = array.astype(str)
+                array = np.ascontiguousarray(array)
+                offset = -(-offset // _ALIGNMENT) * _ALIGNMENT
+                entries[name] = (offset, array.shape, array.dtype.str)
+                prepared.append((offset, array))
+                offset += array.nbytes
+            self.layout[key] = entries
+
+        self.memory = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for start, array in prepared:
+            np.ndarray(array.shape, dtype=array.dtype, buffer=self.memory.buf, offset=start)[...] = array
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def close(self) -> None:
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self) -> "SharedArrayPack":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _attach_worker(name: str, layout: dict[str, dict[str, tuple[int, tuple[int, ...], str]]]) -> None:
+    global _worker_memory
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    _worker_arrays.clear()
+    for key, entries in layout.items():
+        _worker_arrays[key] = {
+            array_name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=_worker_memory.buf, offset=start)
+            for array_name, (start, shape, dtype) in entries.items()
+        }
+
+
+def worker_arrays(key: str) -> dict[str, np.ndarray]:
+    """Read-only views of one group inside a pool worker started by `map_with_shared_arrays`."""
+    return _worker_arrays[key]
+
+
+def map_with_shared_arrays(
+    fn: Callable,
+    tasks: Iterable,
+    groups: dict[str, dict[str, np.ndarray]],
+    workers: int,
+) -> list:
+    """Run `fn` over tasks in a process pool; arrays are shipped once via shared memory, results keep task order."""
+    tasks = list(tasks)
+    if not tasks:
+        return []
+    with SharedArrayPack(groups) as pack:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(tasks)),
+            initializer=_attach_worker,
+            initargs=(pack.name, pack.layout),
+        ) as executor:
+            return list(executor.map(fn, tasks))
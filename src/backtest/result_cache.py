@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import hashlib
+import pickle
+import sqlite3
+import time
+from dataclasses import astuple
+from pathlib import Path
+
+import numpy as np
+
+from config import tickers
+from config.settings import settings
+from src.backtest.strategy_config import StrategyConfig
+
+
+def data_version(arrays: dict[str, np.ndarray]) -> str:
+    """Content hash of one ticker's backtest inputs (bars, scores, market statuses)."""
+    digest = hashlib.sha256()
+    for name in sorted(arrays):
+        array = np.asarray(arrays[name])
+        if array.dtype == object:
+            array = array.astype(str)
+        array = np.ascontiguousarray(array)
+        digest.update(f"{name}:{array.dtype.str}:{array.shape}".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def result_key(
+    code: str,
+    window: int | str | None,
+    version: str,
+    model_fingerprint: str,
+    config: StrategyConfig,
+    threshold_overrides: dict[str, float] | None,
+    initial_capital: float,
+) -> str:
+    """Cache key for one ticker run; also folds in the per-ticker settings the run reads."""
+    parts = (
+        code,
+        window,
+        version,
+        model_fingerprint,
+        astuple(config),
+        None if threshold_overrides is None else sorted(threshold_overrides.items()),
+        float(initial_capital),
+        tickers.get_ticker_category(code),
+        code in settings.AGGRESSIVE_TICKERS,
+        settings.TICKER_BULL_THRESHOLDS.get(code),
+    )
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+class BacktestResultCache:
+    """Per-ticker backtest results memoized in SQLite; least recently used rows are evicted past `max_entries`."""
+
+    def __init__(self, db_path: str | Path | None = None, max_entries: int | None = None):
+        self.db_path = str(db_path or settings.BACKTEST_CACHE_PATH)
+        self.max_entries = settings.BACKTEST_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS backtest_results ("
+                "key TEXT PRIMARY KEY, code TEXT, result BLOB, last_access REAL)"
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_many(self, keys: list[str]) -> dict[str, dict]:
+        if not keys:
+            return {}
+        conn = sqlite3.connect(self.db_path)
+        try:
+            placeholders = ",".join("?" * len(keys))
+            rows = conn.execute(
+                f"SELECT key, result FROM backtest_results WHERE key IN ({placeholders})",
+                keys,
+            ).fetchall()
+            hits = {}
+            for key, blob in rows:
+                try:
+                    hits[key] = pickle.loads(blob)
+                except Exception:
+                    continue
+            if hits:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE backtest_results SET last_access=? WHERE key=?",
+                    [(now, key) for key in hits],
+                )
+                conn.commit()
+            return hits
+        except Exception as e:
+            print(f"Backtest cache read error: {e}")
+            return {}
+        finally:
+            conn.close()
+
+    def put_many(self, entries: dict[str, dict]) -> None:
+        if not entries:
+            return
+        conn = sqlite3.connect(self.db_path)
+        try:
+            now = time.time()
+            conn.executemany(
+                "INSERT OR REPLACE INTO backtest_results (key, code, result, last_access) VALUES (?, ?, ?, ?)",
+                [
+                    (key, result.get("code", ""), pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), now)
+                    for key, result in entries.items()
+                ],
+            )
+            conn.execute(
+                "DELETE FROM backtest_results WHERE key NOT IN "
+                "(SELECT key FROM backtest_results ORDER BY last_access DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+            conn.commit()
+        except Exception as e:
+            print(f"Backtest cache write error: {e}")
+        finally:
+            conn.close()
+
+    def __len__(self) -> int:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return int(conn.execute("SELECT COUNT(*) FROM backtest_results").fetchone()[0])
+        finally:
+            conn.close()
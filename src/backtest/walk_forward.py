@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config import tickers
+from config.settings import settings
+from src.backtest.backtester import Backtester
+from src.backtest.parallel import resolve_workers
+from src.backtest.result_cache import data_version
+from src.models.xgb_model import XGBoostModel
+
+
+MIN_TRAIN_ROWS = 60
+MIN_TEST_ROWS = 10
+
+_worker_dataset: dict[str, pd.DataFrame] = {}
+
+
+def fold_ranges(dataset: dict[str, pd.DataFrame], windows: list[dict]) -> list[dict[str, tuple[int, int, int, int]]]:
+    """Row ranges (train_lo, train_hi, test_lo, test_hi) per ticker and fold, from one searchsorted per bound.
+
+    Frames must be sorted by trade_date.
+    """
+    if not windows:
+        return []
+    train_start = np.array([w["train_start"] for w in windows])
+    train_end = np.array([w["train_end"] for w in windows])
+    test_start = np.array([w["test_start"] for w in windows])
+    test_end = np.array([w["test_end"] for w in windows])
+
+    per_code = {}
+    for code, df in dataset.items():
+        dates = df["trade_date"].astype(str).to_numpy()
+        per_code[code] = np.stack(
+            [
+                np.searchsorted(dates, train_start, side="left"),
+                np.searchsorted(dates, train_end, side="right"),
+                np.searchsorted(dates, test_start, side="left"),
+                np.searchsorted(dates, test_end, side="right"),
+            ],
+            axis=1,
+        )
+    return [
+        {code: tuple(int(v) for v in bounds[i]) for code, bounds in per_code.items()}
+        for i in range(len(windows))
+    ]
+
+
+def _rows_version(dataset: dict[str, pd.DataFrame], code: str, lo: int, hi: int) -> str:
+    rows = dataset[code].iloc[lo:hi]
+    return data_version({str(col): rows[col].to_numpy() for col in rows.columns})
+
+
+def _fold_key(
+    dataset: dict[str, pd.DataFrame],
+    window: dict,
+    ranges: dict[str, tuple[int, int, int, int]],
+    threshold: float,
+    initial_capital: float,
+) -> str:
+    """Checkpoint key: the fold's rows (by content), the training setup and the backtest arguments."""
+    model = XGBoostModel()
+    data = sorted(
+        (code, _rows_version(dataset, code, train_lo, train_hi), _rows_version(dataset, code, test_lo, test_hi))
+        for code, (train_lo, train_hi, test_lo, test_hi) in ranges.items()
+    )
+    labels = sorted((name, getattr(settings, name)) for name in dir(settings) if name.startswith("TRAIN_LABEL_"))
+    parts = (
+        sorted(window.items()),
+        sorted(ranges.items()),
+        data,
+        threshold,
+        initial_capital,
+        model.feature_cols,
+        sorted(model.params.items()),
+        model.num_boost_round,
+        [sorted(candidate.items()) for candidate in model._param_candidates(0.0)],
+        model.search,
+        model.halving_rounds,
+        labels,
+    )
+    return hashlib.sha256(repr(parts).encode()).hexdigest()[:16]
+
+
+def _fold_dir(checkpoint_dir: Path, fold: int, window: dict, key: str) -> Path:
+    return checkpoint_dir / f"fold_{fold:03d}_{window['test_start']}_{key}"
+
+
+def load_fold_results(fold_dir: Path) -> list[dict] | None:
+    path = fold_dir / "results.pkl"
+    if not path.exists():
+        return None
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except Exception as e:
+        print(f"  Ignoring unreadable checkpoint {path}: {e}")
+        return None
+
+
+def _save_fold_results(fold_dir: Path, results: list[dict]) -> None:
+    tmp_path = fold_dir / "results.pkl.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(results, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, fold_dir / "results.pkl")
+
+
+def run_fold(
+    dataset: dict[str, pd.DataFrame],
+    fold: int,
+    window: dict,
+    ranges: dict[str, tuple[int, int, int, int]],
+    threshold: float = 0.6,
+    initial_capital: float = 100000.0,
+    nthread: int | None = None,
+    fold_dir: Path | None = None,
+) -> list[dict]:
+    """Train one fold's model on its train rows and backtest every ticker on its test rows."""
+    print(
+        f"\n--- Fold {fold} | Train: {window['train_start']}~{window['train_end']} "
+        f"| Test: {window['test_start']}~{window['test_end']} ---"
+    )
+    train_frames = [
+        dataset[code].iloc[lo:hi] for code, (lo, hi, _, _) in ranges.items() if hi - lo >= MIN_TRAIN_ROWS
+    ]
+    if not train_frames:
+        print("  Skipping: insufficient training data in this window.")
+        return []
+
+    model = XGBoostModel(nthread=nthread)
+    model.train(pd.concat(train_frames, ignore_index=True))
+    if not model.is_trained:
+        print("  Training failed. Skipping.")
+        return []
+
+    backtester = Backtester(initial_capital)
+    results = []
+    for code, (_, _, lo, hi) in ranges.items():
+        if hi - lo < MIN_TEST_ROWS:
+            continue
+        test_part = dataset[code].iloc[lo:hi].copy()
+        probs = model.predict_batch(test_part)
+        res = backtester.run(test_part, probs, threshold=threshold)
+        res["code"] = code
+        res["name"] = tickers.TICKERS.get(code, code)
+        res["fold"] = fold
+        res["test_start"] = window["test_start"]
+        res["test_end"] = window["test_end"]
+        results.append(res)
+
+    if fold_dir is not None:
+        fold_dir.mkdir(parents=True, exist_ok=True)
+        model.model_path = str(fold_dir / "model.json")
+        model.save_model()
+        _save_fold_results(fold_dir, results)
+    return results
+
+
+def _init_worker(dataset: dict[str, pd.DataFrame]) -> None:
+    _worker_dataset.clear()
+    _worker_dataset.update(dataset)
+
+
+def _run_fold_task(task: tuple) -> list[dict]:
+    return run_fold(_worker_dataset, *task)
+
+
+def run_walk_forward_folds(
+    dataset: dict[str, pd.DataFrame],
+    windows: list[dict],
+    checkpoint_dir: str | Path | None = None,
+    workers: int | None = None,
+    threshold: float = 0.6,
+    initial_capital: float = 100000.0,
+) -> list[dict]:
+    """Run every walk-forward fold, in a process pool when `workers` > 1 (0 = all cores).
+
+    Each worker trains with cpu_count // workers xgboost threads. With `checkpoint_dir`, every finished
+    fold leaves its model and results on disk and folds whose checkpoint matches are loaded instead of rerun.
+    """
+    dataset = {
+        code: df if df["trade_date"].astype(str).is_monotonic_increasing else df.sort_values("trade_date", kind="stable")
+        for code, df in dataset.items()
+    }
+    ranges = fold_ranges(dataset, windows)
+    checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir is not None else None
+
+    fold_results: dict[int, list[dict]] = {}
+    pending = []
+    for i, (window, fold_range) in enumerate(zip(windows, ranges)):
+        fold = i + 1
+        fold_dir = None
+        if checkpoint_dir is not None:
+            fold_dir = _fold_dir(checkpoint_dir, fold, window, _fold_key(dataset, window, fold_range, threshold, initial_capital))
+            cached = load_fold_results(fold_dir)
+            if cached is not None:
+                print(f"Fold {fold}/{len(windows)}: loaded checkpoint {fold_dir.name}")
+                fold_results[fold] = cached
+                continue
+        pending.append((fold, window, fold_range, fold_dir))
+
+    workers = min(resolve_workers(workers), len(pending))
+    if workers > 1:
+        nthread = max(1, (os.cpu_count() or 1) // workers)
+        tasks = [
+            (fold, window, fold_range, threshold, initial_capital, nthread, fold_dir)
+            for fold, window, fold_range, fold_dir in pending
+        ]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(dataset,)) as executor:
+            for task, results in zip(tasks, executor.map(_run_fold_task, tasks)):
+                fold_results[task[0]] = results
+    else:
+        for fold, window, fold_range, fold_dir in pending:
+            fold_results[fold] = run_fold(dataset, fold, window, fold_range, threshold, initial_capital, None, fold_dir)
+
+    return [res for fold in sorted(fold_results) for res in fold_results[fold]]
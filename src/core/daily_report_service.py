@@ -21,8 +21,13 @@ def _send_report_notification(report_path: Path) -> str:
     return "sent"
 
 
-def generate_daily_report(send_notification: bool = False, history_days: int = 120) -> dict:
-    dashboard_payload = build_dashboard_payload(history_days=history_days)
+def generate_daily_report(
+    send_notification: bool = False,
+    history_days: int = 120,
+    dashboard_payload: dict | None = None,
+) -> dict:
+    if dashboard_payload is None:
+        dashboard_payload = build_dashboard_payload(history_days=history_days)
     reporter = Reporter()
     report_path = Path(
         reporter.generate_markdown(
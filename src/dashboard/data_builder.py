@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-import json
+import hashlib
+import os
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Callable
 
 import numpy as np
+import pandas as pd
 
 from config import tickers
 from config.settings import settings
@@ -14,16 +17,29 @@ from src.backtest.hybrid_runner import (
     run_backtest_for_cache,
     summarize_results,
 )
+from src.backtest.result_cache import BacktestResultCache
 from src.backtest.strategy_config import StrategyConfig
+from src.dashboard.serialization import dumps, float_column, records_from_columns
 from src.data_loader.data_manager import DataManager
 from src.data_loader.tushare_loader import TushareLoader
 from src.features.technical import FeatureEngineer
+from src.models.prediction_store import PredictionStore
+from src.models.registry import model_registry
 from src.models.scoring_model import RuleBasedModel
-from src.models.xgb_model import XGBoostModel
+from src.models.tree_evaluator import NumpyTreeModel
 from src.strategy.logic import RiskManager, StrategyFilter
 from src.utils.explainer import TechnicalExplainer
 from src.utils.feishu_bot import FeishuBot
-from src.utils.holdings_manager import HoldingsManager
+from src.utils.holdings_manager import HOLDINGS_FILE, HoldingsManager
+
+
+# Stages of a dashboard build, in order, as reported to a `progress` callback.
+BUILD_STAGES = ("fetch", "features", "scoring", "backtests")
+
+
+def _report_progress(progress: Callable[[str], None] | None, stage: str) -> None:
+    if progress is not None:
+        progress(stage)
 
 
 def _float_or_none(value: object, digits: int = 4) -> float | None:
@@ -164,12 +180,39 @@ def _format_compact_date(value: str) -> str:
 
 
 def _load_model():
-    model = XGBoostModel(model_path="data/xgb_model.json")
-    if model.load_model():
+    # xgboost is imported only on the path that needs it; NUMPY_INFERENCE skips it entirely.
+    if settings.NUMPY_INFERENCE:
+        model_cls = NumpyTreeModel
+    else:
+        from src.models.xgb_model import XGBoostModel
+
+        model_cls = XGBoostModel
+    # Loaded once per process; reloaded only when the model file's content changes.
+    model = model_registry.get(model_cls, "data/xgb_model.json")
+    if model is not None:
         return model, "XGBoost"
     return RuleBasedModel(), "Rules"
 
 
+def _mtime_ns(path: str | Path) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def dashboard_data_version() -> str:
+    """Cheap version of everything the payload depends on: market DB, holdings, model and calendar day."""
+    model, _ = _load_model()
+    parts = (
+        _mtime_ns(settings.DB_PATH),
+        _mtime_ns(HOLDINGS_FILE),
+        model.fingerprint(),
+        datetime.now().strftime("%Y%m%d"),
+    )
+    return hashlib.sha256(repr(parts).encode()).hexdigest()[:16]
+
+
 def _use_dynamic_for_live_signal(code: str) -> bool:
     category = tickers.get_ticker_category(code)
     if category == "core":
@@ -202,18 +245,16 @@ def _resolve_live_threshold(
 
 
 def _serialize_history(scored_df, history_days: int) -> list[dict]:
-    history = []
-    for _, row in scored_df.tail(history_days).iterrows():
-        history.append(
-            {
-                "date": str(row["trade_date"]),
-                "close": _float_or_none(row["close"], 4),
-                "ma20": _float_or_none(row.get("ma20"), 4),
-                "ma60": _float_or_none(row.get("ma60"), 4),
-                "score": _float_or_none(row.get("_score"), 4),
-            }
-        )
-    return history
+    tail = scored_df.tail(history_days)
+    return records_from_columns(
+        {
+            "date": tail["trade_date"].astype(str).tolist(),
+            "close": float_column(tail["close"], 4),
+            "ma20": float_column(tail.get("ma20"), 4, len(tail)),
+            "ma60": float_column(tail.get("ma60"), 4, len(tail)),
+            "score": float_column(tail.get("_score"), 4, len(tail)),
+        }
+    )
 
 
 def _signal_bucket(result: dict) -> str:
@@ -226,6 +267,30 @@ def _signal_bucket(result: dict) -> str:
     return "idle"
 
 
+def _score_universe(
+    model,
+    frames: dict[str, pd.DataFrame],
+    prediction_store: PredictionStore | None = None,
+) -> dict[str, np.ndarray]:
+    """Score every ticker's rows with one predict_batch call and split the scores back per ticker.
+
+    Only valid for models whose score for a row does not depend on the other rows. With a
+    `prediction_store`, rows scored before are read back and only the rest go to the model.
+    """
+    if not frames:
+        return {}
+    if prediction_store is not None:
+        return prediction_store.score_many(model, frames)
+    columns = getattr(model, "feature_cols", None)
+    stacked = pd.concat(
+        [df[columns] if columns is not None else df for df in frames.values()],
+        ignore_index=True,
+    )
+    scores = np.asarray(model.predict_batch(stacked))
+    bounds = np.cumsum([len(df) for df in frames.values()])[:-1]
+    return dict(zip(frames, np.split(scores, bounds)))
+
+
 def build_live_snapshot(
     data_manager: DataManager,
     feature_eng: FeatureEngineer,
@@ -233,6 +298,8 @@ def build_live_snapshot(
     model,
     model_name: str,
     history_days: int = 120,
+    prediction_store: PredictionStore | None = None,
+    progress: Callable[[str], None] | None = None,
 ) -> dict:
     strat_filter = StrategyFilter()
     risk_manager = RiskManager()
@@ -243,11 +310,15 @@ def build_live_snapshot(
     histories: dict[str, list[dict]] = {}
     datasets: dict[str, object] = {}
 
+    raw_frames = {}
     for code in tickers.get_ticker_list(include_observe=True):
         raw_df = data_manager.update_and_get_data(code, is_index=False)
-        if raw_df.empty:
-            continue
+        if not raw_df.empty:
+            raw_frames[code] = raw_df
 
+    _report_progress(progress, "features")
+    prepared: dict[str, tuple] = {}
+    for code, raw_df in raw_frames.items():
         feature_df = feature_eng.calculate_technical_indicators(raw_df.copy())
         feature_df = model.prepare_data(feature_df)
         if not index_df.empty:
@@ -256,14 +327,30 @@ def build_live_snapshot(
 
         if len(scored_df) < 60:
             continue
+        prepared[code] = (feature_df, scored_df)
+
+    _report_progress(progress, "scoring")
+    batch_scores = (
+        _score_universe(model, {code: scored_df for code, (_, scored_df) in prepared.items()}, prediction_store)
+        if getattr(model, "row_independent", False)
+        else None
+    )
 
-        score = model.predict(scored_df)
+    for code, (feature_df, scored_df) in prepared.items():
         use_dynamic = _use_dynamic_for_live_signal(code)
+        lookback = min(settings.DYNAMIC_THRESHOLD_LOOKBACK, len(scored_df))
         dynamic_threshold = None
-        if use_dynamic and callable(getattr(model, "predict_batch", None)):
-            lookback = min(settings.DYNAMIC_THRESHOLD_LOOKBACK, len(scored_df))
-            recent_scores = model.predict_batch(scored_df.tail(lookback))
-            dynamic_threshold = StrategyFilter.dynamic_threshold(recent_scores)
+        if batch_scores is not None:
+            scores = batch_scores[code]
+            score = round(float(scores[-1]), 4)
+            if use_dynamic:
+                dynamic_threshold = StrategyFilter.dynamic_threshold(scores[-lookback:])
+        else:
+            # Window-dependent models score the whole frame once; the recent tail feeds the dynamic threshold.
+            score = model.predict(scored_df)
+            scores = model.predict_batch(scored_df) if callable(getattr(model, "predict_batch", None)) else None
+            if use_dynamic and scores is not None:
+                dynamic_threshold = StrategyFilter.dynamic_threshold(scores[-lookback:])
 
         is_buy, filtered_market_status = strat_filter.filter_signal(
             score,
@@ -281,9 +368,9 @@ def build_live_snapshot(
             is_buy = False
             decision_note = "仅观察"
 
-        if callable(getattr(model, "predict_batch", None)):
+        if scores is not None:
             scored_df = scored_df.copy()
-            scored_df["_score"] = model.predict_batch(scored_df)
+            scored_df["_score"] = scores
             histories[code] = _serialize_history(scored_df, history_days)
         datasets[code] = scored_df
 
@@ -418,53 +505,43 @@ def _serialize_backtest_charts(
         if test_df is None or test_df.empty:
             continue
 
-        buy_map: dict[str, float] = {}
-        sell_map: dict[str, float] = {}
-        trade_points: list[dict] = []
-
-        for trade in item.get("trades", []):
-            action = str(trade.get("action", ""))
-            date = str(trade.get("date", ""))
-            if not date:
-                continue
-            price = _float_or_none(trade.get("price"), 4)
-            trade_type = ""
-            if action == "BUY":
-                trade_type = "buy"
-                if price is not None:
-                    buy_map[date] = price
-            elif action.startswith("SELL"):
-                trade_type = "sell"
-                if price is not None:
-                    sell_map[date] = price
-            if not trade_type:
-                continue
-            trade_points.append(
-                {
-                    "date": date,
-                    "price": price,
-                    "type": trade_type,
-                    "action": action,
-                    "pnl": _float_or_none(trade.get("pnl"), 2),
-                }
+        trades = item["trades"]
+        is_buy = trades["action"] == "BUY"
+        is_sell = np.char.startswith(trades["action"], "SELL")
+        keep = (is_buy | is_sell) & (trades["date"] != "")
+        trade_points = [
+            {
+                "date": date,
+                "price": _float_or_none(price, 4),
+                "type": "buy" if buy else "sell",
+                "action": action,
+                "pnl": _float_or_none(pnl, 2),
+            }
+            for date, action, price, pnl, buy in zip(
+                trades["date"][keep].tolist(),
+                trades["action"][keep].tolist(),
+                trades["price"][keep].tolist(),
+                trades["pnl"][keep].tolist(),
+                is_buy[keep].tolist(),
             )
+        ]
+        buy_map = {p["date"]: p["price"] for p in trade_points if p["type"] == "buy" and p["price"] is not None}
+        sell_map = {p["date"]: p["price"] for p in trade_points if p["type"] == "sell" and p["price"] is not None}
 
-        series: list[dict] = []
-        for _, row in test_df.iterrows():
-            date = str(row["trade_date"])
-            series.append(
-                {
-                    "date": date,
-                    "close": _float_or_none(row.get("close"), 4),
-                    "buy_price": _float_or_none(buy_map.get(date), 4),
-                    "sell_price": _float_or_none(sell_map.get(date), 4),
-                }
-            )
+        dates = test_df["trade_date"].astype(str)
+        series = records_from_columns(
+            {
+                "date": dates.tolist(),
+                "close": float_column(test_df.get("close"), 4, len(test_df)),
+                "buy_price": float_column(dates.map(buy_map), 4),
+                "sell_price": float_column(dates.map(sell_map), 4),
+            }
+        )
 
         charts[code] = {
             "window_days": lookback_days,
-            "start_date": str(test_df.iloc[0]["trade_date"]),
-            "end_date": str(test_df.iloc[-1]["trade_date"]),
+            "start_date": dates.iloc[0],
+            "end_date": dates.iloc[-1],
             "series": series,
             "trades": trade_points,
         }
@@ -476,6 +553,8 @@ def build_backtest_snapshot(
     datasets: dict[str, object],
     market_status_map: dict[str, str],
     lookback_days: int,
+    model_fingerprint: str = "",
+    result_cache: BacktestResultCache | None = None,
 ) -> dict:
     backtester = Backtester()
     config = StrategyConfig.from_settings()
@@ -500,6 +579,12 @@ def build_backtest_snapshot(
         backtester,
         market_status_map,
         config=config,
+        # Serial on purpose: this runs inside the dashboard server's request threads, where forking a
+        # process pool per rebuild is unsafe; the result cache already makes warm rebuilds cheap.
+        workers=None,
+        result_cache=result_cache,
+        window=lookback_days,
+        model_fingerprint=model_fingerprint,
     )
     serialized_results = _serialize_backtest_results(results)
     serialized_charts = _serialize_backtest_charts(results, data_cache, lookback_days)
@@ -516,13 +601,15 @@ def build_backtest_snapshot(
     }
 
 
-def build_dashboard_payload(history_days: int = 120) -> dict:
+def build_dashboard_payload(history_days: int = 120, progress: Callable[[str], None] | None = None) -> dict:
+    """Full dashboard payload; `progress`, if given, is called with each stage name in BUILD_STAGES as it starts."""
     loader = TushareLoader()
     data_manager = DataManager(loader)
     feature_eng = FeatureEngineer()
     strat_filter = StrategyFilter()
     model, model_name = _load_model()
 
+    _report_progress(progress, "fetch")
     index_df, market_status_map = prepare_index_data(
         data_manager,
         feature_eng,
@@ -536,10 +623,15 @@ def build_dashboard_payload(history_days: int = 120) -> dict:
         model,
         model_name=model_name,
         history_days=history_days,
+        prediction_store=PredictionStore(),
+        progress=progress,
     )
+    _report_progress(progress, "backtests")
     datasets = live_snapshot.pop("datasets")
-    backtest_90 = build_backtest_snapshot(datasets, market_status_map, lookback_days=90)
-    backtest_180 = build_backtest_snapshot(datasets, market_status_map, lookback_days=180)
+    result_cache = BacktestResultCache() if settings.BACKTEST_CACHE_MAX_ENTRIES > 0 else None
+    fingerprint = model.fingerprint()
+    backtest_90 = build_backtest_snapshot(datasets, market_status_map, 90, fingerprint, result_cache)
+    backtest_180 = build_backtest_snapshot(datasets, market_status_map, 180, fingerprint, result_cache)
 
     bt90_map = {item["code"]: item for item in backtest_90["results"]}
     bt180_map = {item["code"]: item for item in backtest_180["results"]}
@@ -599,5 +691,10 @@ def build_dashboard_payload(history_days: int = 120) -> dict:
     }
 
 
+def with_recent_reports(payload: dict) -> dict:
+    """Shallow copy of `payload` with the report list re-read, e.g. after a report was written."""
+    return {**payload, "recent_reports": _recent_reports()}
+
+
 def build_dashboard_json(history_days: int = 120) -> str:
-    return json.dumps(build_dashboard_payload(history_days=history_days), ensure_ascii=False)
+    return dumps(build_dashboard_payload(history_days=history_days)).decode("utf-8")
@@ -8,10 +8,18 @@ import { SignalBoard } from "./components/SignalBoard";
 import { TickerDetail } from "./components/TickerDetail";
 import { TickerTable } from "./components/TickerTable";
 import { TopBar } from "./components/TopBar";
-import type { DashboardPayload } from "./types/dashboard";
+import type { DashboardSummary, JobStage } from "./types/dashboard";
 
 type StatusTone = "neutral" | "success" | "warning" | "error";
 
+const STAGE_LABELS: Record<JobStage, string> = {
+  fetch: "拉取行情",
+  features: "计算指标",
+  scoring: "模型打分",
+  backtests: "回测 90/180 天",
+  report: "写入日报",
+};
+
 function formatPct(value: number | null) {
   return value === null ? "-" : `${value.toFixed(2)}%`;
 }
@@ -27,7 +35,7 @@ function StatCard({ title, value, subtitle }: { title: string; value: string; su
 }
 
 export default function App() {
-  const [payload, setPayload] = useState<DashboardPayload | null>(null);
+  const [payload, setPayload] = useState<DashboardSummary | null>(null);
   const [historyDays, setHistoryDays] = useState(120);
   const [selectedCode, setSelectedCode] = useState<string | null>(null);
   const [filter, setFilter] = useState("all");
@@ -69,7 +77,12 @@ export default function App() {
       initializedRef.current = true;
       setStatus("工作台已就绪，可以开始操作。");
       setStatusTone("success");
-      setLog(`最近一次刷新: ${response.payload.generated_at}`);
+      const snapshot = response.snapshot;
+      setLog(
+        snapshot
+          ? `最近一次刷新: ${response.payload.generated_at}（快照 ${Math.round(snapshot.age_seconds)} 秒前${snapshot.revalidating ? "，后台更新中" : ""}）`
+          : `最近一次刷新: ${response.payload.generated_at}`,
+      );
     } catch (error) {
       setStatus(error instanceof Error ? error.message : "加载失败");
       setStatusTone("error");
@@ -86,7 +99,9 @@ export default function App() {
     setStatus("正在刷新工作台数据...");
     setStatusTone("warning");
     try {
-      const response = await refreshDashboard(historyDays);
+      const response = await refreshDashboard(historyDays, (stage) =>
+        setStatus(`正在刷新工作台数据：${STAGE_LABELS[stage]}...`),
+      );
       startTransition(() => {
         setPayload(response.payload);
       });
@@ -109,7 +124,9 @@ export default function App() {
     setStatus(sendNotification ? "正在生成日报并尝试推送飞书..." : "正在生成今日日报...");
     setStatusTone("warning");
     try {
-      const response = await generateReport(historyDays, sendNotification);
+      const response = await generateReport(historyDays, sendNotification, (stage) =>
+        setStatus(`正在生成今日日报：${STAGE_LABELS[stage]}...`),
+      );
       startTransition(() => {
         setPayload(response.payload);
       });
@@ -1,6 +1,14 @@
 import type {
+  BacktestChart,
+  BacktestWindow,
+  ColumnarSeries,
   DashboardActionResponse,
   DashboardResponse,
+  HistoryPoint,
+  JobAcceptedResponse,
+  JobResponse,
+  JobStage,
+  SnapshotResponse,
 } from "../types/dashboard";
 
 function ensureOk<T extends { ok: boolean; error?: string }>(payload: T): T {
@@ -10,45 +18,139 @@ function ensureOk<T extends { ok: boolean; error?: string }>(payload: T): T {
   return payload;
 }
 
-export async function fetchDashboardData(historyDays: number): Promise<DashboardResponse> {
-  const response = await fetch(`/api/dashboard-data?history_days=${historyDays}`, {
-    cache: "no-store",
-  });
-  const payload = (await response.json()) as DashboardResponse & { error?: string };
+async function fetchSnapshotView<T>(url: string): Promise<SnapshotResponse<T> | null> {
+  // "no-cache" lets the browser revalidate with If-None-Match; an unchanged snapshot comes back as a bodyless 304.
+  const response = await fetch(url, { cache: "no-cache" });
+  if (response.status === 404) {
+    return null;
+  }
+  const payload = (await response.json()) as SnapshotResponse<T> & { error?: string };
   if (!response.ok) {
     throw new Error(payload.error || `Request failed (${response.status})`);
   }
   return ensureOk(payload);
 }
 
-export async function refreshDashboard(historyDays: number): Promise<DashboardActionResponse> {
-  const response = await fetch("/api/refresh-dashboard", {
+// Per-ticker charts ask for columnar series downsampled to this many points (trade days are always kept).
+const CHART_POINTS = 240;
+
+function seriesQuery(historyDays: number): string {
+  return `history_days=${historyDays}&format=columnar&points=${CHART_POINTS}`;
+}
+
+function formatDate(date: Date): string {
+  return date.toISOString().slice(0, 10).replace(/-/g, "");
+}
+
+export function decodeColumnar<T>(series: ColumnarSeries): T[] {
+  let dates = series.dates ?? [];
+  if (series.date_base && series.date_offsets) {
+    const base = series.date_base;
+    const baseTime = Date.UTC(Number(base.slice(0, 4)), Number(base.slice(4, 6)) - 1, Number(base.slice(6, 8)));
+    dates = series.date_offsets.map((offset) => formatDate(new Date(baseTime + offset * 86_400_000)));
+  }
+  const fields = Object.entries(series.columns);
+  return Array.from({ length: series.length }, (_, index) => {
+    const row: Record<string, string | number | null> = { date: dates[index] };
+    for (const [field, values] of fields) {
+      row[field] = values[index];
+    }
+    return row as T;
+  });
+}
+
+export async function fetchDashboardData(historyDays: number): Promise<DashboardResponse> {
+  const response = await fetchSnapshotView<DashboardResponse["payload"]>(
+    `/api/dashboard-summary?history_days=${historyDays}`,
+  );
+  if (!response) {
+    throw new Error("Dashboard summary is not available.");
+  }
+  return response;
+}
+
+export async function fetchTickerHistory(code: string, historyDays: number): Promise<HistoryPoint[]> {
+  const response = await fetchSnapshotView<ColumnarSeries>(
+    `/api/ticker/${encodeURIComponent(code)}/history?${seriesQuery(historyDays)}`,
+  );
+  return response ? decodeColumnar<HistoryPoint>(response.payload) : [];
+}
+
+export async function fetchBacktestChart(
+  window: BacktestWindow,
+  code: string,
+  historyDays: number,
+): Promise<BacktestChart | null> {
+  const response = await fetchSnapshotView<Omit<BacktestChart, "series"> & { series: ColumnarSeries }>(
+    `/api/backtest/${window}/${encodeURIComponent(code)}/chart?${seriesQuery(historyDays)}`,
+  );
+  if (!response) {
+    return null;
+  }
+  const chart = response.payload;
+  return { ...chart, series: decodeColumnar<BacktestChart["series"][number]>(chart.series) };
+}
+
+async function postJson<T>(url: string, body: unknown): Promise<T> {
+  const response = await fetch(url, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ history_days: historyDays }),
+    body: JSON.stringify(body),
   });
-  const payload = (await response.json()) as DashboardActionResponse & { error?: string };
+  const payload = (await response.json()) as T & { ok: boolean; error?: string };
   if (!response.ok) {
     throw new Error(payload.error || `Request failed (${response.status})`);
   }
   return ensureOk(payload);
 }
 
+function waitForJob(accepted: JobAcceptedResponse, onStage?: (stage: JobStage) => void): Promise<DashboardActionResponse> {
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(accepted.events_url);
+    source.addEventListener("stage", (event) => {
+      onStage?.((JSON.parse((event as MessageEvent).data) as { stage: JobStage }).stage);
+    });
+    source.addEventListener("failed", (event) => {
+      source.close();
+      reject(new Error((JSON.parse((event as MessageEvent).data) as { error: string }).error || "Action failed."));
+    });
+    source.addEventListener("done", () => {
+      source.close();
+      fetch(accepted.job_url, { cache: "no-store" })
+        .then((response) => response.json() as Promise<JobResponse>)
+        .then((payload) => {
+          if (!payload.result) {
+            throw new Error(payload.job.error || "Action result is not available.");
+          }
+          resolve(payload.result);
+        })
+        .catch(reject);
+    });
+    // EventSource reconnects by itself (sending Last-Event-ID); only a closed stream is fatal.
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) {
+        reject(new Error("Lost connection to the dashboard action."));
+      }
+    };
+  });
+}
+
+export async function refreshDashboard(
+  historyDays: number,
+  onStage?: (stage: JobStage) => void,
+): Promise<DashboardActionResponse> {
+  const accepted = await postJson<JobAcceptedResponse>("/api/refresh-dashboard", { history_days: historyDays });
+  return waitForJob(accepted, onStage);
+}
+
 export async function generateReport(
   historyDays: number,
   sendNotification: boolean,
+  onStage?: (stage: JobStage) => void,
 ): Promise<DashboardActionResponse> {
-  const response = await fetch("/api/generate-report", {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({
-      history_days: historyDays,
-      send_notification: sendNotification,
-    }),
+  const accepted = await postJson<JobAcceptedResponse>("/api/generate-report", {
+    history_days: historyDays,
+    send_notification: sendNotification,
   });
-  const payload = (await response.json()) as DashboardActionResponse & { error?: string };
-  if (!response.ok) {
-    throw new Error(payload.error || `Request failed (${response.status})`);
-  }
-  return ensureOk(payload);
+  return waitForJob(accepted, onStage);
 }
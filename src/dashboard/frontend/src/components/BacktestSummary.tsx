@@ -7,10 +7,10 @@ import {
   XAxis,
   YAxis,
 } from "recharts";
-import type { DashboardPayload } from "../types/dashboard";
+import type { DashboardSummary } from "../types/dashboard";
 
 type BacktestSummaryProps = {
-  payload: DashboardPayload;
+  payload: DashboardSummary;
 };
 
 function pct(value: number | null) {
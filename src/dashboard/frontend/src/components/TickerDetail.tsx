@@ -11,15 +11,15 @@ import {
   XAxis,
   YAxis,
 } from "recharts";
-import type { BacktestChart, DashboardPayload } from "../types/dashboard";
+import { fetchBacktestChart, fetchTickerHistory } from "../api/dashboard";
+import type { BacktestChart, BacktestWindow, DashboardSummary, HistoryPoint } from "../types/dashboard";
 
 type TickerDetailProps = {
-  payload: DashboardPayload;
+  payload: DashboardSummary;
   selectedCode: string | null;
   onSelectTicker: (code: string) => void;
 };
 
-type HistoryPoint = DashboardPayload["histories"][string][number];
 type ExpandedChart = "history" | "backtest" | null;
 
 function pct(value: number | null) {
@@ -182,18 +182,52 @@ function BacktestTradeChart({
 }
 
 export function TickerDetail({ payload, selectedCode, onSelectTicker }: TickerDetailProps) {
-  const [backtestWindow, setBacktestWindow] = useState<"90d" | "180d">("90d");
+  const [backtestWindow, setBacktestWindow] = useState<BacktestWindow>("90d");
   const [expandedChart, setExpandedChart] = useState<ExpandedChart>(null);
+  const [history, setHistory] = useState<HistoryPoint[]>([]);
+  const [selectedBacktestChart, setSelectedBacktestChart] = useState<BacktestChart | undefined>(undefined);
   const selected =
     payload.signals.all.find((item) => item.code === selectedCode) ??
     payload.signals.buy[0] ??
     payload.signals.all[0] ??
     null;
+  const selectedTickerCode = selected?.code ?? null;
+  const historyDays = payload.controls.history_days;
 
-  const history = selected ? payload.histories[selected.code] || [] : [];
-  const selectedBacktestChart = selected
-    ? payload.backtests[backtestWindow].charts[selected.code]
-    : undefined;
+  // Charts are loaded per ticker on demand; generated_at changes with every new snapshot.
+  useEffect(() => {
+    let cancelled = false;
+    setHistory([]);
+    if (selectedTickerCode) {
+      fetchTickerHistory(selectedTickerCode, historyDays)
+        .then((points) => {
+          if (!cancelled) {
+            setHistory(points);
+          }
+        })
+        .catch(() => undefined);
+    }
+    return () => {
+      cancelled = true;
+    };
+  }, [selectedTickerCode, historyDays, payload.generated_at]);
+
+  useEffect(() => {
+    let cancelled = false;
+    setSelectedBacktestChart(undefined);
+    if (selectedTickerCode) {
+      fetchBacktestChart(backtestWindow, selectedTickerCode, historyDays)
+        .then((chart) => {
+          if (!cancelled) {
+            setSelectedBacktestChart(chart ?? undefined);
+          }
+        })
+        .catch(() => undefined);
+    }
+    return () => {
+      cancelled = true;
+    };
+  }, [selectedTickerCode, backtestWindow, historyDays, payload.generated_at]);
   const selectedLabel = selected ? `${selected.name} (${selected.code})` : "";
   const modalTitle =
     expandedChart === "history" ? "\u8d70\u52bf\u56fe\u5927\u56fe" : "\u56de\u6d4b\u4e70\u5356\u70b9\u5927\u56fe";
@@ -317,7 +351,7 @@ export function TickerDetail({ payload, selectedCode, onSelectTicker }: TickerDe
             <select
               className="select"
               value={backtestWindow}
-              onChange={(event) => setBacktestWindow(event.target.value as "90d" | "180d")}
+              onChange={(event) => setBacktestWindow(event.target.value as BacktestWindow)}
             >
               <option value="90d">90 D</option>
               <option value="180d">180 D</option>
@@ -1,7 +1,7 @@
-import type { DashboardPayload } from "../types/dashboard";
+import type { DashboardSummary } from "../types/dashboard";
 
 type TopBarProps = {
-  payload: DashboardPayload;
+  payload: DashboardSummary;
 };
 
 export function TopBar({ payload }: TopBarProps) {
@@ -155,18 +155,58 @@ export type DashboardPayload = {
     all: SignalItem[];
   };
   holdings: HoldingItem[];
-  histories: Record<string, Array<{ date: string; close: number | null; ma20: number | null; ma60: number | null; score: number | null }>>;
+  histories: Record<string, HistoryPoint[]>;
   backtests: {
     "90d": BacktestBoard;
     "180d": BacktestBoard;
   };
 };
 
-export type DashboardResponse = {
+export type HistoryPoint = {
+  date: string;
+  close: number | null;
+  ma20: number | null;
+  ma60: number | null;
+  score: number | null;
+};
+
+export type BacktestWindow = "90d" | "180d";
+
+// `?format=columnar` series: one array per field, dates as a YYYYMMDD base plus day offsets.
+export type ColumnarSeries = {
+  encoding: "columnar";
+  length: number;
+  columns: Record<string, (number | null)[]>;
+  date_base?: string | null;
+  date_offsets?: number[];
+  dates?: string[];
+};
+
+export type BacktestBoardSummary = Omit<BacktestBoard, "charts">;
+
+// What /api/dashboard-summary returns: the payload without histories and chart series,
+// which are fetched per ticker from /api/ticker/<code>/history and /api/backtest/<window>/<code>/chart.
+export type DashboardSummary = Omit<DashboardPayload, "histories" | "backtests"> & {
+  backtests: Record<BacktestWindow, BacktestBoardSummary>;
+};
+
+export type SnapshotMeta = {
+  version: string;
+  // Content id of the snapshot; /api/dashboard-data?since=<revision> answers with a diff from it.
+  revision: string;
+  built_at: string;
+  age_seconds: number;
+  revalidating: boolean;
+};
+
+export type SnapshotResponse<T> = {
   ok: boolean;
-  payload: DashboardPayload;
+  payload: T;
+  snapshot?: SnapshotMeta;
 };
 
+export type DashboardResponse = SnapshotResponse<DashboardSummary>;
+
 export type DashboardActionResponse = {
   ok: boolean;
   action: string;
@@ -174,5 +214,30 @@ export type DashboardActionResponse = {
   generated_at: string;
   notification_status?: string;
   notification_error?: string | null;
-  payload: DashboardPayload;
+  payload: DashboardSummary;
+};
+
+export type JobStage = "fetch" | "features" | "scoring" | "backtests" | "report";
+
+export type DashboardJob = {
+  id: string;
+  action: string;
+  status: "running" | "done" | "failed";
+  stage: JobStage | null;
+  created_at: string;
+  error: string | null;
+};
+
+// POST /api/refresh-dashboard and /api/generate-report answer 202 with a job; progress streams from events_url.
+export type JobAcceptedResponse = {
+  ok: boolean;
+  job: DashboardJob;
+  job_url: string;
+  events_url: string;
+};
+
+export type JobResponse = {
+  ok: boolean;
+  job: DashboardJob;
+  result?: DashboardActionResponse;
 };
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import hashlib
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.dashboard.compression import MIN_COMPRESS_BYTES, compress, is_compressible, supported_encodings
+
+
+def etag_for(data: bytes, weak: bool = False) -> str:
+    tag = f'"{hashlib.sha256(data).hexdigest()[:32]}"'
+    return f"W/{tag}" if weak else tag
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """`If-None-Match` check with weak comparison, as RFC 9110 prescribes for GET."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == wanted for candidate in if_none_match.split(","))
+
+
+@dataclass
+class CachedFile:
+    body: bytes
+    etag: str
+    mtime_ns: int
+    size: int
+    content_type: str
+    encoded: dict[str, bytes] = field(default_factory=dict, repr=False)
+
+    def variant(self, encoding: str | None) -> tuple[bytes, str]:
+        """Body and ETag for `encoding` (None = identity); compressed bodies are built once and kept."""
+        if encoding is None or not is_compressible(self.content_type) or self.size < MIN_COMPRESS_BYTES:
+            return self.body, self.etag
+        body = self.encoded.get(encoding)
+        if body is None:
+            body = self.encoded[encoding] = compress(self.body, encoding, best=True)
+        # Each encoding is a different representation, so it gets its own strong ETag.
+        return body, f'{self.etag[:-1]}-{encoding}"'
+
+
+class FileCache:
+    """File bodies and their content ETags kept in memory; a file is re-read only when its mtime or size moves."""
+
+    def __init__(self, max_entries: int = 256, max_file_bytes: int = 8 << 20):
+        self.max_entries = max_entries
+        self.max_file_bytes = max_file_bytes
+        self._entries: OrderedDict[Path, CachedFile] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: Path) -> CachedFile:
+        stat = os.stat(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and (entry.mtime_ns, entry.size) == (stat.st_mtime_ns, stat.st_size):
+                self._entries.move_to_end(path)
+                return entry
+
+        body = path.read_bytes()
+        content_type, _ = mimetypes.guess_type(str(path))
+        entry = CachedFile(
+            body,
+            etag_for(body),
+            stat.st_mtime_ns,
+            stat.st_size,
+            content_type or "application/octet-stream",
+        )
+        if len(body) <= self.max_file_bytes:
+            with self._lock:
+                self._entries[path] = entry
+                self._entries.move_to_end(path)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def precompress(self, directory: Path) -> list[tuple[Path, int, dict[str, int]]]:
+        """Load every file under `directory` and build all compressed variants; returns sizes per file."""
+        sizes = []
+        for path in sorted(p for p in directory.rglob("*") if p.is_file()):
+            entry = self.get(path)
+            encoded = {}
+            for encoding in supported_encodings():
+                body, _ = entry.variant(encoding)
+                if body is not entry.body:
+                    encoded[encoding] = len(body)
+            sizes.append((path, entry.size, encoded))
+        return sizes
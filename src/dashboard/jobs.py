@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Hashable
+
+from config.settings import settings
+from src.dashboard.single_flight import Overloaded
+
+
+@dataclass
+class JobEvent:
+    id: int
+    event: str
+    data: dict
+
+
+@dataclass
+class Job:
+    """One dashboard action running in the background, with an append-only event log for SSE readers.
+
+    Events are `stage` (a build/report stage started), then exactly one `done` or `failed`.
+    """
+
+    id: str
+    action: str
+    created_at: float = field(default_factory=time.time)
+    status: str = "running"
+    stage: str | None = None
+    result: dict | None = None
+    error: str | None = None
+    events: list[JobEvent] = field(default_factory=list, repr=False)
+    _changed: threading.Condition = field(default_factory=threading.Condition, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status != "running"
+
+    def _emit(self, event: str, data: dict) -> None:
+        with self._changed:
+            self.events.append(JobEvent(len(self.events) + 1, event, {"job": self.id, **data}))
+            self._changed.notify_all()
+
+    def report_stage(self, stage: str) -> None:
+        self.stage = stage
+        self._emit("stage", {"stage": stage, "elapsed_seconds": round(time.time() - self.created_at, 1)})
+
+    def finish(self, result: dict) -> None:
+        self.result = result
+        self.status = "done"
+        self._emit("done", {"status": self.status, "elapsed_seconds": round(time.time() - self.created_at, 1)})
+
+    def fail(self, error: str) -> None:
+        self.error = error
+        self.status = "failed"
+        self._emit("failed", {"status": self.status, "error": error})
+
+    def wait_events(self, after: int, timeout: float) -> list[JobEvent]:
+        """Events with id > `after`, waiting up to `timeout` seconds for one to arrive."""
+        with self._changed:
+            self._changed.wait_for(lambda: len(self.events) > after, timeout)
+            return self.events[after:]
+
+    def describe(self) -> dict:
+        return {
+            "id": self.id,
+            "action": self.action,
+            "status": self.status,
+            "stage": self.stage,
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.created_at)),
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """Start dashboard actions as background jobs and keep the most recent ones for polling.
+
+    A submit whose `key` matches a job that is still running returns that job instead of starting
+    another one. At most `max_running` jobs run at once; beyond that `submit` raises `Overloaded`.
+    """
+
+    def __init__(self, max_running: int | None = None, keep_finished: int = 20):
+        self.max_running = max(1, max_running or settings.DASHBOARD_MAX_PENDING)
+        self.keep_finished = keep_finished
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._running: dict[Hashable, Job] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def submit(self, action: str, key: Hashable, fn: Callable[[Job], dict]) -> Job:
+        with self._lock:
+            job = self._running.get(key)
+            if job is not None:
+                return job
+            if len(self._running) >= self.max_running:
+                raise Overloaded(f"{len(self._running)} dashboard actions already running.")
+            job = Job(f"{next(self._ids)}-{uuid.uuid4().hex[:8]}", action)
+            self._jobs[job.id] = job
+            self._running[key] = job
+            self._prune()
+        threading.Thread(target=self._run, args=(job, key, fn), name=f"dashboard-job-{job.id}", daemon=True).start()
+        return job
+
+    def _run(self, job: Job, key: Hashable, fn: Callable[[Job], dict]) -> None:
+        result, error = None, None
+        try:
+            result = fn(job)
+        except Exception as exc:
+            error = str(exc) or exc.__class__.__name__
+        # Leave the running set before announcing the outcome, so a client reacting to it starts a new job.
+        with self._lock:
+            if self._running.get(key) is job:
+                del self._running[key]
+        if error is None:
+            job.finish(result)
+        else:
+            job.fail(error)
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+# Top-level payload keys with their own diff below; every other key is sent whole when it changed.
+_DIFFED_KEYS = {"signals", "holdings", "histories", "backtests"}
+_SIGNAL_BUCKETS = ("buy", "watch", "observe")
+
+
+def diff_rows(old: list[dict], new: list[dict], key: str = "code") -> dict | None:
+    """Keyed list diff: rows that are new or differ, keys that disappeared, and the new key order.
+
+    Returns None when nothing changed, and `{"replace": new}` when keys are not unique.
+    """
+    if old == new:
+        return None
+    old_by_key = {row[key]: row for row in old}
+    new_by_key = {row[key]: row for row in new}
+    if len(old_by_key) != len(old) or len(new_by_key) != len(new):
+        return {"replace": new}
+    return {
+        "changed": [row for row in new if old_by_key.get(row[key]) != row],
+        "removed": [code for code in old_by_key if code not in new_by_key],
+        "order": list(new_by_key),
+    }
+
+
+def diff_series(old: list[dict], new: list[dict]) -> dict | None:
+    """Date-ordered series diff: the new window start plus every point from the first date that differs.
+
+    Apply by keeping old points dated on/after `start` and before `from` (all of them when `from` is None),
+    then appending `points`. Falls back to `{"replace": new}` when the old points do not line up.
+    """
+    if old == new:
+        return None
+    if not new:
+        return {"replace": new}
+    old_by_date = {point["date"]: point for point in old}
+    first = next((index for index, point in enumerate(new) if old_by_date.get(point["date"]) != point), len(new))
+    start = new[0]["date"]
+    cut = new[first]["date"] if first < len(new) else None
+    kept = [point for point in old if point["date"] >= start and (cut is None or point["date"] < cut)]
+    if kept != new[:first]:
+        return {"replace": new}
+    return {"start": start, "from": cut, "points": new[first:]}
+
+
+def _diff_mapping(old: dict, new: dict, diff) -> dict | None:
+    changes = {}
+    for code, value in new.items():
+        if code not in old:
+            changes[code] = {"replace": value}
+        else:
+            change = diff(old[code], value)
+            if change is not None:
+                changes[code] = change
+    removed = [code for code in old if code not in new]
+    if not changes and not removed:
+        return None
+    return {"changed": changes, "removed": removed}
+
+
+def _diff_chart(old: dict, new: dict) -> dict | None:
+    if old == new:
+        return None
+    return {"replace": new}
+
+
+def _diff_backtest_board(old: dict, new: dict) -> dict | None:
+    if old == new:
+        return None
+    board = {key: value for key, value in new.items() if key not in {"results", "charts"} and old.get(key) != value}
+    results = diff_rows(old.get("results", []), new.get("results", []))
+    if results is not None:
+        board["results"] = results
+    charts = _diff_mapping(old.get("charts", {}), new.get("charts", {}), _diff_chart)
+    if charts is not None:
+        board["charts"] = charts
+    return board
+
+
+def payload_delta(old: dict, new: dict) -> dict:
+    """Structured diff turning dashboard payload `old` into `new`; empty sections are left out.
+
+    - `fields`: other top-level keys (stats, market status, report list, ...) whose value changed, sent whole
+    - `signals`: row diff of `signals.all` plus the code lists of the buy/watch/observe buckets
+    - `holdings`: row diff by code
+    - `histories`: per code, the points appended or rewritten since the old snapshot
+    - `backtests`: per window, changed board fields, row diff of `results` and replaced charts
+    """
+    delta: dict = {}
+    fields = {key: value for key, value in new.items() if key not in _DIFFED_KEYS and old.get(key) != value}
+    if fields:
+        delta["fields"] = fields
+
+    old_signals, new_signals = old.get("signals", {}), new.get("signals", {})
+    signals = diff_rows(old_signals.get("all", []), new_signals.get("all", []))
+    buckets = {
+        bucket: [row["code"] for row in new_signals.get(bucket, [])]
+        for bucket in _SIGNAL_BUCKETS
+        if [row["code"] for row in old_signals.get(bucket, [])] != [row["code"] for row in new_signals.get(bucket, [])]
+    }
+    if signals is not None or buckets:
+        delta["signals"] = {**(signals or {}), "buckets": buckets}
+
+    holdings = diff_rows(old.get("holdings", []), new.get("holdings", []))
+    if holdings is not None:
+        delta["holdings"] = holdings
+
+    histories = _diff_mapping(old.get("histories", {}), new.get("histories", {}), diff_series)
+    if histories is not None:
+        delta["histories"] = histories
+
+    backtests = _diff_mapping(old.get("backtests", {}), new.get("backtests", {}), _diff_backtest_board)
+    if backtests is not None:
+        delta["backtests"] = backtests
+    return delta
+
+
+def apply_rows(old: list[dict], change: dict | None, key: str = "code") -> list[dict]:
+    if change is None:
+        return old
+    if "replace" in change:
+        return change["replace"]
+    rows = {row[key]: row for row in old}
+    for code in change["removed"]:
+        rows.pop(code, None)
+    rows.update((row[key], row) for row in change["changed"])
+    return [rows[code] for code in change["order"]]
+
+
+def apply_series(old: list[dict], change: dict | None) -> list[dict]:
+    if change is None:
+        return old
+    if "replace" in change:
+        return change["replace"]
+    start, cut = change["start"], change["from"]
+    kept = [point for point in old if point["date"] >= start and (cut is None or point["date"] < cut)]
+    return kept + change["points"]
+
+
+def _apply_mapping(old: dict, change: dict | None, apply) -> dict:
+    if change is None:
+        return old
+    merged = {code: value for code, value in old.items() if code not in change["removed"]}
+    for code, value_change in change["changed"].items():
+        merged[code] = value_change["replace"] if "replace" in value_change else apply(old[code], value_change)
+    return merged
+
+
+def _apply_backtest_board(old: dict, change: dict) -> dict:
+    board = {**old, **{key: value for key, value in change.items() if key not in {"results", "charts"}}}
+    board["results"] = apply_rows(old.get("results", []), change.get("results"))
+    board["charts"] = _apply_mapping(old.get("charts", {}), change.get("charts"), lambda chart, _: chart)
+    return board
+
+
+def apply_delta(old: dict, delta: dict) -> dict:
+    """Inverse of `payload_delta`: rebuild the new payload from `old` (the reference for client code)."""
+    new = {**old, **delta.get("fields", {})}
+    if "signals" in delta:
+        signals = dict(old.get("signals", {}))
+        rows_change = {key: value for key, value in delta["signals"].items() if key != "buckets"}
+        signals["all"] = apply_rows(signals.get("all", []), rows_change or None)
+        by_code = {row["code"]: row for row in signals["all"]}
+        for bucket in _SIGNAL_BUCKETS:
+            codes = delta["signals"]["buckets"].get(bucket)
+            if codes is None:
+                codes = [row["code"] for row in signals.get(bucket, [])]
+            signals[bucket] = [by_code[code] for code in codes]
+        new["signals"] = signals
+    new["holdings"] = apply_rows(old.get("holdings", []), delta.get("holdings"))
+    new["histories"] = _apply_mapping(old.get("histories", {}), delta.get("histories"), apply_series)
+    new["backtests"] = _apply_mapping(old.get("backtests", {}), delta.get("backtests"), _apply_backtest_board)
+    return new
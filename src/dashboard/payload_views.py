@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from src.dashboard.series_encoding import encode_series
+
+# Rows carrying a trade marker survive downsampling so every buy/sell stays on the chart.
+CHART_KEEP_FIELDS = ("buy_price", "sell_price")
+
+
+def summary_view(payload: dict) -> dict:
+    """Everything except per-ticker histories and backtest chart series (signals, stats, holdings, boards)."""
+    summary = {key: value for key, value in payload.items() if key != "histories"}
+    summary["backtests"] = {
+        window: {key: value for key, value in board.items() if key != "charts"}
+        for window, board in payload.get("backtests", {}).items()
+    }
+    return summary
+
+
+def normalize_window(window: str) -> str:
+    """Accept `90`, `90d` or `90D` for a backtest board key."""
+    window = window.strip().lower()
+    return window if window.endswith("d") else f"{window}d"
+
+
+def _encode_chart(chart: dict, columnar: bool, points: int | None) -> dict:
+    series = encode_series(chart.get("series", []), columnar, points, keep_fields=CHART_KEEP_FIELDS)
+    return {**chart, "series": series}
+
+
+def series_view(columnar: bool = False, points: int | None = None) -> Callable[[dict], dict]:
+    """The full payload with every history and chart series downsampled and/or columnar-encoded."""
+
+    def view(payload: dict) -> dict:
+        encoded = dict(payload)
+        encoded["histories"] = {
+            code: encode_series(history, columnar, points) for code, history in payload.get("histories", {}).items()
+        }
+        encoded["backtests"] = {
+            window: {
+                **board,
+                "charts": {
+                    code: _encode_chart(chart, columnar, points) for code, chart in board.get("charts", {}).items()
+                },
+            }
+            for window, board in payload.get("backtests", {}).items()
+        }
+        return encoded
+
+    return view
+
+
+def history_view(code: str, columnar: bool = False, points: int | None = None) -> Callable[[dict], list | dict | None]:
+    def view(payload: dict) -> list | dict | None:
+        history = payload.get("histories", {}).get(code)
+        if history is None:
+            return None
+        return encode_series(history, columnar, points)
+
+    return view
+
+
+def backtest_chart_view(
+    window: str, code: str, columnar: bool = False, points: int | None = None
+) -> Callable[[dict], dict | None]:
+    window = normalize_window(window)
+
+    def view(payload: dict) -> dict | None:
+        board = payload.get("backtests", {}).get(window)
+        if board is None:
+            return None
+        chart = board.get("charts", {}).get(code)
+        if chart is None:
+            return None
+        return _encode_chart(chart, columnar, points)
+
+    return view
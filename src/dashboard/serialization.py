@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # optional: `pip install orjson` makes payload encoding several times faster
+    orjson = None
+
+
+def float_column(values: object, digits: int = 4, length: int | None = None) -> list[float | None]:
+    """A whole column as rounded Python floats, with NaN/inf/non-numeric cells as None.
+
+    `values` may be a Series, array or list; None (a missing column) yields `length` Nones.
+    """
+    if values is None:
+        return [None] * (length or 0)
+    numbers = np.asarray(values)
+    if numbers.dtype.kind not in "fiub":
+        numbers = pd.to_numeric(pd.Series(values, copy=False), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    numbers = numbers.astype(float, copy=False)
+    finite = np.isfinite(numbers)
+    column = np.round(np.where(finite, numbers, 0.0), digits).tolist()
+    if not finite.all():
+        for index in np.flatnonzero(~finite).tolist():
+            column[index] = None
+    return column
+
+
+def records_from_columns(columns: dict[str, list]) -> list[dict]:
+    """Zip equally long column lists back into row dicts, keeping the key order of `columns`."""
+    keys = list(columns)
+    return [dict(zip(keys, row)) for row in zip(*columns.values())]
+
+
+def dumps(value: object) -> bytes:
+    """UTF-8 JSON; uses orjson when installed (compact output, NaN as null), else the stdlib encoder."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def loads(data: bytes | str) -> object:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+import numpy as np
+
+
+# Downsampling targets clients may get; a request snaps to one so the per-snapshot memo stays bounded.
+POINT_BUCKETS = (120, 240, 480, 960)
+
+
+def snap_points(points: int) -> int:
+    """The smallest bucket holding at least `points` points, or the largest bucket."""
+    return next((bucket for bucket in POINT_BUCKETS if bucket >= points), POINT_BUCKETS[-1])
+
+
+def lttb_indices(y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets over evenly spaced points; returns the kept row indices, ascending.
+
+    The first and last rows are always kept. NaNs are forward-filled (leading ones back-filled) for the
+    triangle areas only.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=float)
+    valid = ~np.isnan(y)
+    if not valid.all():
+        if not valid.any():
+            return np.linspace(0, n - 1, threshold).round().astype(int)
+        first = int(np.argmax(valid))
+        y = y[np.maximum.accumulate(np.where(valid, np.arange(n), first))]
+
+    x = np.arange(n, dtype=float)
+    # Interior rows split into threshold - 2 buckets; bucket i spans edges[i]:edges[i + 1].
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(int)
+    kept = np.empty(threshold, dtype=int)
+    kept[0] = 0
+    kept[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def downsample_records(
+    records: list[dict],
+    points: int | None,
+    y_field: str,
+    keep_fields: tuple[str, ...] = (),
+) -> list[dict]:
+    """LTTB on `y_field` down to about `points` rows; rows with any `keep_fields` value set always survive."""
+    if not points or len(records) <= points:
+        return records
+    y = np.array([np.nan if row.get(y_field) is None else row[y_field] for row in records], dtype=float)
+    keep = set(lttb_indices(y, points).tolist())
+    for field in keep_fields:
+        keep.update(i for i, row in enumerate(records) if row.get(field) is not None)
+    return [records[i] for i in sorted(keep)]
+
+
+def _parse_date(value: str) -> date:
+    return datetime.strptime(value, "%Y%m%d").date()
+
+
+def to_columnar(records: list[dict], date_field: str = "date") -> dict:
+    """Parallel arrays per field, with YYYYMMDD dates stored as a base date plus day offsets."""
+    fields = [key for key in dict.fromkeys(key for row in records for key in row) if key != date_field]
+    encoded = {
+        "encoding": "columnar",
+        "length": len(records),
+        "columns": {field: [row.get(field) for row in records] for field in fields},
+    }
+    dates = [str(row[date_field]) for row in records]
+    try:
+        parsed = [_parse_date(value) for value in dates]
+    except ValueError:
+        encoded["dates"] = dates
+        return encoded
+    base = parsed[0] if parsed else None
+    encoded["date_base"] = dates[0] if dates else None
+    encoded["date_offsets"] = [(value - base).days for value in parsed]
+    return encoded
+
+
+def encode_series(
+    records: list[dict],
+    columnar: bool = False,
+    points: int | None = None,
+    y_field: str = "close",
+    keep_fields: tuple[str, ...] = (),
+) -> list[dict] | dict:
+    records = downsample_records(records, points, y_field, keep_fields)
+    return to_columnar(records) if columnar else records
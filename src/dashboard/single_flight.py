@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Hashable
+
+from config.settings import settings
+
+
+class Overloaded(RuntimeError):
+    """Too many distinct computations are already queued or running."""
+
+
+class SingleFlight:
+    """Coalesce concurrent computations by key on a bounded thread pool.
+
+    Callers asking for a key that is already in flight share its Future instead of starting another run.
+    At most `max_workers` computations run at once, and at most `max_pending` (running plus queued) are
+    accepted; beyond that `submit` raises `Overloaded` so the server can shed load instead of piling up.
+    """
+
+    def __init__(self, max_workers: int | None = None, max_pending: int | None = None):
+        self.max_workers = max(1, max_workers or settings.DASHBOARD_BUILD_WORKERS)
+        self.max_pending = max(self.max_workers, max_pending or settings.DASHBOARD_MAX_PENDING)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dashboard-build")
+        self._inflight: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def in_flight(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._inflight
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._inflight)
+
+    def submit(self, key: Hashable, fn: Callable, *args) -> Future:
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            if len(self._inflight) >= self.max_pending:
+                raise Overloaded(f"{len(self._inflight)} dashboard computations already queued.")
+            future = self._executor.submit(fn, *args)
+            self._inflight[key] = future
+        # Registered outside the lock: the callback runs inline when the future has already finished.
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def run(self, key: Hashable, fn: Callable, *args):
+        """Run (or join) the computation for `key` and wait for its result."""
+        return self.submit(key, fn, *args).result()
+
+    def _forget(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Callable
+
+from config.settings import settings
+from src.dashboard.http_cache import etag_for
+from src.dashboard.serialization import dumps, loads
+from src.dashboard.single_flight import Overloaded, SingleFlight
+
+
+@dataclass
+class Snapshot:
+    payload: dict
+    version: str
+    built_at: float
+    _encoded: dict[str, tuple[bytes, str]] = field(default_factory=dict, repr=False, compare=False)
+
+    @classmethod
+    def from_json(cls, body: bytes, version: str, built_at: float) -> Snapshot:
+        """Snapshot of an already encoded payload; `body` is served as-is instead of being re-encoded."""
+        snapshot = cls(loads(body), version, built_at)
+        snapshot._encoded["payload"] = (body, etag_for(body, weak=True))
+        return snapshot
+
+    def age(self) -> float:
+        return max(0.0, time.time() - self.built_at)
+
+    def encoded(self, name: str = "payload", view: Callable[[dict], object] | None = None) -> tuple[bytes, str] | None:
+        """UTF-8 JSON and weak ETag of `view(payload)` (the whole payload by default), built once per snapshot.
+
+        The ETag is weak because responses wrap the body in an envelope carrying the changing snapshot age.
+        Returns None, and memoizes nothing, when the view finds nothing: names come from request paths, so
+        caching misses would let unknown codes grow the memo without bound.
+        """
+        cached = self._encoded.get(name)
+        if cached is None:
+            value = self.payload if view is None else view(self.payload)
+            if value is None:
+                return None
+            body = dumps(value)
+            cached = self._encoded[name] = (body, etag_for(body, weak=True))
+        return cached
+
+    def payload_json(self) -> bytes:
+        return self.encoded()[0]
+
+    @property
+    def etag(self) -> str:
+        return self.encoded()[1]
+
+    @property
+    def revision(self) -> str:
+        """Content id of the payload (its ETag hash); clients pass it back as `?since=` for a delta."""
+        return self.etag.removeprefix("W/").strip('"')[:16]
+
+
+class SnapshotCache:
+    """Latest dashboard payload per history window, served as-is and revalidated in the background.
+
+    A snapshot is stale once it is older than `ttl` seconds or `data_version()` no longer matches the
+    version recorded with it; a stale snapshot is still returned while one background rebuild replaces it.
+    Every rebuild goes through `flight`, so concurrent misses, refreshes and revalidations of the same
+    window share one build.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[int, Callable[[str], None]], dict],
+        data_version: Callable[[], str],
+        ttl: float | None = None,
+        max_windows: int = 4,
+        flight: SingleFlight | None = None,
+        keep_versions: int | None = None,
+        on_rebuild: Callable[[int, Snapshot], None] | None = None,
+    ):
+        self._build = build
+        self._data_version = data_version
+        self._on_rebuild = on_rebuild
+        self.ttl = settings.DASHBOARD_SNAPSHOT_TTL if ttl is None else ttl
+        self.max_windows = max_windows
+        self.flight = flight or SingleFlight()
+        self.keep_versions = settings.DASHBOARD_DELTA_VERSIONS if keep_versions is None else keep_versions
+        self._snapshots: OrderedDict[int, Snapshot] = OrderedDict()
+        self._previous: dict[int, deque[Snapshot]] = {}
+        self._listeners: dict[int, list[Callable[[str], None]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(history_days: int) -> tuple[str, int]:
+        return ("snapshot", history_days)
+
+    def peek(self, history_days: int) -> Snapshot | None:
+        with self._lock:
+            return self._snapshots.get(history_days)
+
+    def is_stale(self, snapshot: Snapshot) -> bool:
+        return snapshot.age() >= self.ttl or self._data_version() != snapshot.version
+
+    def is_revalidating(self, history_days: int) -> bool:
+        return self.flight.in_flight(self._key(history_days))
+
+    def store(self, history_days: int, snapshot: Snapshot) -> Snapshot:
+        """Keep `snapshot` unless a newer build for the window already landed; returns the one kept."""
+        with self._lock:
+            current = self._snapshots.get(history_days)
+            if current is not None and current.built_at > snapshot.built_at:
+                return current
+            if current is not None and current is not snapshot and self.keep_versions > 0:
+                self._previous.setdefault(history_days, deque(maxlen=self.keep_versions)).append(current)
+            self._snapshots[history_days] = snapshot
+            self._snapshots.move_to_end(history_days)
+            while len(self._snapshots) > self.max_windows:
+                evicted, _ = self._snapshots.popitem(last=False)
+                self._previous.pop(evicted, None)
+            return snapshot
+
+    def previous(self, history_days: int, revision: str) -> Snapshot | None:
+        """A recently replaced snapshot of the window with this revision, if still kept."""
+        with self._lock:
+            candidates = list(self._previous.get(history_days, ()))
+        # Newest first; revisions are content hashes, so computing them happens outside the lock.
+        return next((snapshot for snapshot in reversed(candidates) if snapshot.revision == revision), None)
+
+    def _progress(self, history_days: int, stage: str) -> None:
+        with self._lock:
+            listeners = list(self._listeners.get(history_days, ()))
+        for listener in listeners:
+            listener(stage)
+
+    def _rebuild(self, history_days: int) -> Snapshot:
+        started = time.time()
+        payload = self._build(history_days, lambda stage: self._progress(history_days, stage))
+        # Read the version after building: the build itself appends freshly fetched bars to the DB.
+        snapshot = Snapshot(payload, self._data_version(), started)
+        kept = self.store(history_days, snapshot)
+        if kept is snapshot and self._on_rebuild is not None:
+            self._on_rebuild(history_days, snapshot)
+        return kept
+
+    def refresh(self, history_days: int, progress: Callable[[str], None] | None = None) -> Snapshot:
+        """Rebuild the window (or join the rebuild already running) and wait for it.
+
+        `progress` receives the build stages reported from here on, including those of a joined build.
+        Raises `Overloaded` when the build queue is full.
+        """
+        if progress is None:
+            return self.flight.run(self._key(history_days), self._rebuild, history_days)
+        with self._lock:
+            self._listeners.setdefault(history_days, []).append(progress)
+        try:
+            return self.flight.run(self._key(history_days), self._rebuild, history_days)
+        finally:
+            with self._lock:
+                listeners = self._listeners[history_days]
+                listeners.remove(progress)
+                if not listeners:
+                    del self._listeners[history_days]
+
+    def get(self, history_days: int) -> Snapshot:
+        """Cached snapshot (stale ones trigger a background rebuild); waits for a build only on a miss."""
+        snapshot = self.peek(history_days)
+        if snapshot is None:
+            return self.refresh(history_days)
+        if self.is_stale(snapshot):
+            self.revalidate(history_days)
+        return snapshot
+
+    def revalidate(self, history_days: int) -> bool:
+        """Queue a background rebuild unless one is already in flight or the queue is full."""
+        key = self._key(history_days)
+        if self.flight.in_flight(key):
+            return False
+        try:
+            future = self.flight.submit(key, self._rebuild, history_days)
+        except Overloaded:
+            return False
+        future.add_done_callback(self._report_failure)
+        return True
+
+    @staticmethod
+    def _report_failure(future) -> None:
+        if future.exception() is not None:
+            print(f"Dashboard snapshot revalidation failed: {future.exception()}")
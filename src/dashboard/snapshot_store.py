@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from config.settings import settings
+from src.dashboard.snapshot_cache import Snapshot
+
+SNAPSHOT_PATH = settings.REPORTS_DIR / "dashboard-data.json"
+
+
+def _meta_path(path: Path) -> Path:
+    return path.with_name(path.stem + ".meta.json")
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def save_snapshot(snapshot: Snapshot, history_days: int, path: Path = SNAPSHOT_PATH) -> Path:
+    """Write the payload JSON and, next to it, the fingerprints it was built against.
+
+    The payload is written first and the meta file last, so a meta file always describes a complete payload.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _write_atomic(path, snapshot.payload_json())
+    meta = {
+        "history_days": history_days,
+        "version": snapshot.version,
+        "revision": snapshot.revision,
+        "built_at": snapshot.built_at,
+    }
+    _write_atomic(_meta_path(path), json.dumps(meta, indent=2).encode("utf-8"))
+    return path
+
+
+def load_snapshot(history_days: int, path: Path = SNAPSHOT_PATH) -> Snapshot | None:
+    """The persisted snapshot for `history_days`, or None if missing, for another window, or torn."""
+    try:
+        meta = json.loads(_meta_path(path).read_text(encoding="utf-8"))
+        body = path.read_bytes()
+    except (OSError, ValueError):
+        return None
+    if meta.get("history_days") != history_days:
+        return None
+    try:
+        snapshot = Snapshot.from_json(body, str(meta["version"]), float(meta["built_at"]))
+    except (KeyError, TypeError, ValueError):
+        return None
+    # The payload file may have been rewritten without its meta (e.g. by an older build); don't trust it then.
+    if snapshot.revision != meta.get("revision"):
+        return None
+    return snapshot
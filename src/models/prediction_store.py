@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config.settings import settings
+
+
+class PredictionStore:
+    """
+    模型历史打分的本地缓存，按 (模型指纹, 标的, 交易日) 存储。
+
+    每行同时记录特征哈希，特征变化（如数据修正）时该行会重新打分；
+    只有逐行独立打分的模型 (row_independent) 会走缓存。
+    只保留最近使用的 `max_fingerprints` 个模型指纹，出现新指纹时删除更早指纹的全部行。
+    """
+
+    def __init__(self, db_path: str | Path | None = None, max_fingerprints: int | None = None):
+        self.db_path = str(db_path or settings.PREDICTION_STORE_PATH)
+        limit = settings.PREDICTION_STORE_MAX_FINGERPRINTS if max_fingerprints is None else max_fingerprints
+        self.max_fingerprints = max(1, limit)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "fingerprint TEXT, ts_code TEXT, trade_date TEXT, row_hash INTEGER, score REAL, "
+                "PRIMARY KEY (fingerprint, ts_code, trade_date))"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS fingerprints (fingerprint TEXT PRIMARY KEY, last_used REAL)")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _touch(self, fingerprint: str) -> None:
+        """记录指纹的使用时间；新指纹出现时按最近使用淘汰多余指纹及其打分。"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            known = conn.execute("SELECT 1 FROM fingerprints WHERE fingerprint=?", (fingerprint,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO fingerprints (fingerprint, last_used) VALUES (?, ?)",
+                (fingerprint, time.time()),
+            )
+            if known is None:
+                conn.execute(
+                    "DELETE FROM fingerprints WHERE fingerprint NOT IN "
+                    "(SELECT fingerprint FROM fingerprints ORDER BY last_used DESC LIMIT ?)",
+                    (self.max_fingerprints,),
+                )
+                # 也清掉建表之前遗留的、没有登记过的指纹
+                conn.execute("DELETE FROM predictions WHERE fingerprint NOT IN (SELECT fingerprint FROM fingerprints)")
+            conn.commit()
+        except Exception as e:
+            print(f"Prediction store prune error: {e}")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_hashes(df: pd.DataFrame, columns: list[str]) -> np.ndarray:
+        hashes = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+        return hashes.view(np.int64)
+
+    def _lookup(self, fingerprint: str, code: str, dates: np.ndarray, hashes: np.ndarray) -> np.ndarray:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute(
+                "SELECT trade_date, row_hash, score FROM predictions WHERE fingerprint=? AND ts_code=?",
+                (fingerprint, code),
+            ).fetchall()
+        finally:
+            conn.close()
+        if not rows:
+            return np.full(len(dates), np.nan)
+        stored = pd.DataFrame(rows, columns=["trade_date", "row_hash", "score"]).astype({"row_hash": "Int64"})
+        stored = stored.set_index("trade_date").reindex(dates)
+        found = stored["row_hash"].notna().to_numpy()
+        same = found & (stored["row_hash"].to_numpy(dtype=np.int64, na_value=0) == hashes)
+        return np.where(same, stored["score"].to_numpy(dtype=float), np.nan)
+
+    def _save(self, fingerprint: str, code: str, dates: np.ndarray, hashes: np.ndarray, scores: np.ndarray) -> None:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO predictions (fingerprint, ts_code, trade_date, row_hash, score) "
+                "VALUES (?, ?, ?, ?, ?)",
+                zip([fingerprint] * len(dates), [code] * len(dates), dates.tolist(), hashes.tolist(), scores.tolist()),
+            )
+            conn.commit()
+        except Exception as e:
+            print(f"Prediction store write error: {e}")
+        finally:
+            conn.close()
+
+    def score_many(self, model, frames: dict[str, pd.DataFrame]) -> dict[str, np.ndarray]:
+        """
+        为多个标的打分：已缓存的行直接读取，缺失的行跨标的拼成一批，只调用一次 predict_batch。
+        """
+        fingerprint = model.fingerprint()
+        columns = getattr(model, "feature_cols", None)
+        if not getattr(model, "row_independent", False) or columns is None or fingerprint == "untrained":
+            return {code: np.asarray(model.predict_batch(df)) for code, df in frames.items()}
+
+        self._touch(fingerprint)
+        scores: dict[str, np.ndarray] = {}
+        keys: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        missing: dict[str, np.ndarray] = {}
+        for code, df in frames.items():
+            dates = df["trade_date"].astype(str).to_numpy()
+            hashes = self._row_hashes(df, columns)
+            cached = self._lookup(fingerprint, code, dates, hashes)
+            # 分数按 float32 返回，与 Booster.predict 的输出一致
+            scores[code] = cached.astype(np.float32)
+            keys[code] = (dates, hashes)
+            todo = np.flatnonzero(np.isnan(cached))
+            if len(todo):
+                missing[code] = todo
+
+        if missing:
+            stacked = pd.concat([frames[code][columns].iloc[rows] for code, rows in missing.items()], ignore_index=True)
+            fresh = np.asarray(model.predict_batch(stacked), dtype=np.float32)
+            bounds = np.cumsum([len(rows) for rows in missing.values()])[:-1]
+            for (code, rows), values in zip(missing.items(), np.split(fresh, bounds)):
+                scores[code][rows] = values
+                dates, hashes = keys[code]
+                self._save(fingerprint, code, dates[rows], hashes[rows], values.astype(float))
+        return scores
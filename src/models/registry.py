@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+
+from src.models.scoring_model import BaseModel
+
+
+@dataclass
+class _Entry:
+    # mtime_ns/size/digest are None when the source file was missing at load time.
+    mtime_ns: int | None
+    size: int | None
+    digest: str | None
+    model: BaseModel | None
+
+
+class ModelRegistry:
+    """Process-wide cache of loaded models keyed by (model class, file path).
+
+    Each call only stats the file the model reads (`model_cls.source_path`, e.g. a legacy pickle). The
+    file is re-hashed when its mtime or size moves, and the model is reloaded only when that content hash
+    differs, so touching or re-copying an identical file is free. Hashing and loading hold a lock for that
+    key only, so a slow reload does not block lookups of other models.
+    """
+
+    def __init__(self):
+        self._entries: dict[tuple[type, str], _Entry] = {}
+        self._key_locks: dict[tuple[type, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _file_digest(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _load(model_cls: type[BaseModel], model_path: str) -> BaseModel | None:
+        model = model_cls(model_path=model_path)
+        return model if model.load_model() else None
+
+    def _entry(self, model_cls: type[BaseModel], model_path: str) -> _Entry:
+        key = (model_cls, os.path.abspath(model_path))
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+            source = model_cls.source_path(model_path)
+            try:
+                stat = os.stat(source)
+            except OSError:
+                # Still let the model try: it reports the missing file itself, and may know other fallbacks.
+                if entry is None or entry.mtime_ns is not None:
+                    entry = _Entry(None, None, None, self._load(model_cls, model_path))
+            else:
+                if entry is not None and (entry.mtime_ns, entry.size) == (stat.st_mtime_ns, stat.st_size):
+                    return entry
+                digest = self._file_digest(source)
+                if entry is not None and entry.digest == digest:
+                    entry.mtime_ns, entry.size = stat.st_mtime_ns, stat.st_size
+                else:
+                    # Failed loads are remembered too, so a broken file is retried only after it changes.
+                    entry = _Entry(stat.st_mtime_ns, stat.st_size, digest, self._load(model_cls, model_path))
+            with self._lock:
+                self._entries[key] = entry
+            return entry
+
+    def get(self, model_cls: type[BaseModel], model_path: str) -> BaseModel | None:
+        """Loaded `model_cls(model_path=...)`, or None when the file is missing or fails to load."""
+        return self._entry(model_cls, model_path).model
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+model_registry = ModelRegistry()
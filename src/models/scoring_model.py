@@ -1,8 +1,12 @@
 from abc import ABC, abstractmethod
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
 class BaseModel(ABC):
+    # 单行得分只取决于该行特征时为 True，可把多个标的的行拼在一起一次打分
+    row_independent = False
+
     @abstractmethod
     def predict(self, df: pd.DataFrame) -> float:
         """
@@ -17,6 +21,19 @@ class BaseModel(ABC):
         """
         return df
 
+    def fingerprint(self) -> str:
+        """
+        模型版本标识，用于缓存键。规则模型默认取类名，子类可覆盖。
+        """
+        return type(self).__name__
+
+    @classmethod
+    def source_path(cls, model_path: str) -> str:
+        """
+        load_model 实际读取的文件，供模型缓存判断文件是否变化。子类有回退文件时覆盖。
+        """
+        return model_path
+
 class RuleBasedModel(BaseModel):
     """
     基于规则权重的透明评分模型
@@ -76,6 +93,35 @@ class RuleBasedModel(BaseModel):
         final_score = score / total_weight
         return round(final_score, 2)
 
+    def predict_batch(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        逐行打分，第 i 行的结果等于 predict(df.iloc[:i + 1])（不含数据时效性检查）。
+        前 29 行数据不足，得分为 0。
+        """
+        if df.empty:
+            return np.zeros(0)
+
+        close = df['close'].to_numpy(dtype=float)
+        rsi = df['rsi_14'].to_numpy(dtype=float)
+        macd = df['macd'].to_numpy(dtype=float)
+        signal = df['macdsignal'].to_numpy(dtype=float)
+        vol = df['vol'].to_numpy(dtype=float)
+        ma5_vol = (df['ma5_vol'] if 'ma5_vol' in df else df['vol'].rolling(5).mean()).to_numpy(dtype=float)
+        prev_close = np.concatenate([[np.nan], close[:-1]])
+        prev_macd = np.concatenate([[np.nan], macd[:-1]])
+        prev_signal = np.concatenate([[np.nan], signal[:-1]])
+
+        # 与 predict 相同的四项规则；NaN 比较为 False，与逐行判断一致
+        score = np.where(rsi < 30, 30.0, np.where(rsi < 50, 15.0, 0.0))
+        score += np.where(close > df['ma20'].to_numpy(dtype=float), 30.0, 0.0)
+        above = macd > signal
+        score += np.where(above & (prev_macd <= prev_signal), 20.0, np.where(above, 10.0, 0.0))
+        score += np.where((close > prev_close) & (vol > ma5_vol), 20.0, 0.0)
+
+        scores = np.round(score / 100, 2)
+        scores[:29] = 0.0
+        return scores
+
     def prepare_data(self, df):
         # 补充一些模型特有的临时计算
         df['ma5_vol'] = df['vol'].rolling(5).mean()
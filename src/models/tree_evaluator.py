@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.models.scoring_model import BaseModel
+
+
+COMPILED_SUFFIX = ".npz"
+
+
+def _file_digest(path: str | Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def compile_booster_json(json_path: str | Path) -> dict[str, np.ndarray]:
+    """Flatten a saved binary:logistic gbtree (xgboost JSON format) into node arrays.
+
+    Node ids are global across trees. Leaves point both children at themselves, so walking a fixed
+    number of steps (the deepest tree's depth) lands every row on its leaf.
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        learner = json.load(f)["learner"]
+
+    objective = learner["objective"]["name"]
+    if objective != "binary:logistic":
+        raise ValueError(f"Unsupported objective for NumPy evaluation: {objective}")
+    booster = learner["gradient_booster"]
+    if booster.get("name") != "gbtree":
+        raise ValueError(f"Unsupported booster for NumPy evaluation: {booster.get('name')}")
+
+    feature_names = learner.get("feature_names") or []
+    if not feature_names:
+        raise ValueError("Model was saved without feature_names; cannot map DataFrame columns.")
+
+    trees = booster["model"]["trees"]
+    sizes = [int(tree["tree_param"]["num_nodes"]) for tree in trees]
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int32)
+
+    feature, threshold, left, right, default_left, depth = [], [], [], [], [], []
+    for tree, offset in zip(trees, offsets):
+        if any(int(t) != 0 for t in tree["split_type"]):
+            raise ValueError("Categorical splits are not supported by the NumPy evaluator.")
+        tree_left = np.asarray(tree["left_children"], dtype=np.int32)
+        tree_right = np.asarray(tree["right_children"], dtype=np.int32)
+        is_leaf = tree_left == -1
+        node_ids = np.arange(len(tree_left), dtype=np.int32)
+        # At leaves split_conditions holds the leaf value.
+        feature.append(np.where(is_leaf, 0, np.asarray(tree["split_indices"], dtype=np.int32)))
+        threshold.append(np.asarray(tree["split_conditions"], dtype=np.float32))
+        left.append(np.where(is_leaf, node_ids, tree_left) + offset)
+        right.append(np.where(is_leaf, node_ids, tree_right) + offset)
+        default_left.append(np.asarray(tree["default_left"], dtype=bool))
+
+        node_depth = np.zeros(len(tree_left), dtype=np.int32)
+        for node in node_ids:
+            if not is_leaf[node]:
+                node_depth[tree_left[node]] = node_depth[tree_right[node]] = node_depth[node] + 1
+        depth.append(int(node_depth.max()))
+
+    base_score = _parse_base_score(learner["learner_model_param"]["base_score"])
+    return {
+        "feature": np.concatenate(feature).astype(np.int32),
+        "threshold": np.concatenate(threshold),
+        "left": np.concatenate(left).astype(np.int32),
+        "right": np.concatenate(right).astype(np.int32),
+        "default_left": np.concatenate(default_left),
+        "roots": offsets,
+        "max_depth": np.int32(max(depth, default=0)),
+        # base_score is stored as a probability; trees add to its logit.
+        "base_margin": np.float32(np.log(base_score / (1.0 - base_score))),
+        "feature_names": np.asarray(feature_names, dtype=str),
+        "source_sha256": np.asarray(_file_digest(json_path)),
+    }
+
+
+def _parse_base_score(value: str | float) -> float:
+    """base_score is a scalar string ("5E-1") before xgboost 3.1 and a vector string ("[4.35E-1]") since."""
+    text = str(value).strip()
+    if text.startswith("["):
+        values = [part for part in text.strip("[]").split(",") if part.strip()]
+        if len(values) != 1:
+            raise ValueError(f"Expected a single base_score for binary:logistic, got {text!r}.")
+        text = values[0]
+    return float(text)
+
+
+def export_compiled(json_path: str | Path, npz_path: str | Path | None = None) -> Path:
+    """Compile `json_path` and save the arrays next to it (data/xgb_model.json -> data/xgb_model.npz)."""
+    json_path = Path(json_path)
+    npz_path = Path(npz_path) if npz_path is not None else json_path.with_suffix(COMPILED_SUFFIX)
+    tmp_path = npz_path.with_name(npz_path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **compile_booster_json(json_path))
+    os.replace(tmp_path, npz_path)
+    return npz_path
+
+
+def evaluate_margin(compiled: dict[str, np.ndarray], X: np.ndarray) -> np.ndarray:
+    """Raw margins for a float32 (rows, features) matrix; NaN follows each split's default branch."""
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    rows = np.arange(len(X))[:, None]
+    node = np.broadcast_to(compiled["roots"], (len(X), len(compiled["roots"])))
+    for _ in range(int(compiled["max_depth"])):
+        value = X[rows, compiled["feature"][node]]
+        go_left = np.where(np.isnan(value), compiled["default_left"][node], value < compiled["threshold"][node])
+        node = np.where(go_left, compiled["left"][node], compiled["right"][node])
+
+    leaves = compiled["threshold"][node]
+    base = np.full((len(X), 1), compiled["base_margin"], dtype=np.float32)
+    # cumsum adds trees one at a time in float32, starting from the base margin.
+    return np.cumsum(np.hstack([base, leaves]), axis=1, dtype=np.float32)[:, -1]
+
+
+class NumpyTreeModel(BaseModel):
+    """Inference-only stand-in for XGBoostModel that scores a compiled booster without importing xgboost."""
+
+    row_independent = True
+
+    def __init__(self, model_path="data/xgb_model.json"):
+        self.model_path = model_path
+        self.compiled: dict[str, np.ndarray] | None = None
+        self.feature_cols: list[str] | None = None
+        self.is_trained = False
+        self._fingerprint = None
+
+    def load_model(self) -> bool:
+        """Load the compiled arrays, recompiling when they are missing or older than the JSON model."""
+        try:
+            if not os.path.exists(self.model_path):
+                print(f"Model file {self.model_path} not found.")
+                return False
+
+            digest = _file_digest(self.model_path)
+            npz_path = Path(self.model_path).with_suffix(COMPILED_SUFFIX)
+            compiled = None
+            if npz_path.exists():
+                with np.load(npz_path) as data:
+                    if str(data["source_sha256"]) == digest:
+                        compiled = {key: data[key] for key in data.files}
+            if compiled is None:
+                try:
+                    export_compiled(self.model_path, npz_path)
+                    with np.load(npz_path) as data:
+                        compiled = {key: data[key] for key in data.files}
+                except OSError:
+                    compiled = compile_booster_json(self.model_path)
+
+            self.compiled = compiled
+            self.feature_cols = [str(name) for name in compiled["feature_names"]]
+            self.is_trained = True
+            # Scores match xgboost to float32 rounding, not bit for bit, so keep their PredictionStore rows apart.
+            self._fingerprint = f"numpy:{digest}"
+            return True
+        except Exception as e:
+            print(f"Failed to load model: {e}")
+            return False
+
+    def predict_batch(self, df: pd.DataFrame) -> np.ndarray:
+        if not self.is_trained:
+            if not self.load_model():
+                return np.zeros(len(df))
+
+        X = df[self.feature_cols].to_numpy(dtype=np.float32, na_value=np.nan)
+        margin = evaluate_margin(self.compiled, X)
+        return (np.float32(1.0) / (np.float32(1.0) + np.exp(-margin))).astype(np.float32)
+
+    def predict(self, df: pd.DataFrame) -> float:
+        if not self.is_trained:
+            if not self.load_model():
+                return 0.0
+
+        if df.empty:
+            return 0.0
+
+        prob = self.predict_batch(df.iloc[[-1]])[0]
+        return round(float(prob), 4)
+
+    def fingerprint(self) -> str:
+        return self._fingerprint or "untrained"
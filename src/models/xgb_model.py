@@ -1,4 +1,6 @@
+import hashlib
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 import joblib
 import numpy as np
@@ -11,12 +13,23 @@ from src.models.scoring_model import BaseModel
 
 
 class XGBoostModel(BaseModel):
-    def __init__(self, model_path="data/xgb_model.json"):
+    row_independent = True
+
+    def __init__(
+        self,
+        model_path="data/xgb_model.json",
+        nthread: int | None = None,
+        search: str | None = None,
+        search_workers: int | None = None,
+        halving_rounds: int = 30,
+    ):
         self.params = {
             "objective": "binary:logistic",
             "eval_metric": "auc",
             "seed": 42,
         }
+        if nthread is not None:
+            self.params["nthread"] = nthread
         self.num_boost_round = 300
         self.feature_cols = [
             "bias_5",
@@ -48,9 +61,18 @@ class XGBoostModel(BaseModel):
             "close_to_ma60",
             "intraday_range",
         ]
+        # "serial": one candidate at a time on a plain DMatrix (default).
+        # "parallel": all candidates at once on a shared QuantileDMatrix.
+        # "halving": parallel, dropping the weaker half every `halving_rounds` (doubling) rounds.
+        self.search = search or settings.XGB_SEARCH
+        if self.search not in ("serial", "parallel", "halving"):
+            raise ValueError(f"Unknown XGBoost search mode: {self.search}")
+        self.search_workers = search_workers
+        self.halving_rounds = halving_rounds
         self.model_path = model_path
         self.model = None
         self.is_trained = False
+        self._fingerprint = None
 
     def _param_candidates(self, scale_pos_weight: float) -> list[dict]:
         candidate_overrides = [
@@ -95,6 +117,105 @@ class XGBoostModel(BaseModel):
         }
         return score, metrics
 
+    def _fit_candidate(
+        self,
+        params: dict,
+        dtrain: xgb.DMatrix,
+        dval: xgb.DMatrix,
+        y_val: pd.Series,
+        val_part: pd.DataFrame,
+        num_boost_round: int,
+        booster: xgb.Booster | None = None,
+    ) -> tuple[xgb.Booster, float, dict]:
+        model = xgb.train(
+            params,
+            dtrain,
+            num_boost_round=num_boost_round,
+            evals=[(dtrain, "train"), (dval, "eval")],
+            early_stopping_rounds=25,
+            verbose_eval=False,
+            xgb_model=booster,
+        )
+        y_pred_prob = model.predict(dval)
+        score, metrics = self._validation_score(y_val, y_pred_prob, val_part)
+        return model, score, metrics
+
+    def _parallel_fit(
+        self,
+        candidates: list[dict],
+        boosters: list[xgb.Booster | None],
+        dtrain: xgb.DMatrix,
+        dval: xgb.DMatrix,
+        y_val: pd.Series,
+        val_part: pd.DataFrame,
+        num_boost_round: int,
+    ) -> list[tuple[xgb.Booster, float, dict]]:
+        """Fit candidates on threads, splitting the thread budget between them (xgboost releases the GIL)."""
+        workers = max(1, min(self.search_workers or len(candidates), len(candidates)))
+        nthread = max(1, (self.params.get("nthread") or os.cpu_count() or 1) // workers)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    self._fit_candidate,
+                    {**params, "nthread": nthread},
+                    dtrain,
+                    dval,
+                    y_val,
+                    val_part,
+                    num_boost_round,
+                    booster,
+                )
+                for params, booster in zip(candidates, boosters)
+            ]
+            return [future.result() for future in futures]
+
+    def _successive_halving(
+        self,
+        candidates: list[dict],
+        dtrain: xgb.DMatrix,
+        dval: xgb.DMatrix,
+        y_val: pd.Series,
+        val_part: pd.DataFrame,
+    ) -> list[tuple[xgb.Booster | None, float, dict | None]]:
+        """Grow all candidates a few dozen rounds at a time, keeping the better half by validation score each rung.
+
+        Dropped candidates come back as (None, score, metrics) from the rung that eliminated them.
+        """
+        scored: list[tuple] = [(None, -np.inf, None)] * len(candidates)
+        alive = list(range(len(candidates)))
+        converged: set[int] = set()
+        rounds_done = 0
+        rung_rounds = self.halving_rounds
+        while True:
+            target = self.num_boost_round if len(alive) == 1 else min(rounds_done + rung_rounds, self.num_boost_round)
+            growing = [i for i in alive if i not in converged]
+            results = self._parallel_fit(
+                [candidates[i] for i in growing],
+                [scored[i][0] for i in growing],
+                dtrain,
+                dval,
+                y_val,
+                val_part,
+                target - rounds_done,
+            )
+            for i, result in zip(growing, results):
+                scored[i] = result
+                if result[0].num_boosted_rounds() < target:
+                    # Early stopping already fired; more rounds would not change this candidate.
+                    converged.add(i)
+            rounds_done = target
+            if rounds_done >= self.num_boost_round or all(i in converged for i in alive):
+                break
+
+            ranked = sorted(alive, key=lambda i: scored[i][1], reverse=True)
+            keep = set(ranked[: (len(ranked) + 1) // 2])
+            for i in alive:
+                if i not in keep:
+                    scored[i] = (None, scored[i][1], scored[i][2])
+            alive = [i for i in alive if i in keep]
+            rung_rounds *= 2
+        return scored
+
     def train(self, df: pd.DataFrame):
         horizon = settings.TRAIN_LABEL_HORIZON
         required_cols = self.feature_cols + ["target", "sample_weight", f"quality_{horizon}d", f"future_max_ret_{horizon}d", f"future_min_ret_{horizon}d"]
@@ -123,25 +244,39 @@ class XGBoostModel(BaseModel):
         neg_count = len(y_train) - pos_count
         scale_pos_weight = neg_count / pos_count if pos_count > 0 else 1.0
 
-        dtrain = xgb.DMatrix(X_train, label=y_train, weight=w_train, feature_names=self.feature_cols)
-        dval = xgb.DMatrix(X_val, label=y_val, weight=w_val, feature_names=self.feature_cols)
+        candidates = self._param_candidates(scale_pos_weight)
+        if self.search == "serial":
+            dtrain = xgb.DMatrix(X_train, label=y_train, weight=w_train, feature_names=self.feature_cols)
+            dval = xgb.DMatrix(X_val, label=y_val, weight=w_val, feature_names=self.feature_cols)
+            scored = [
+                self._fit_candidate(params, dtrain, dval, y_val, val_part, self.num_boost_round)
+                for params in candidates
+            ]
+        else:
+            # Quantize once; every candidate (and every thread) reuses the same histogram index.
+            dtrain = xgb.QuantileDMatrix(X_train, label=y_train, weight=w_train, feature_names=self.feature_cols)
+            dval = xgb.QuantileDMatrix(X_val, label=y_val, weight=w_val, feature_names=self.feature_cols, ref=dtrain)
+            if self.search == "halving":
+                scored = self._successive_halving(candidates, dtrain, dval, y_val, val_part)
+            else:
+                scored = self._parallel_fit(
+                    candidates,
+                    [None] * len(candidates),
+                    dtrain,
+                    dval,
+                    y_val,
+                    val_part,
+                    self.num_boost_round,
+                )
 
         best_model = None
         best_score = -np.inf
         best_metrics = None
         best_params = None
 
-        for idx, params in enumerate(self._param_candidates(scale_pos_weight), start=1):
-            model = xgb.train(
-                params,
-                dtrain,
-                num_boost_round=self.num_boost_round,
-                evals=[(dtrain, "train"), (dval, "eval")],
-                early_stopping_rounds=25,
-                verbose_eval=False,
-            )
-            y_pred_prob = model.predict(dval)
-            score, metrics = self._validation_score(y_val, y_pred_prob, val_part)
+        for idx, (params, (model, score, metrics)) in enumerate(zip(candidates, scored), start=1):
+            if model is None:
+                continue
             if score > best_score:
                 best_model = model
                 best_score = score
@@ -154,6 +289,7 @@ class XGBoostModel(BaseModel):
 
         self.model = best_model
         self.is_trained = best_model is not None
+        self._fingerprint = None
 
         if not self.is_trained:
             print("Training failed.")
@@ -189,18 +325,38 @@ class XGBoostModel(BaseModel):
         dtest = xgb.DMatrix(data, feature_names=self.feature_cols)
         return self.model.predict(dtest)
 
+    @staticmethod
+    def _file_digest(path: str) -> str:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def fingerprint(self) -> str:
+        """Content hash of the loaded booster; changes whenever the model file or a retrain changes it."""
+        if self._fingerprint is None and self.model is not None:
+            self._fingerprint = hashlib.sha256(bytes(self.model.save_raw(raw_format="ubj"))).hexdigest()
+        return self._fingerprint or "untrained"
+
     def save_model(self):
         self.model.save_model(self.model_path)
         print(f"XGBoost model saved to {self.model_path}")
 
+    @classmethod
+    def source_path(cls, model_path: str) -> str:
+        """The JSON model, or the legacy pickle next to it when only that exists."""
+        pkl_path = model_path.replace(".json", ".pkl")
+        if not os.path.exists(model_path) and os.path.exists(pkl_path):
+            return pkl_path
+        return model_path
+
     def load_model(self) -> bool:
         try:
             if not os.path.exists(self.model_path):
-                pkl_path = self.model_path.replace(".json", ".pkl")
-                if os.path.exists(pkl_path):
+                pkl_path = self.source_path(self.model_path)
+                if pkl_path != self.model_path:
                     print(f"Loading legacy model from {pkl_path}...")
                     self.model = joblib.load(pkl_path)
                     self.is_trained = True
+                    self._fingerprint = self._file_digest(pkl_path)
                     return True
                 print(f"Model file {self.model_path} not found.")
                 return False
@@ -208,6 +364,7 @@ class XGBoostModel(BaseModel):
             self.model = xgb.Booster()
             self.model.load_model(self.model_path)
             self.is_trained = True
+            self._fingerprint = self._file_digest(self.model_path)
             return True
         except Exception as e:
             print(f"Failed to load model: {e}")
@@ -0,0 +1,203 @@
+import unittest
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+
+from src.backtest.backtester import Backtester, equity_curve_records, extract_bars, trade_records
+from src.backtest.strategy_config import StrategyConfig
+
+
+def _synthetic_bars(seed: int, days: int = 160) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 3.0 * np.exp(np.cumsum(rng.normal(0.0005, 0.018, days)))
+    open_ = close * (1 + rng.normal(0, 0.006, days))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.008, days)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.008, days)))
+    atr = pd.Series(high - low).ewm(alpha=1 / 14, adjust=False).mean().to_numpy()
+    dates = pd.bdate_range("2025-01-02", periods=days).strftime("%Y%m%d")
+    return pd.DataFrame(
+        {
+            "trade_date": dates,
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "atr": atr,
+        }
+    )
+
+
+def _reference_run(backtester, df, probs, threshold, code, exit_probs, config):
+    """Row-by-row implementation the array engine replaced, kept as the parity oracle."""
+    cash = backtester.initial_capital
+    position = 0
+    equity_curve = []
+    trades = []
+    trailing_stop = 0.0
+    entry_price = 0.0
+    exit_probs = probs if exit_probs is None else exit_probs
+    peak_equity = backtester.initial_capital
+    multiplier = config.atr_multiplier
+
+    for i in range(len(df) - 1):
+        date = df.iloc[i]["trade_date"]
+        close_price = df.iloc[i]["close"]
+        atr = df.iloc[i]["atr"]
+        entry_score = probs[i]
+        exit_score = exit_probs[i]
+        next_open = df.iloc[i + 1]["open"]
+        next_low = df.iloc[i + 1]["low"]
+        next_date = df.iloc[i + 1]["trade_date"]
+
+        current_equity = cash + position * close_price
+        equity_curve.append({"date": date, "equity": current_equity})
+        if current_equity > peak_equity:
+            peak_equity = current_equity
+
+        drawdown = (peak_equity - current_equity) / peak_equity if peak_equity > 0 else 0.0
+        if drawdown >= config.max_drawdown_stop:
+            if position > 0:
+                cash += position * next_open
+                trades.append({"date": next_date, "action": "SELL (MaxDD)", "price": next_open, "pnl": (next_open - entry_price) * position})
+                position = 0
+            break
+
+        if position > 0:
+            if next_low < trailing_stop:
+                sell_price = min(next_open, trailing_stop)
+                cash += position * sell_price
+                trades.append({"date": next_date, "action": "SELL (Stop)", "price": sell_price, "pnl": (sell_price - entry_price) * position})
+                position = 0
+                trailing_stop = 0.0
+                continue
+            if exit_score is not None and np.isfinite(exit_score) and exit_score < config.signal_exit_threshold:
+                cash += position * next_open
+                trades.append({"date": next_date, "action": "SELL (Signal)", "price": next_open, "pnl": (next_open - entry_price) * position})
+                position = 0
+                trailing_stop = 0.0
+                continue
+            window_start = max(0, i - config.exit_lookback_period + 1)
+            recent_high = df["high"].iloc[window_start : i + 1].max()
+            new_stop = recent_high - (multiplier * atr)
+            if new_stop > trailing_stop:
+                trailing_stop = new_stop
+
+        if position == 0:
+            if entry_score is not None and np.isfinite(entry_score) and entry_score > 0 and entry_score >= threshold:
+                shares = int((cash * 0.99) / next_open / 100) * 100
+                if shares > 0:
+                    position = shares
+                    cash -= shares * next_open
+                    entry_price = next_open
+                    trailing_stop = next_open - (multiplier * atr)
+                    trades.append({"date": next_date, "action": "BUY", "price": next_open, "score": entry_score})
+
+    final_equity = cash + position * df.iloc[-1]["close"]
+    equity_curve.append({"date": df.iloc[-1]["trade_date"], "equity": final_equity})
+    return final_equity, equity_curve, trades
+
+
+class BacktesterParityTest(unittest.TestCase):
+    def setUp(self):
+        self.backtester = Backtester()
+        self.base_config = StrategyConfig.from_settings()
+
+    def _assert_matches_reference(self, df, probs, exit_probs, config, threshold=0.0):
+        result = self.backtester.run(df, probs, threshold=threshold, code="510300.SH", exit_probs=exit_probs, config=config)
+        final_equity, equity_curve, trades = _reference_run(self.backtester, df, probs, threshold, "510300.SH", exit_probs, config)
+
+        self.assertAlmostEqual(result["final_equity"], final_equity, places=6)
+        self.assertEqual(result["equity_curve"]["date"].tolist(), [p["date"] for p in equity_curve])
+        np.testing.assert_allclose(result["equity_curve"]["equity"], [p["equity"] for p in equity_curve])
+        self.assertEqual(
+            [(t["date"], t["action"]) for t in trade_records(result["trades"])],
+            [(t["date"], t["action"]) for t in trades],
+        )
+        np.testing.assert_allclose(result["trades"]["price"], [t["price"] for t in trades])
+
+        sells = [t for t in trades if t["action"].startswith("SELL")]
+        self.assertEqual(result["num_trades"], len(sells))
+        if sells:
+            wins = sum(1 for t in sells if t["pnl"] > 0)
+            self.assertAlmostEqual(result["win_rate"], wins / len(sells))
+        return result
+
+    def test_matches_reference_across_configs(self):
+        configs = [
+            self.base_config,
+            replace(self.base_config, signal_exit_threshold=0.25, exit_lookback_period=30, atr_multiplier=1.0),
+            replace(self.base_config, max_drawdown_stop=0.03),
+        ]
+        for seed in range(6):
+            df = _synthetic_bars(seed)
+            rng = np.random.default_rng(100 + seed)
+            probs = rng.uniform(0.0, 1.0, len(df))
+            entry = np.where(probs >= 0.6, probs, 0.0)
+            for config in configs:
+                with self.subTest(seed=seed, config=config):
+                    self._assert_matches_reference(df, entry, probs, config)
+
+    def test_drawdown_stop_truncates_equity_curve(self):
+        df = _synthetic_bars(3)
+        probs = np.full(len(df), 0.9)
+        config = replace(self.base_config, max_drawdown_stop=0.01, signal_exit_threshold=0.0)
+        result = self._assert_matches_reference(df, probs, None, config, threshold=0.6)
+        self.assertLess(len(result["equity_curve"]), len(df))
+        self.assertEqual(result["equity_curve"]["date"][-1], df.iloc[-1]["trade_date"])
+
+    def test_non_finite_scores_never_enter(self):
+        df = _synthetic_bars(1, days=40)
+        probs = np.full(len(df), np.nan)
+        result = self.backtester.run(df, probs, threshold=0.0, code="510300.SH")
+        self.assertEqual(len(result["trades"]), 0)
+        self.assertEqual(result["final_equity"], self.backtester.initial_capital)
+
+    def test_legacy_record_helpers(self):
+        df = _synthetic_bars(4, days=80)
+        probs = np.random.default_rng(9).uniform(0.0, 1.0, len(df))
+        result = self.backtester.run(df, probs, threshold=0.6, code="510300.SH")
+        trades = trade_records(result["trades"])
+
+        self.assertTrue(trades)
+        for trade in trades:
+            expected_keys = {"date", "action", "price", "score"} if trade["action"] == "BUY" else {"date", "action", "price", "pnl"}
+            self.assertEqual(set(trade), expected_keys)
+        curve = equity_curve_records(result["equity_curve"])
+        self.assertEqual(curve[-1], {"date": df.iloc[-1]["trade_date"], "equity": result["final_equity"]})
+
+
+class BacktestStateTest(unittest.TestCase):
+    def _assert_same_result(self, actual, expected):
+        for field in ("total_return", "win_rate", "num_trades", "final_equity", "max_drawdown", "volatility", "sharpe", "exposure"):
+            self.assertEqual(actual[field], expected[field], field)
+        self.assertEqual(equity_curve_records(actual["equity_curve"]), equity_curve_records(expected["equity_curve"]))
+        self.assertEqual(trade_records(actual["trades"]), trade_records(expected["trades"]))
+
+    def test_checkpoint_and_advance_matches_full_run(self):
+        backtester = Backtester()
+        base = StrategyConfig.from_settings()
+        for config in (base, replace(base, max_drawdown_stop=0.03, exit_lookback_period=5)):
+            for seed in range(3):
+                bars = extract_bars(_synthetic_bars(seed))
+                probs = np.random.default_rng(200 + seed).uniform(0.0, 1.0, len(bars["close"]))
+                full = backtester.run_bars(bars, probs, threshold=0.6, code="588000.SH", config=config)
+
+                state = backtester.start(threshold=0.6, code="588000.SH", config=config)
+                cuts = [0, 1, 37, 38, 90, 151, len(probs)]
+                checkpoints = []
+                for start, stop in zip(cuts, cuts[1:]):
+                    chunk = {name: values[start:stop] for name, values in bars.items()}
+                    backtester.advance(state, chunk, probs[start:stop])
+                    checkpoints.append((stop, state.checkpoint()))
+
+                with self.subTest(config=config, seed=seed):
+                    self._assert_same_result(backtester.summarize(state), full)
+                    stop, resumed = checkpoints[2]
+                    rest = {name: values[stop:] for name, values in bars.items()}
+                    backtester.advance(resumed, rest, probs[stop:])
+                    self._assert_same_result(backtester.summarize(resumed), full)
+
+
+if __name__ == "__main__":
+    unittest.main()
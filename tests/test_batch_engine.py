@@ -0,0 +1,93 @@
+import unittest
+from dataclasses import replace
+
+import numpy as np
+
+from src.backtest.backtester import Backtester, trade_records
+from src.backtest.batch_engine import run_batched_backtests, summarize_batch, sweep_thresholds
+from src.backtest.hybrid_runner import run_backtest_for_cache, summarize_results
+from src.backtest.strategy_config import StrategyConfig
+from tests.test_backtester import _synthetic_bars
+
+
+CODES = ["510300.SH", "588000.SH", "512880.SH", "515070.SH"]
+
+
+def _data_cache() -> tuple[dict[str, dict], dict[str, str]]:
+    data_cache = {}
+    for seed, code in enumerate(CODES):
+        df = _synthetic_bars(seed, days=120 - 7 * seed)
+        probs = np.random.default_rng(50 + seed).uniform(0.2, 0.95, len(df)).astype(np.float32)
+        data_cache[code] = {"test_df": df, "probs": probs}
+
+    dates = sorted({d for payload in data_cache.values() for d in payload["test_df"]["trade_date"]})
+    regimes = ["Bull Market", "Volatile Market", "Bear Market"]
+    market_status_map = {date: regimes[(i // 17) % 3] for i, date in enumerate(dates)}
+    return data_cache, market_status_map
+
+
+class BatchEngineParityTest(unittest.TestCase):
+    def test_batched_configs_match_serial_runs(self):
+        data_cache, market_status_map = _data_cache()
+        base = StrategyConfig.from_settings()
+        configs = [
+            base,
+            replace(base, use_dynamic_threshold=False, bull_base_threshold=0.55, signal_exit_threshold=0.3),
+            replace(base, dynamic_threshold_lookback=30, dynamic_threshold_quantile=0.7, atr_multiplier=1.0),
+            replace(base, max_drawdown_stop=0.03, exit_lookback_period=30),
+        ]
+        batch = run_batched_backtests(data_cache, market_status_map, configs)
+        summaries = summarize_batch(batch)
+
+        for k, config in enumerate(configs):
+            serial = run_backtest_for_cache(data_cache, Backtester(), market_status_map, config=config)
+            batched = batch.results_for(k)
+            for expected, actual in zip(serial, batched):
+                with self.subTest(config=k, code=expected["code"]):
+                    self.assertEqual(actual["code"], expected["code"])
+                    self.assertEqual(actual["mode"], expected["mode"])
+                    self.assertEqual(actual["num_trades"], expected["num_trades"])
+                    self.assertEqual(actual["bear_days"], expected["bear_days"])
+                    for field in ("total_return", "win_rate", "max_drawdown", "volatility", "sharpe", "sortino", "calmar", "exposure"):
+                        self.assertAlmostEqual(actual[field], expected[field], places=9)
+
+            expected_summary = summarize_results(serial)
+            for field, value in expected_summary.items():
+                self.assertAlmostEqual(summaries[k][field], value, places=9)
+
+    def test_process_pool_matches_in_process_runs(self):
+        data_cache, market_status_map = _data_cache()
+        base = StrategyConfig.from_settings()
+        configs = [base, replace(base, max_drawdown_stop=0.03), replace(base, atr_multiplier=1.0)]
+
+        serial = run_backtest_for_cache(data_cache, Backtester(), market_status_map, config=base)
+        pooled = run_backtest_for_cache(data_cache, Backtester(), market_status_map, config=base, workers=2)
+        self.assertEqual([r["code"] for r in pooled], [r["code"] for r in serial])
+        for expected, actual in zip(serial, pooled):
+            self.assertEqual(actual["total_return"], expected["total_return"])
+            self.assertEqual(trade_records(actual["trades"]), trade_records(expected["trades"]))
+
+        batch = run_batched_backtests(data_cache, market_status_map, configs)
+        pooled_batch = run_batched_backtests(data_cache, market_status_map, configs, workers=2)
+        np.testing.assert_array_equal(pooled_batch.total_return, batch.total_return)
+        np.testing.assert_array_equal(pooled_batch.num_trades, batch.num_trades)
+
+    def test_threshold_sweep_matches_override_runs(self):
+        data_cache, market_status_map = _data_cache()
+        config = StrategyConfig.from_settings()
+        thresholds = np.round(np.linspace(0.5, 0.8, 13), 3).tolist()
+
+        frame = sweep_thresholds(data_cache, market_status_map, thresholds, config=config).to_frame()
+        self.assertEqual(len(frame), len(thresholds) * len(CODES))
+        grid = frame.pivot(index="label", columns="code", values="total_return")
+        trades = frame.pivot(index="label", columns="code", values="num_trades")
+        for threshold in thresholds:
+            overrides = {code: threshold for code in data_cache}
+            for res in run_backtest_for_cache(data_cache, Backtester(), market_status_map, overrides, config):
+                with self.subTest(threshold=threshold, code=res["code"]):
+                    self.assertAlmostEqual(grid.loc[threshold, res["code"]], res["total_return"], places=9)
+                    self.assertEqual(trades.loc[threshold, res["code"]], res["num_trades"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import gzip
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.dashboard import compression
+from src.dashboard.compression import compress, negotiate
+from src.dashboard.http_cache import FileCache
+
+
+class NegotiateTest(unittest.TestCase):
+    def test_accept_encoding(self):
+        self.assertIsNone(negotiate(None))
+        self.assertIsNone(negotiate("identity"))
+        self.assertIsNone(negotiate("gzip;q=0"))
+        self.assertEqual(negotiate("gzip, deflate"), "gzip")
+        self.assertEqual(negotiate("*"), compression.supported_encodings()[0])
+        if compression.brotli is not None:
+            self.assertEqual(negotiate("gzip, br"), "br")
+        else:
+            self.assertEqual(negotiate("gzip, br"), "gzip")
+            self.assertIsNone(negotiate("br"))
+
+    def test_gzip_round_trip_is_deterministic(self):
+        body = b'{"signals": []}' * 200
+        packed = compress(body, "gzip")
+        self.assertEqual(gzip.decompress(packed), body)
+        self.assertEqual(packed, compress(body, "gzip"))
+        with self.assertRaises(ValueError):
+            compress(body, "deflate")
+
+
+class PrecompressTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        (self.tmp / "assets").mkdir()
+        (self.tmp / "assets" / "app.js").write_text("console.log(1);" * 500, encoding="utf-8")
+        (self.tmp / "favicon.png").write_bytes(b"\x89PNG" * 500)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_variants_are_built_once_with_their_own_etag(self):
+        cache = FileCache()
+        sizes = {path.name: (size, encoded) for path, size, encoded in cache.precompress(self.tmp)}
+        self.assertIn("gzip", sizes["app.js"][1])
+        self.assertLess(sizes["app.js"][1]["gzip"], sizes["app.js"][0])
+        self.assertEqual(sizes["favicon.png"][1], {})
+
+        entry = cache.get(self.tmp / "assets" / "app.js")
+        body, etag = entry.variant("gzip")
+        self.assertIs(entry.variant("gzip")[0], body)
+        self.assertNotEqual(etag, entry.etag)
+        self.assertEqual(gzip.decompress(body), entry.body)
+        self.assertEqual(entry.variant(None), (entry.body, entry.etag))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.dashboard.http_cache import FileCache, etag_for, etag_matches
+from src.dashboard.snapshot_cache import Snapshot
+
+
+class ETagTest(unittest.TestCase):
+    def test_if_none_match_uses_weak_comparison(self):
+        strong = etag_for(b"payload")
+        weak = etag_for(b"payload", weak=True)
+        self.assertEqual(weak, "W/" + strong)
+        self.assertTrue(etag_matches(strong, weak))
+        self.assertTrue(etag_matches(f'"other", {weak}', strong))
+        self.assertTrue(etag_matches("*", strong))
+        self.assertFalse(etag_matches(etag_for(b"changed"), strong))
+        self.assertFalse(etag_matches(None, strong))
+
+    def test_snapshot_etag_follows_payload_content(self):
+        first = Snapshot({"score": 0.61}, "v1", 1.0)
+        same = Snapshot({"score": 0.61}, "v2", 2.0)
+        changed = Snapshot({"score": 0.62}, "v1", 1.0)
+        self.assertEqual(first.etag, same.etag)
+        self.assertNotEqual(first.etag, changed.etag)
+
+
+class FileCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = Path(self.tmp) / "report.md"
+        self.path.write_text("# v1", encoding="utf-8")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_rereads_only_after_file_changes(self):
+        cache = FileCache()
+        first = cache.get(self.path)
+        self.assertIs(cache.get(self.path), first)
+
+        self.path.write_text("# v2 longer", encoding="utf-8")
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        second = cache.get(self.path)
+        self.assertEqual(second.body, b"# v2 longer")
+        self.assertNotEqual(second.etag, first.etag)
+
+
+if __name__ == "__main__":
+    unittest.main()
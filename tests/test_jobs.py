@@ -0,0 +1,48 @@
+import threading
+import unittest
+
+from src.dashboard.jobs import JobManager
+from src.dashboard.single_flight import Overloaded
+
+
+class JobManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.jobs = JobManager(max_running=1)
+        self.release = threading.Event()
+
+    def _action(self, job):
+        job.report_stage("fetch")
+        self.release.wait(5)
+        job.report_stage("backtests")
+        return {"ok": True}
+
+    def test_stages_then_done_and_running_jobs_are_joined(self):
+        job = self.jobs.submit("refresh-dashboard", ("refresh", 120), self._action)
+        self.assertIs(self.jobs.submit("refresh-dashboard", ("refresh", 120), self._action), job)
+        with self.assertRaises(Overloaded):
+            self.jobs.submit("refresh-dashboard", ("refresh", 90), self._action)
+        self.assertEqual([event.event for event in job.wait_events(0, 5)], ["stage"])
+
+        self.release.set()
+        events = []
+        while not events or events[-1].event != "done":
+            events += job.wait_events(len(events), 5)
+        self.assertEqual([event.data.get("stage") for event in events], ["fetch", "backtests", None])
+        self.assertEqual([event.id for event in events], [1, 2, 3])
+        self.assertEqual((job.status, job.result), ("done", {"ok": True}))
+        self.assertIs(self.jobs.get(job.id), job)
+        self.assertIsNot(self.jobs.submit("refresh-dashboard", ("refresh", 120), self._action), job)
+
+    def test_failure_is_reported_as_event(self):
+        def broken(job):
+            raise RuntimeError("tushare down")
+
+        job = self.jobs.submit("generate-report", "report", broken)
+        events = job.wait_events(0, 5)
+        self.assertEqual(events[-1].event, "failed")
+        self.assertEqual(events[-1].data["error"], "tushare down")
+        self.assertEqual(job.describe()["status"], "failed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.dashboard.data_builder import _score_universe
+from src.models.xgb_model import XGBoostModel
+
+
+class UniverseScoringTest(unittest.TestCase):
+    def test_stacked_scores_match_per_ticker_calls(self):
+        model = XGBoostModel(model_path="data/xgb_model.json")
+        if not model.load_model():
+            self.skipTest("data/xgb_model.json is not available")
+
+        rng = np.random.default_rng(3)
+        frames = {}
+        for code, rows in (("510300.SH", 90), ("588000.SH", 61), ("512880.SH", 120)):
+            frame = pd.DataFrame(rng.normal(size=(rows, len(model.feature_cols))), columns=model.feature_cols)
+            frame["trade_date"] = pd.bdate_range("2025-01-02", periods=rows).strftime("%Y%m%d")
+            frames[code] = frame
+
+        scores = _score_universe(model, frames)
+        self.assertEqual(list(scores), list(frames))
+        for code, frame in frames.items():
+            with self.subTest(code=code):
+                np.testing.assert_array_equal(scores[code], model.predict_batch(frame))
+                self.assertEqual(round(float(scores[code][-1]), 4), model.predict(frame))
+                np.testing.assert_array_equal(scores[code][-45:], model.predict_batch(frame.tail(45)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+
+from src.backtest.metrics import equity_metrics, summarize_runs
+
+
+def _loop_max_drawdown(values: np.ndarray) -> float:
+    peak = -np.inf
+    max_drawdown = 0.0
+    for eq in values:
+        if eq > peak:
+            peak = eq
+        if peak > 0:
+            max_drawdown = max(max_drawdown, (peak - eq) / peak)
+    return max_drawdown
+
+
+class MetricsTest(unittest.TestCase):
+    def test_padded_block_matches_single_runs(self):
+        rng = np.random.default_rng(7)
+        lengths = np.array([[40, 25, 2], [1, 33, 40]])
+        block = np.full((40,) + lengths.shape, np.nan)
+        position = np.full_like(block, np.nan)
+        for k, t in np.ndindex(lengths.shape):
+            n = lengths[k, t]
+            block[:n, k, t] = 100000.0 * np.cumprod(1.0 + rng.normal(0.0, 0.02, n))
+            position[:n, k, t] = rng.integers(0, 2, n) * 100
+
+        batched = equity_metrics(block, position)
+        for k, t in np.ndindex(lengths.shape):
+            n = lengths[k, t]
+            single = equity_metrics(block[:n, k, t], position[:n, k, t])
+            with self.subTest(k=k, t=t):
+                self.assertAlmostEqual(batched["max_drawdown"][k, t], _loop_max_drawdown(block[:n, k, t]), places=12)
+                for field, value in single.items():
+                    self.assertAlmostEqual(batched[field][k, t], float(value), places=12)
+
+        self.assertEqual(batched["volatility"][1, 0], 0.0)
+        self.assertEqual(batched["sharpe"][0, 2], 0.0)
+
+    def test_summary_rows_per_config(self):
+        total_return = np.array([[0.1, -0.05], [0.0, 0.2]])
+        win_rate = np.array([[0.5, 0.0], [0.0, 2 / 3]])
+        num_trades = np.array([[2, 1], [0, 3]])
+        zeros = np.zeros_like(total_return)
+
+        summary = summarize_runs(total_return, win_rate, num_trades, zeros, zeros)
+        np.testing.assert_allclose(summary["avg_return"], [0.025, 0.1])
+        np.testing.assert_allclose(summary["positive_ratio"], [0.5, 0.5])
+        np.testing.assert_array_equal(summary["total_trades"], [3, 3])
+        np.testing.assert_allclose(summary["overall_win_rate"], [1 / 3, 2 / 3])
+
+        empty = summarize_runs(np.zeros((2, 0)), np.zeros((2, 0)), np.zeros((2, 0)), np.zeros((2, 0)), np.zeros((2, 0)))
+        np.testing.assert_array_equal(empty["avg_return"], [0.0, 0.0])
+        np.testing.assert_array_equal(empty["overall_win_rate"], [0.0, 0.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+from src.models.registry import ModelRegistry
+from src.models.scoring_model import BaseModel
+from src.models.xgb_model import XGBoostModel
+
+
+class _FileModel(BaseModel):
+    loads = 0
+
+    def __init__(self, model_path: str):
+        self.model_path = model_path
+
+    def load_model(self) -> bool:
+        type(self).loads += 1
+        path = Path(self.model_path)
+        return path.exists() and path.read_text() != "broken"
+
+    def predict(self, df: pd.DataFrame) -> float:
+        return 0.0
+
+
+class ModelRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = str(Path(self.tmp) / "model.json")
+        Path(self.path).write_text("v1")
+        _FileModel.loads = 0
+        self.registry = ModelRegistry()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _bump_mtime(self):
+        self._bump_mtime_of(self.path)
+
+    @staticmethod
+    def _bump_mtime_of(path):
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_loads_once_until_content_changes(self):
+        first = self.registry.get(_FileModel, self.path)
+        self.assertIs(self.registry.get(_FileModel, self.path), first)
+
+        self._bump_mtime()
+        self.assertIs(self.registry.get(_FileModel, self.path), first)
+        self.assertEqual(_FileModel.loads, 1)
+
+        Path(self.path).write_text("v2")
+        self._bump_mtime()
+        second = self.registry.get(_FileModel, self.path)
+        self.assertIsNot(second, first)
+        self.assertEqual(_FileModel.loads, 2)
+
+    def test_missing_or_broken_file(self):
+        Path(self.path).write_text("broken")
+        self.assertIsNone(self.registry.get(_FileModel, self.path))
+        self.assertIsNone(self.registry.get(_FileModel, self.path))
+        self.assertEqual(_FileModel.loads, 1)
+
+        os.remove(self.path)
+        self.assertIsNone(self.registry.get(_FileModel, self.path))
+        self.assertIsNone(self.registry.get(_FileModel, self.path))
+        self.assertEqual(_FileModel.loads, 2)
+
+    def test_legacy_pickle_is_loaded_when_json_is_missing(self):
+        os.remove(self.path)
+        pkl_path = Path(self.path).with_suffix(".pkl")
+        joblib.dump({"booster": 1}, pkl_path)
+
+        first = self.registry.get(XGBoostModel, self.path)
+        self.assertIsNotNone(first)
+        self.assertEqual(first.model, {"booster": 1})
+        self.assertIs(self.registry.get(XGBoostModel, self.path), first)
+
+        joblib.dump({"booster": 2}, pkl_path)
+        self._bump_mtime_of(pkl_path)
+        self.assertEqual(self.registry.get(XGBoostModel, self.path).model, {"booster": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
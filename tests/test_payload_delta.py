@@ -0,0 +1,83 @@
+import copy
+import json
+import time
+import unittest
+
+from src.dashboard.payload_delta import apply_delta, apply_series, diff_series, payload_delta
+from src.dashboard.snapshot_cache import Snapshot, SnapshotCache
+
+
+def _signal(code: str, score: float) -> dict:
+    return {"code": code, "score": score, "signal_bucket": "buy" if score >= 0.7 else "watch"}
+
+
+def _payload() -> dict:
+    signals = [_signal("510300.SH", 0.72), _signal("159915.SZ", 0.65)]
+    return {
+        "generated_at": "2025-01-06 15:00:00",
+        "stats": {"buy_count": 1},
+        "signals": {"all": signals, "buy": signals[:1], "watch": signals[1:], "observe": []},
+        "holdings": [{"code": "510300.SH", "pnl_pct": 1.5}],
+        "histories": {
+            "510300.SH": [{"date": f"2025010{day}", "close": 1.0 + day / 10} for day in range(2, 7)],
+            "159915.SZ": [{"date": f"2025010{day}", "close": 2.0} for day in range(2, 7)],
+        },
+        "backtests": {
+            "90d": {
+                "summary": {"ticker_count": 2},
+                "results": [{"code": "510300.SH", "total_return_pct": 3.0}, {"code": "159915.SZ", "total_return_pct": 1.0}],
+                "charts": {"510300.SH": {"series": [], "trades": []}},
+            }
+        },
+    }
+
+
+class PayloadDeltaTest(unittest.TestCase):
+    def test_one_ticker_refresh_round_trips_and_stays_small(self):
+        old = _payload()
+        new = copy.deepcopy(old)
+        new["generated_at"] = "2025-01-07 15:00:00"
+        new["signals"]["all"][1]["score"] = 0.75
+        new["signals"]["all"][1]["signal_bucket"] = "buy"
+        new["signals"]["buy"] = list(new["signals"]["all"])
+        new["signals"]["watch"] = []
+        new["histories"]["510300.SH"] = new["histories"]["510300.SH"][1:] + [{"date": "20250107", "close": 1.9}]
+        new["backtests"]["90d"]["results"][1]["total_return_pct"] = 2.0
+
+        delta = json.loads(json.dumps(payload_delta(old, new)))
+        self.assertEqual(apply_delta(old, delta), new)
+        self.assertEqual(delta["fields"], {"generated_at": "2025-01-07 15:00:00"})
+        self.assertEqual([row["code"] for row in delta["signals"]["changed"]], ["159915.SZ"])
+        self.assertEqual(delta["signals"]["buckets"], {"buy": ["510300.SH", "159915.SZ"], "watch": []})
+        self.assertEqual(delta["histories"]["changed"]["510300.SH"]["points"], [{"date": "20250107", "close": 1.9}])
+        self.assertNotIn("159915.SZ", delta["histories"]["changed"])
+        self.assertNotIn("holdings", delta)
+        self.assertEqual(len(delta["backtests"]["changed"]["90d"]["results"]["changed"]), 1)
+        self.assertEqual(payload_delta(new, new), {})
+
+    def test_series_rewrites_and_misaligned_fallback(self):
+        old = [{"date": "20250102", "close": 1.0}, {"date": "20250103", "close": 1.1}]
+        new = [{"date": "20250102", "close": 1.0}, {"date": "20250103", "close": 1.2}]
+        self.assertEqual(diff_series(old, new), {"start": "20250102", "from": "20250103", "points": new[1:]})
+        self.assertEqual(diff_series(old, old[1:]), {"start": "20250103", "from": None, "points": []})
+        # A point vanishing from the middle cannot be expressed as trim-and-append.
+        gap = [{"date": "20250102", "close": 1.0}, {"date": "20250104", "close": 1.1}]
+        self.assertEqual(diff_series(old, gap), {"replace": gap})
+        stale = [{"date": "20250103", "close": 9.0}]
+        self.assertEqual(apply_series(stale, diff_series(stale, new)), new)
+
+
+class SnapshotRingTest(unittest.TestCase):
+    def test_replaced_snapshots_are_kept_by_revision(self):
+        cache = SnapshotCache(lambda days, progress: {}, lambda: "v1", keep_versions=2)
+        snapshots = [Snapshot({"build": build}, "v1", time.time() + build) for build in range(4)]
+        for snapshot in snapshots:
+            cache.store(120, snapshot)
+        self.assertIsNone(cache.previous(120, snapshots[0].revision))
+        self.assertIs(cache.previous(120, snapshots[2].revision), snapshots[2])
+        self.assertIsNone(cache.previous(90, snapshots[2].revision))
+        self.assertEqual(len(snapshots[3].revision), 16)
+
+
+if __name__ == "__main__":
+    unittest.main()
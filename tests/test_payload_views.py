@@ -0,0 +1,58 @@
+import json
+import unittest
+
+from src.dashboard.payload_views import backtest_chart_view, history_view, normalize_window, summary_view
+from src.dashboard.snapshot_cache import Snapshot
+
+
+def _payload() -> dict:
+    chart = {"window_days": 90, "series": [{"date": "20250102", "close": 1.0}], "trades": []}
+    return {
+        "generated_at": "2025-01-02 15:00:00",
+        "signals": {"all": [{"code": "510300.SH", "score": 0.61}]},
+        "holdings": [],
+        "histories": {"510300.SH": [{"date": "20250102", "close": 1.0, "score": 0.61}]},
+        "backtests": {
+            "90d": {"summary": {"ticker_count": 1}, "results": [], "charts": {"510300.SH": chart}},
+            "180d": {"summary": {"ticker_count": 0}, "results": [], "charts": {}},
+        },
+    }
+
+
+class PayloadViewsTest(unittest.TestCase):
+    def test_summary_drops_series_only(self):
+        payload = _payload()
+        summary = summary_view(payload)
+        self.assertNotIn("histories", summary)
+        self.assertNotIn("charts", summary["backtests"]["90d"])
+        self.assertEqual(summary["backtests"]["90d"]["summary"], {"ticker_count": 1})
+        self.assertEqual(summary["signals"], payload["signals"])
+        self.assertIn("charts", payload["backtests"]["90d"])
+
+    def test_per_ticker_views(self):
+        payload = _payload()
+        self.assertEqual(history_view("510300.SH")(payload), payload["histories"]["510300.SH"])
+        self.assertIsNone(history_view("000000.SH")(payload))
+        self.assertEqual(normalize_window("90"), "90d")
+        self.assertEqual(backtest_chart_view("90", "510300.SH")(payload)["window_days"], 90)
+        self.assertIsNone(backtest_chart_view("180d", "510300.SH")(payload))
+        self.assertIsNone(backtest_chart_view("30d", "510300.SH")(payload))
+
+    def test_snapshot_encodes_each_view_once(self):
+        snapshot = Snapshot(_payload(), "v1", 1.0)
+        body, etag = snapshot.encoded("summary", summary_view)
+        self.assertEqual(json.loads(body), summary_view(snapshot.payload))
+        self.assertIs(snapshot.encoded("summary", summary_view)[0], body)
+        self.assertNotEqual(etag, snapshot.etag)
+        self.assertLess(len(body), len(snapshot.payload_json()))
+
+    def test_missing_views_are_not_memoized(self):
+        snapshot = Snapshot(_payload(), "v1", 1.0)
+        for code in ("000000.SH", "000001.SH"):
+            self.assertIsNone(snapshot.encoded(f"history:{code}", history_view(code)))
+            self.assertIsNone(snapshot.encoded(f"chart:30d:{code}", backtest_chart_view("30d", code)))
+        self.assertEqual(len(snapshot._encoded), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
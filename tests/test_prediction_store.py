@@ -0,0 +1,82 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from src.models.prediction_store import PredictionStore
+from src.models.xgb_model import XGBoostModel
+
+
+def _frame(model: XGBoostModel, rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(rng.normal(size=(rows, len(model.feature_cols))), columns=model.feature_cols)
+    frame["trade_date"] = pd.bdate_range("2025-01-02", periods=rows).strftime("%Y%m%d")
+    return frame
+
+
+class PredictionStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.model = XGBoostModel(model_path="data/xgb_model.json")
+        if not self.model.load_model():
+            self.skipTest("data/xgb_model.json is not available")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = PredictionStore(Path(self.tmp.name) / "predictions.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _score(self, frames):
+        with mock.patch.object(self.model, "predict_batch", wraps=self.model.predict_batch) as predict:
+            scores = self.store.score_many(self.model, frames)
+        scored_rows = sum(len(call.args[0]) for call in predict.call_args_list)
+        return scores, scored_rows, predict.call_count
+
+    def test_only_unseen_rows_are_scored(self):
+        full = {"510300.SH": _frame(self.model, 80, 1), "588000.SH": _frame(self.model, 60, 2)}
+        frames = {code: df.iloc[:-1] for code, df in full.items()}
+
+        scores, scored_rows, calls = self._score(frames)
+        self.assertEqual((scored_rows, calls), (138, 1))
+        for code, df in frames.items():
+            np.testing.assert_array_equal(scores[code], self.model.predict_batch(df))
+
+        _, scored_rows, calls = self._score(frames)
+        self.assertEqual((scored_rows, calls), (0, 0))
+
+        scores, scored_rows, calls = self._score(full)
+        self.assertEqual((scored_rows, calls), (2, 1))
+        for code, df in full.items():
+            self.assertEqual(scores[code].dtype, np.float32)
+            np.testing.assert_array_equal(scores[code], self.model.predict_batch(df))
+
+    def test_changed_feature_rows_are_rescored(self):
+        frames = {"510300.SH": _frame(self.model, 40, 3)}
+        self._score(frames)
+
+        revised = frames["510300.SH"].copy()
+        revised.loc[5, self.model.feature_cols[0]] += 1.0
+        scores, scored_rows, _ = self._score({"510300.SH": revised})
+        self.assertEqual(scored_rows, 1)
+        np.testing.assert_array_equal(scores["510300.SH"], self.model.predict_batch(revised))
+
+    def test_least_recently_used_fingerprints_are_dropped(self):
+        store = PredictionStore(Path(self.tmp.name) / "pruned.db", max_fingerprints=2)
+        frames = {"510300.SH": _frame(self.model, 20, 4)}
+        for fingerprint in ("a", "b", "a", "c"):
+            with mock.patch.object(self.model, "fingerprint", return_value=fingerprint):
+                store.score_many(self.model, frames)
+
+        conn = sqlite3.connect(store.db_path)
+        try:
+            kept = conn.execute("SELECT DISTINCT fingerprint FROM predictions ORDER BY fingerprint").fetchall()
+        finally:
+            conn.close()
+        self.assertEqual(kept, [("a",), ("c",)])
+
+
+if __name__ == "__main__":
+    unittest.main()
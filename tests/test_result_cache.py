@@ -0,0 +1,71 @@
+import itertools
+import tempfile
+import unittest
+from dataclasses import replace
+from pathlib import Path
+from unittest import mock
+
+from src.backtest.backtester import Backtester, trade_records
+from src.backtest import hybrid_runner
+from src.backtest.hybrid_runner import run_backtest_for_cache
+from src.backtest.result_cache import BacktestResultCache
+from src.backtest.strategy_config import StrategyConfig
+from tests.test_batch_engine import _data_cache
+
+
+class BacktestResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = BacktestResultCache(Path(self.tmp.name) / "cache.db", max_entries=100)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _run(self, data_cache, market_status_map, config, fingerprint="m1"):
+        with mock.patch.object(hybrid_runner, "_run_ticker_backtest", wraps=hybrid_runner._run_ticker_backtest) as run:
+            results = run_backtest_for_cache(
+                data_cache,
+                Backtester(),
+                market_status_map,
+                config=config,
+                result_cache=self.cache,
+                window=90,
+                model_fingerprint=fingerprint,
+            )
+        return results, [call.args[0] for call in run.call_args_list]
+
+    def test_only_changed_inputs_are_recomputed(self):
+        data_cache, market_status_map = _data_cache()
+        config = StrategyConfig.from_settings()
+
+        first, ran = self._run(data_cache, market_status_map, config)
+        self.assertEqual(ran, list(data_cache))
+
+        second, ran = self._run(data_cache, market_status_map, config)
+        self.assertEqual(ran, [])
+        for expected, actual in zip(first, second):
+            self.assertEqual(actual["total_return"], expected["total_return"])
+            self.assertEqual(trade_records(actual["trades"]), trade_records(expected["trades"]))
+
+        moved = "588000.SH"
+        data_cache[moved]["probs"] = data_cache[moved]["probs"] * 0.9
+        _, ran = self._run(data_cache, market_status_map, config)
+        self.assertEqual(ran, [moved])
+
+        _, ran = self._run(data_cache, market_status_map, replace(config, atr_multiplier=1.0))
+        self.assertEqual(ran, list(data_cache))
+        _, ran = self._run(data_cache, market_status_map, config, fingerprint="m2")
+        self.assertEqual(ran, list(data_cache))
+
+    def test_least_recently_used_rows_are_evicted(self):
+        cache = BacktestResultCache(Path(self.tmp.name) / "small.db", max_entries=2)
+        with mock.patch("src.backtest.result_cache.time.time", side_effect=itertools.count()):
+            cache.put_many({"a": {"code": "a"}, "b": {"code": "b"}})
+            cache.get_many(["a"])
+            cache.put_many({"c": {"code": "c"}})
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(set(cache.get_many(["a", "b", "c"])), {"a", "c"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.models.scoring_model import RuleBasedModel
+
+
+def _frame(rows: int, seed: int = 5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 10 + np.cumsum(rng.normal(scale=0.1, size=rows))
+    df = pd.DataFrame(
+        {
+            # Every row carries today's date so the scalar staleness check never zeroes a score.
+            "trade_date": datetime.now().strftime("%Y%m%d"),
+            "close": close,
+            "ma20": close + rng.normal(scale=0.1, size=rows),
+            "rsi_14": rng.uniform(10, 80, size=rows),
+            "macd": rng.normal(scale=0.05, size=rows),
+            "macdsignal": rng.normal(scale=0.05, size=rows),
+            "vol": rng.uniform(1e5, 2e5, size=rows),
+        }
+    )
+    df.loc[df.index.isin([33, 47]), "rsi_14"] = np.nan
+    return df
+
+
+class RuleBasedModelBatchTest(unittest.TestCase):
+    def test_batch_matches_scalar_predict_per_row(self):
+        model = RuleBasedModel()
+        raw = _frame(80)
+        prepared = model.prepare_data(raw.copy())
+
+        scores = model.predict_batch(prepared)
+        self.assertEqual(len(scores), len(prepared))
+        np.testing.assert_array_equal(scores[:29], 0.0)
+        expected = [model.predict(prepared.iloc[: i + 1]) for i in range(len(prepared))]
+        np.testing.assert_array_equal(scores, expected)
+        self.assertGreater(len(np.unique(scores)), 3)
+
+        # Backtest frames skip prepare_data; the volume average is computed on the fly.
+        np.testing.assert_array_equal(model.predict_batch(raw), scores)
+
+    def test_staleness_check_stays_in_predict(self):
+        model = RuleBasedModel()
+        df = model.prepare_data(_frame(40))
+        df["trade_date"] = "20200102"
+        self.assertEqual(model.predict(df), 0.0)
+        self.assertEqual(model.predict_batch(df)[-1], model.predict_batch(_frame(40))[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import json
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.dashboard import serialization
+from src.dashboard.data_builder import _float_or_none, _serialize_history
+from src.dashboard.serialization import dumps, float_column, records_from_columns
+
+
+class FloatColumnTest(unittest.TestCase):
+    def test_matches_per_cell_conversion(self):
+        values = np.random.default_rng(7).normal(size=5000) * 100
+        values[::97] = np.nan
+        values[5] = np.inf
+        self.assertEqual(float_column(values, 4), [_float_or_none(value, 4) for value in values])
+        self.assertEqual(float_column(pd.Series([1.005, None, "x"], dtype=object), 2), [_float_or_none(1.005, 2), None, None])
+        self.assertEqual(float_column(None, 4, 3), [None, None, None])
+
+    def test_history_rows(self):
+        scored_df = pd.DataFrame(
+            {
+                "trade_date": ["20250102", "20250103", "20250106"],
+                "close": [1.23456, 1.3, np.nan],
+                "ma20": [np.nan, 1.1, 1.2],
+                "_score": [0.5, 0.61234, 0.7],
+            }
+        )
+        history = _serialize_history(scored_df, 2)
+        self.assertEqual(
+            history,
+            [
+                {"date": "20250103", "close": 1.3, "ma20": 1.1, "ma60": None, "score": 0.6123},
+                {"date": "20250106", "close": None, "ma20": 1.2, "ma60": None, "score": 0.7},
+            ],
+        )
+        self.assertEqual(records_from_columns({"a": [1, 2], "b": [3, 4]}), [{"a": 1, "b": 3}, {"a": 2, "b": 4}])
+
+
+class DumpsTest(unittest.TestCase):
+    def test_round_trips_with_and_without_orjson(self):
+        value = {"name": "沪深300ETF", "score": 0.61, "series": [None, 1.5], "ok": True}
+        self.assertEqual(json.loads(dumps(value)), value)
+        encoder = serialization.orjson
+        serialization.orjson = None
+        try:
+            self.assertEqual(dumps(value), json.dumps(value, ensure_ascii=False).encode("utf-8"))
+        finally:
+            serialization.orjson = encoder
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+from datetime import date, timedelta
+
+import numpy as np
+
+from src.dashboard.payload_views import backtest_chart_view, history_view
+from src.dashboard.series_encoding import downsample_records, lttb_indices, snap_points, to_columnar
+
+
+def _history(days: int) -> list[dict]:
+    start = date(2025, 1, 2)
+    rows = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        rows.append({"date": day.strftime("%Y%m%d"), "close": round(1 + 0.1 * np.sin(offset / 7), 4), "score": None})
+    return rows
+
+
+class LttbTest(unittest.TestCase):
+    def test_keeps_endpoints_and_target_count(self):
+        y = np.sin(np.arange(365) / 9.0)
+        kept = lttb_indices(y, 100)
+        self.assertEqual(len(kept), 100)
+        self.assertEqual((kept[0], kept[-1]), (0, 364))
+        self.assertTrue(np.all(np.diff(kept) > 0))
+        np.testing.assert_array_equal(lttb_indices(y[:50], 100), np.arange(50))
+
+    def test_spike_survives_and_nan_is_tolerated(self):
+        y = np.zeros(300)
+        y[123] = 10.0
+        y[:5] = np.nan
+        self.assertIn(123, lttb_indices(y, 30))
+
+    def test_marked_rows_are_always_kept(self):
+        rows = _history(365)
+        rows[200]["buy_price"] = rows[200]["close"]
+        sampled = downsample_records(rows, 50, "close", ("buy_price",))
+        self.assertIn(rows[200], sampled)
+        self.assertLessEqual(len(sampled), 51)
+
+    def test_points_snap_to_buckets(self):
+        requested = (-5, 20, 120, 121, 240, 300, 960, 100000)
+        self.assertEqual([snap_points(n) for n in requested], [120, 120, 120, 240, 240, 480, 960, 960])
+
+
+class ColumnarTest(unittest.TestCase):
+    def test_round_trip(self):
+        rows = _history(10)
+        del rows[3]
+        encoded = to_columnar(rows)
+        self.assertEqual(encoded["date_base"], "20250102")
+        self.assertEqual(encoded["date_offsets"][:4], [0, 1, 2, 4])
+        self.assertEqual(encoded["columns"]["close"], [row["close"] for row in rows])
+        base = date(2025, 1, 2)
+        decoded = [
+            {"date": (base + timedelta(days=offset)).strftime("%Y%m%d"), **{k: v[i] for k, v in encoded["columns"].items()}}
+            for i, offset in enumerate(encoded["date_offsets"])
+        ]
+        self.assertEqual(decoded, rows)
+
+    def test_views_are_opt_in(self):
+        chart_rows = _history(300)
+        chart_rows[150]["sell_price"] = 1.0
+        payload = {
+            "histories": {"510300.SH": _history(300)},
+            "backtests": {"90d": {"charts": {"510300.SH": {"window_days": 90, "series": chart_rows, "trades": []}}}},
+        }
+        self.assertEqual(history_view("510300.SH")(payload), payload["histories"]["510300.SH"])
+        columnar = history_view("510300.SH", columnar=True, points=60)(payload)
+        self.assertEqual(columnar["length"], 60)
+        chart = backtest_chart_view("90d", "510300.SH", columnar=True, points=60)(payload)
+        self.assertEqual(chart["window_days"], 90)
+        self.assertIn(1.0, chart["series"]["columns"]["sell_price"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.dashboard.single_flight import Overloaded, SingleFlight
+
+
+class SingleFlightTest(unittest.TestCase):
+    def test_concurrent_callers_share_one_run(self):
+        flight = SingleFlight(max_workers=1, max_pending=2)
+        release = threading.Event()
+        calls = []
+
+        def build(value):
+            calls.append(value)
+            release.wait(5)
+            return {"value": value}
+
+        futures = [flight.submit("payload", build, 120) for _ in range(3)]
+        self.assertTrue(flight.in_flight("payload"))
+        release.set()
+        results = [future.result(5) for future in futures]
+
+        self.assertEqual(calls, [120])
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertFalse(flight.in_flight("payload"))
+        self.assertEqual(flight.run("payload", build, 90), {"value": 90})
+
+    def test_rejects_new_keys_past_queue_depth(self):
+        flight = SingleFlight(max_workers=1, max_pending=2)
+        release = threading.Event()
+        flight.submit("a", release.wait, 5)
+        flight.submit("b", release.wait, 5)
+        with self.assertRaises(Overloaded):
+            flight.submit("c", release.wait, 5)
+        # Joining a key that is already in flight never counts against the limit.
+        flight.submit("a", release.wait, 5)
+        release.set()
+
+    def test_errors_reach_every_waiter(self):
+        flight = SingleFlight(max_workers=2, max_pending=2)
+        release = threading.Event()
+
+        def fail():
+            release.wait(5)
+            raise ValueError("fetch failed")
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            waiters = [pool.submit(flight.run, "payload", fail) for _ in range(3)]
+            release.set()
+            for waiter in waiters:
+                with self.assertRaises(ValueError):
+                    waiter.result(5)
+
+
+if __name__ == "__main__":
+    unittest.main()
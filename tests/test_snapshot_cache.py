@@ -0,0 +1,73 @@
+import threading
+import time
+import unittest
+
+from src.dashboard.snapshot_cache import Snapshot, SnapshotCache
+
+
+class _Source:
+    def __init__(self):
+        self.version = "v1"
+        self.builds = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def build(self, history_days: int, progress) -> dict:
+        progress("fetch")
+        self.release.wait(5)
+        progress("backtests")
+        self.builds += 1
+        return {"history_days": history_days, "build": self.builds}
+
+
+def _wait_idle(cache: SnapshotCache, history_days: int) -> None:
+    deadline = time.time() + 5
+    while cache.is_revalidating(history_days) and time.time() < deadline:
+        time.sleep(0.01)
+
+
+class SnapshotCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.source = _Source()
+        self.cache = SnapshotCache(self.source.build, lambda: self.source.version, ttl=60)
+
+    def test_serves_cached_snapshot_until_version_changes(self):
+        first = self.cache.get(120)
+        self.assertEqual(first.payload["build"], 1)
+        self.assertIs(self.cache.get(120), first)
+        self.assertEqual(self.source.builds, 1)
+
+        self.source.version = "v2"
+        self.source.release.clear()
+        # Stale: the old snapshot comes back at once while a single rebuild runs in the background.
+        self.assertIs(self.cache.get(120), first)
+        self.assertIs(self.cache.get(120), first)
+        self.assertTrue(self.cache.is_revalidating(120))
+        self.source.release.set()
+        _wait_idle(self.cache, 120)
+
+        second = self.cache.get(120)
+        self.assertEqual(second.payload["build"], 2)
+        self.assertEqual(second.version, "v2")
+        self.assertEqual(self.source.builds, 2)
+
+    def test_ttl_expiry_and_newer_build_wins(self):
+        snapshot = self.cache.get(90)
+        snapshot.built_at -= 61
+        self.assertTrue(self.cache.is_stale(snapshot))
+
+        newer = Snapshot({"build": "manual"}, "v1", time.time() + 10)
+        self.assertIs(self.cache.store(90, newer), newer)
+        older = Snapshot({"build": "late"}, "v1", time.time())
+        self.assertIs(self.cache.store(90, older), newer)
+
+    def test_refresh_forwards_build_progress(self):
+        stages = []
+        self.cache.refresh(120, progress=stages.append)
+        self.assertEqual(stages, ["fetch", "backtests"])
+        self.cache.refresh(120)
+        self.assertEqual(len(stages), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
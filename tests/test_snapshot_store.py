@@ -0,0 +1,49 @@
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from src.dashboard.snapshot_cache import Snapshot, SnapshotCache
+from src.dashboard.snapshot_store import load_snapshot, save_snapshot
+
+
+class SnapshotStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.path = self.tmp / "dashboard-data.json"
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_round_trip_serves_persisted_bytes(self):
+        snapshot = Snapshot({"generated_at": "2025-01-06 15:00:00", "signals": {"all": []}}, "v1", 1_700_000_000.0)
+        save_snapshot(snapshot, 120, self.path)
+        loaded = load_snapshot(120, self.path)
+        self.assertEqual((loaded.payload, loaded.version, loaded.built_at), (snapshot.payload, "v1", snapshot.built_at))
+        self.assertEqual(loaded.revision, snapshot.revision)
+        self.assertEqual(loaded.payload_json(), self.path.read_bytes())
+        self.assertIsNone(load_snapshot(90, self.path))
+
+    def test_missing_or_torn_files_are_ignored(self):
+        self.assertIsNone(load_snapshot(120, self.path))
+        save_snapshot(Snapshot({"build": 1}, "v1", time.time()), 120, self.path)
+        self.path.write_bytes(b'{"build": 2}')
+        self.assertIsNone(load_snapshot(120, self.path))
+        self.path.write_bytes(b"{not json")
+        self.assertIsNone(load_snapshot(120, self.path))
+
+    def test_rebuild_hook_sees_each_new_snapshot(self):
+        persisted = []
+        cache = SnapshotCache(
+            lambda days, progress: {"days": days},
+            lambda: "v1",
+            on_rebuild=lambda days, snapshot: persisted.append((days, snapshot.payload)),
+        )
+        cache.refresh(120)
+        cache.store(120, Snapshot({"manual": True}, "v1", time.time()))
+        self.assertEqual(persisted, [(120, {"days": 120})])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from src.models.tree_evaluator import NumpyTreeModel, evaluate_margin, export_compiled
+
+
+MODEL_PATH = "data/xgb_model.json"
+
+
+class NumpyTreeModelTest(unittest.TestCase):
+    def setUp(self):
+        if not os.path.exists(MODEL_PATH):
+            self.skipTest("data/xgb_model.json is not available")
+        self.tmp = tempfile.mkdtemp()
+        self.model_path = str(Path(self.tmp) / "xgb_model.json")
+        shutil.copy(MODEL_PATH, self.model_path)
+        self.booster = xgb.Booster()
+        self.booster.load_model(self.model_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _frame(self, rows: int) -> pd.DataFrame:
+        rng = np.random.default_rng(11)
+        values = rng.normal(scale=0.3, size=(rows, len(self.booster.feature_names)))
+        values[rng.random(values.shape) < 0.1] = np.nan
+        return pd.DataFrame(values, columns=self.booster.feature_names)
+
+    def test_matches_booster_predict(self):
+        model = NumpyTreeModel(model_path=self.model_path)
+        self.assertTrue(model.load_model())
+        frame = self._frame(2000)
+        dmatrix = xgb.DMatrix(frame, feature_names=self.booster.feature_names)
+
+        np.testing.assert_allclose(
+            evaluate_margin(model.compiled, frame.to_numpy(dtype=np.float32)),
+            self.booster.predict(dmatrix, output_margin=True),
+            rtol=0,
+            atol=2e-6,
+        )
+        scores = model.predict_batch(frame)
+        self.assertEqual(scores.dtype, np.float32)
+        np.testing.assert_allclose(scores, self.booster.predict(dmatrix), rtol=0, atol=1e-6)
+        self.assertAlmostEqual(model.predict(frame), float(scores[-1]), places=4)
+
+    def test_recompiles_when_model_file_changes(self):
+        npz_path = export_compiled(self.model_path)
+        model = NumpyTreeModel(model_path=self.model_path)
+        self.assertTrue(model.load_model())
+        first = model.fingerprint()
+
+        with open(self.model_path, "a", encoding="utf-8") as f:
+            f.write("\n")
+        reloaded = NumpyTreeModel(model_path=self.model_path)
+        self.assertTrue(reloaded.load_model())
+        self.assertNotEqual(reloaded.fingerprint(), first)
+        self.assertTrue(reloaded.fingerprint().startswith("numpy:"))
+        with np.load(npz_path) as data:
+            self.assertEqual("numpy:" + str(data["source_sha256"]), reloaded.fingerprint())
+
+
+class FreshBoosterTest(unittest.TestCase):
+    """Parity against a booster trained and saved by the installed xgboost, whatever its JSON format."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_matches_freshly_trained_booster(self):
+        rng = np.random.default_rng(5)
+        names = ["f0", "f1", "f2", "f3"]
+        X = rng.normal(size=(400, len(names)))
+        y = (X[:, 0] + 0.5 * X[:, 1] > 0.3).astype(int)
+        X[rng.random(X.shape) < 0.05] = np.nan
+        booster = xgb.train(
+            {"objective": "binary:logistic", "max_depth": 3, "eta": 0.3},
+            xgb.DMatrix(X, label=y, feature_names=names),
+            num_boost_round=20,
+        )
+        model_path = str(Path(self.tmp) / "xgb_model.json")
+        booster.save_model(model_path)
+
+        model = NumpyTreeModel(model_path=model_path)
+        self.assertTrue(model.load_model())
+        frame = pd.DataFrame(X, columns=names)
+        np.testing.assert_allclose(
+            model.predict_batch(frame),
+            booster.predict(xgb.DMatrix(frame, feature_names=names)),
+            rtol=0,
+            atol=1e-6,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from config.settings import settings
+from src.backtest.backtester import trade_records
+from src.backtest.walk_forward import _fold_key, fold_ranges, run_walk_forward_folds
+from src.models.xgb_model import XGBoostModel
+from tests.test_backtester import _synthetic_bars
+
+
+def _dataset() -> dict[str, pd.DataFrame]:
+    horizon = settings.TRAIN_LABEL_HORIZON
+    feature_cols = XGBoostModel().feature_cols
+    dataset = {}
+    for seed, code in enumerate(["510300.SH", "588000.SH"]):
+        df = _synthetic_bars(seed, days=260 - 20 * seed)
+        rng = np.random.default_rng(seed)
+        for col in feature_cols:
+            df[col] = rng.normal(size=len(df))
+        df["target"] = (df[feature_cols[0]] + rng.normal(scale=0.5, size=len(df)) > 0).astype(int)
+        df["sample_weight"] = 1.0
+        df[f"quality_{horizon}d"] = rng.normal(size=len(df))
+        df[f"future_max_ret_{horizon}d"] = rng.uniform(0, 0.05, len(df))
+        df[f"future_min_ret_{horizon}d"] = -rng.uniform(0, 0.05, len(df))
+        dataset[code] = df
+    return dataset
+
+
+WINDOWS = [
+    {"train_start": "20250101", "train_end": "20250430", "test_start": "20250501", "test_end": "20250630"},
+    {"train_start": "20250301", "train_end": "20250630", "test_start": "20250701", "test_end": "20250830"},
+]
+
+
+class WalkForwardTest(unittest.TestCase):
+    def test_fold_ranges_match_date_filters(self):
+        dataset = _dataset()
+        for window, ranges in zip(WINDOWS, fold_ranges(dataset, WINDOWS)):
+            for code, df in dataset.items():
+                dates = df["trade_date"].astype(str)
+                train_lo, train_hi, test_lo, test_hi = ranges[code]
+                train_mask = (dates >= window["train_start"]) & (dates <= window["train_end"])
+                test_mask = (dates >= window["test_start"]) & (dates <= window["test_end"])
+                self.assertTrue(df.iloc[train_lo:train_hi].index.equals(df[train_mask].index))
+                self.assertTrue(df.iloc[test_lo:test_hi].index.equals(df[test_mask].index))
+
+    def test_completed_folds_are_loaded_from_checkpoints(self):
+        dataset = _dataset()
+        with tempfile.TemporaryDirectory() as tmp:
+            first = run_walk_forward_folds(dataset, WINDOWS, checkpoint_dir=tmp, workers=2)
+            self.assertEqual(sorted({res["fold"] for res in first}), [1, 2])
+
+            with mock.patch.object(XGBoostModel, "train", side_effect=AssertionError("fold retrained")):
+                second = run_walk_forward_folds(dataset, WINDOWS, checkpoint_dir=tmp)
+
+        self.assertEqual([(r["fold"], r["code"]) for r in second], [(r["fold"], r["code"]) for r in first])
+        for expected, actual in zip(first, second):
+            self.assertEqual(actual["total_return"], expected["total_return"])
+            self.assertEqual(trade_records(actual["trades"]), trade_records(expected["trades"]))
+
+    def test_fold_key_tracks_rows_and_training_settings(self):
+        dataset = _dataset()
+        window, ranges = WINDOWS[0], fold_ranges(dataset, WINDOWS)[0]
+        key = _fold_key(dataset, window, ranges, 0.6, 100000.0)
+        self.assertEqual(_fold_key(_dataset(), window, ranges, 0.6, 100000.0), key)
+
+        train_lo = ranges["510300.SH"][0]
+        edited = _dataset()
+        edited["510300.SH"].loc[edited["510300.SH"].index[train_lo], "close"] += 1.0
+        self.assertNotEqual(_fold_key(edited, window, ranges, 0.6, 100000.0), key)
+
+        with mock.patch.object(settings, "TRAIN_LABEL_THRESHOLD", settings.TRAIN_LABEL_THRESHOLD + 0.01):
+            self.assertNotEqual(_fold_key(dataset, window, ranges, 0.6, 100000.0), key)
+        with mock.patch.object(settings, "XGB_SEARCH", "halving"):
+            self.assertNotEqual(_fold_key(dataset, window, ranges, 0.6, 100000.0), key)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import contextlib
+import io
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.models.xgb_model import XGBoostModel
+from tests.test_walk_forward import _dataset
+
+
+def _train(search: str, df: pd.DataFrame) -> XGBoostModel:
+    model = XGBoostModel(search=search, search_workers=2)
+    with contextlib.redirect_stdout(io.StringIO()):
+        model.train(df)
+    return model
+
+
+class XGBoostSearchTest(unittest.TestCase):
+    def test_parallel_search_selects_the_serial_model(self):
+        df = pd.concat(_dataset().values(), ignore_index=True)
+        serial = _train("serial", df)
+        parallel = _train("parallel", df)
+        np.testing.assert_array_equal(parallel.predict_batch(df), serial.predict_batch(df))
+
+    def test_successive_halving_trains_a_model(self):
+        df = pd.concat(_dataset().values(), ignore_index=True)
+        model = _train("halving", df)
+        self.assertTrue(model.is_trained)
+        self.assertEqual(len(model.predict_batch(df)), len(df))
+
+    def test_unknown_search_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            XGBoostModel(search="grid")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,13 @@
 import pandas as pd
 from datetime import datetime, timedelta
 from config import tickers
+from config.settings import settings
 from src.data_loader.tushare_loader import TushareLoader
 from src.data_loader.data_manager import DataManager
 from src.features.technical import FeatureEngineer
 from src.models.xgb_model import XGBoostModel
 from src.backtest.backtester import Backtester
+from src.backtest.walk_forward import run_walk_forward_folds
 
 
 # ============================================================
@@ -104,50 +106,15 @@ def run_walk_forward(dataset: dict[str, pd.DataFrame], backtester: Backtester) -
         return _run_single_split(dataset, backtester, latest)
 
     print(f"\n📅 Walk-Forward Windows: {len(windows)} folds")
-    all_results = []
-
-    for i, w in enumerate(windows):
-        print(f"\n--- Fold {i+1}/{len(windows)} | Train: {w['train_start']}~{w['train_end']} | Test: {w['test_start']}~{w['test_end']} ---")
-
-        # 构建跨标的训练集
-        train_frames = []
-        for df in dataset.values():
-            dates = df['trade_date'].astype(str)
-            chunk = df[(dates >= w['train_start']) & (dates <= w['train_end'])]
-            if len(chunk) >= 60:
-                train_frames.append(chunk)
-
-        if not train_frames:
-            print("  Skipping: insufficient training data in this window.")
-            continue
-
-        full_train_df = pd.concat(train_frames, ignore_index=True)
-
-        # 训练 XGBoost
-        model = XGBoostModel()
-        model.train(full_train_df)
-
-        if not model.is_trained:
-            print("  Training failed. Skipping.")
-            continue
-
-        # 回测测试集
-        for code, df in dataset.items():
-            dates = df['trade_date'].astype(str)
-            test_part = df[(dates >= w['test_start']) & (dates <= w['test_end'])].copy()
-            if len(test_part) < 10:
-                continue
-
-            probs = model.predict_batch(test_part)
-            res = backtester.run(test_part, probs, threshold=0.6)
-            res['code'] = code
-            res['name'] = tickers.TICKERS.get(code, code)
-            res['fold'] = i + 1
-            res['test_start'] = w['test_start']
-            res['test_end'] = w['test_end']
-            all_results.append(res)
-
-    return all_results
+    # 各折并行训练，完成的折落盘到 data/walk_forward/，中断后重跑会跳过已完成的折
+    return run_walk_forward_folds(
+        dataset,
+        windows,
+        checkpoint_dir=settings.DATA_DIR / "walk_forward",
+        workers=settings.BACKTEST_WORKERS,
+        threshold=0.6,
+        initial_capital=backtester.initial_capital,
+    )
 
 
 def _run_single_split(dataset: dict, backtester: Backtester, latest_date: str) -> list[dict]: